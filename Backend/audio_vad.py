@@ -0,0 +1,144 @@
+# audio_vad.py
+"""Energy-based voice activity detection for recorded answers.
+
+Whisper's cost grows with the length of the audio it is given. Uploaded
+answers carry leading and trailing silence and long thinking pauses.
+trim_silence computes the RMS of every frame in one NumPy pass (the same
+test interview_cli uses to auto-stop a recording, with a threshold that
+adapts to the clip's noise floor). It then returns the clip with the long
+silences cut out. Speech keeps VAD_PAD_MS of context on both sides, and
+pauses shorter than VAD_MIN_SILENCE_MS stay in so sentences are not
+glued together.
+
+The TimeMap that comes with the trimmed clip converts times in it back to
+the original recording, so Whisper's segment timestamps still point at the
+right moment of the answer.
+
+Environment:
+    STT_VAD              "1" (default) trims silence before transcription, "0" sends the whole clip
+    VAD_MIN_RMS          a frame this quiet is always silence (default 0.005)
+    VAD_FRAME_MS         analysis frame length (default 30)
+    VAD_PAD_MS           audio kept on each side of speech (default 250)
+    VAD_MIN_SILENCE_MS   shorter pauses are kept (default 700)
+"""
+import os
+
+import numpy as np
+
+STT_VAD = os.getenv("STT_VAD", "1") == "1"
+VAD_MIN_RMS = float(os.getenv("VAD_MIN_RMS", "0.005"))
+VAD_FRAME_MS = float(os.getenv("VAD_FRAME_MS", "30"))
+VAD_PAD_MS = float(os.getenv("VAD_PAD_MS", "250"))
+VAD_MIN_SILENCE_MS = float(os.getenv("VAD_MIN_SILENCE_MS", "700"))
+
+# Speech is any frame louder than the noise floor plus this share of the clip's dynamic range
+DYNAMIC_RANGE_FRACTION = 0.1
+MIN_REMOVED_SEC = 0.5  # trimming less than this is not worth cutting the clip
+
+
+class TimeMap:
+    """Piecewise-linear map from times in a trimmed clip to times in the original.
+
+    Each kept region starts at `kept_starts[i]` in the trimmed clip and at
+    `original_starts[i]` in the original recording.
+    """
+
+    def __init__(self, kept_starts=(0.0,), original_starts=(0.0,), durations=(float("inf"),)):
+        self.kept_starts = np.asarray(kept_starts, dtype=np.float64)
+        self.original_starts = np.asarray(original_starts, dtype=np.float64)
+        self.durations = np.asarray(durations, dtype=np.float64)
+
+    def to_original(self, t):
+        """Original time(s) for time(s) `t` in the trimmed clip (a scalar or an array)."""
+        if len(self.kept_starts) == 0:
+            return t
+        times = np.asarray(t, dtype=np.float64)
+        idx = np.clip(np.searchsorted(self.kept_starts, times, side="right") - 1, 0, len(self.kept_starts) - 1)
+        offset = np.clip(times - self.kept_starts[idx], 0.0, self.durations[idx])
+        mapped = self.original_starts[idx] + offset
+        return float(mapped) if mapped.ndim == 0 else mapped
+
+    def as_list(self):
+        return [
+            {"start": round(float(k), 3), "original_start": round(float(o), 3), "duration": round(float(d), 3)}
+            for k, o, d in zip(self.kept_starts, self.original_starts, self.durations)
+        ]
+
+
+def frame_rms(samples, frame_len):
+    """RMS of consecutive frames of `frame_len` samples (the last one zero-padded)."""
+    n_frames = -(-len(samples) // frame_len)
+    padded = np.zeros(n_frames * frame_len, dtype=np.float32)
+    padded[:len(samples)] = samples
+    frames = padded.reshape(n_frames, frame_len)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+
+
+def _runs(mask):
+    """(starts, ends) of the runs of True in a boolean array."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def speech_frames(rms, min_rms=VAD_MIN_RMS, pad_frames=0, min_silence_frames=0):
+    """Boolean mask of the frames to keep: speech, its padding and the short pauses between."""
+    if len(rms) == 0:
+        return np.zeros(0, dtype=bool)
+    floor, peak = np.percentile(rms, [10, 95])
+    threshold = max(min_rms, floor + (peak - floor) * DYNAMIC_RANGE_FRACTION)
+    keep = rms > threshold
+    if not keep.any():
+        return keep
+
+    if pad_frames > 0:
+        keep = np.convolve(keep.astype(np.int32), np.ones(2 * pad_frames + 1, dtype=np.int32), mode="same") > 0
+
+    # Pauses between speech shorter than min_silence_frames are kept; leading/trailing silence never is
+    starts, ends = _runs(~keep)
+    fill = (ends - starts < min_silence_frames) & (starts > 0) & (ends < len(keep))
+    if fill.any():
+        delta = np.zeros(len(keep) + 1, dtype=np.int32)
+        np.add.at(delta, starts[fill], 1)
+        np.add.at(delta, ends[fill], -1)
+        keep |= np.cumsum(delta[:-1]) > 0
+    return keep
+
+
+def trim_silence(samples, sample_rate=16000, min_rms=VAD_MIN_RMS, frame_ms=VAD_FRAME_MS, pad_ms=VAD_PAD_MS,
+                 min_silence_ms=VAD_MIN_SILENCE_MS):
+    """Drop the non-speech parts of a mono float clip.
+
+    Returns (trimmed samples, TimeMap, report). The report has the input,
+    kept and removed seconds and the number of speech regions. A clip with
+    no speech at all comes back empty; one with almost nothing to remove
+    comes back unchanged.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    input_sec = len(samples) / sample_rate
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    keep = speech_frames(
+        frame_rms(samples, frame_len),
+        min_rms,
+        pad_frames=int(round(pad_ms / frame_ms)),
+        min_silence_frames=int(round(min_silence_ms / frame_ms)),
+    )
+    starts, ends = _runs(keep)
+    starts, ends = starts * frame_len, np.minimum(ends * frame_len, len(samples))
+    kept_sec = float(np.sum(ends - starts)) / sample_rate
+
+    report = {
+        "input_sec": round(input_sec, 2),
+        "kept_sec": round(kept_sec, 2),
+        "removed_sec": round(input_sec - kept_sec, 2),
+        "removed_ratio": round((input_sec - kept_sec) / input_sec, 3) if input_sec else 0.0,
+        "regions": len(starts),
+    }
+    if len(starts) and input_sec - kept_sec < MIN_REMOVED_SEC:
+        report.update(kept_sec=report["input_sec"], removed_sec=0.0, removed_ratio=0.0)
+        return samples, TimeMap(), report
+
+    sample_mask = np.repeat(keep, frame_len)[:len(samples)]
+    lengths = (ends - starts) / sample_rate
+    kept_starts = np.concatenate(([0.0], np.cumsum(lengths)[:-1])) if len(starts) else []
+    time_map = TimeMap(kept_starts, starts / sample_rate, lengths)
+    return samples[sample_mask], time_map, report
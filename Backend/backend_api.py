@@ -1,20 +1,32 @@
 import os
+import re
 import uuid
 import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 import exp2
 import livevid1
+import question_bank
+import session_store
+import transcription_service
+import chunked_transcription
 import shutil
-from supabase import create_client
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY")
 SUPABASE_BUCKET_REPORTS = os.getenv("SUPABASE_BUCKET_REPORTS", "careerMentor")
 USE_SUPABASE = bool(SUPABASE_URL and SUPABASE_KEY)
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY) if USE_SUPABASE else None
+supabase = None
+if USE_SUPABASE:
+    from supabase import create_client  # slow to import; skipped when storage is local
+
+    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 def store_report_and_get_url(local_path: str, session_id: str):
     if not USE_SUPABASE:
@@ -55,6 +67,10 @@ REPORTS_DIR = os.path.abspath(os.path.join(PROJECT_ROOT, "reports")) # write PDF
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
+# Whisper loads on the first audio answer; WHISPER_PRELOAD=1 loads it in the background at boot instead
+if os.getenv("WHISPER_PRELOAD", "0") == "1":
+    exp2.preload_whisper()
+
 
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": os.getenv("FRONTEND_ORIGIN", "*")}})
@@ -64,8 +80,23 @@ CORS(app, resources={r"/api/*": {"origins": os.getenv("FRONTEND_ORIGIN", "*")}})
 def health():
     return jsonify({"ok": True})
 
-# In-memory session storage
-active_sessions = {}
+
+@app.route("/api/llm-stats", methods=["GET"])
+def llm_stats():
+    stats = exp2.get_llm_stats()
+    if question_bank.QUESTION_BANK_ENABLED:
+        stats["question_bank"] = question_bank.question_bank.stats()
+    stats["sessions"] = active_sessions.stats()
+    if transcription_service.client is not None:
+        stats["transcription"] = transcription_service.client.stats()
+    elif exp2.stt_engine is not None:
+        stats["transcription"] = exp2.stt_engine.stats()
+    stats["answer_streams"] = answer_streams.stats()
+    return jsonify(stats)
+
+# Session storage shared by all gunicorn workers (SESSION_STORE=memory for a single process)
+active_sessions = session_store.session_store
+SESSION_POLL_SEC = 0.2
 
 # Save uploaded file
 def save_uploaded_file(file_storage, folder, filename):
@@ -132,204 +163,1070 @@ def normalize_evaluation(eval_obj, fallback_note="Evaluation fallback used"):
     }
 
 # =========================
-# Endpoint: upload resume
+# Background resume processing
 # =========================
-@app.route("/api/upload-resume", methods=["POST"])
-def upload_resume():
+DEFAULT_QUESTIONS = [
+    "Tell me about yourself",
+    "Describe a project you built",
+    "Explain a technical challenge you solved"
+]
+RESUME_WORKERS = int(os.getenv("RESUME_WORKERS", "4"))
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "2"))
+RESUME_WAIT_SEC = float(os.getenv("RESUME_WAIT_SEC", "60"))
+ATS_SPECULATIVE = os.getenv("ATS_SPECULATIVE", "1") == "1"
+INTERVIEW_MODE = "interview"
+PRACTICE_MODE = "practice"  # local key-point scoring only, Gemini is never called for answers
+
+resume_executor = ThreadPoolExecutor(max_workers=RESUME_WORKERS, thread_name_prefix="resume")
+# Speculative ATS and key-point jobs run here so they never hold up process_resume for a new upload
+background_executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix="background")
+resume_jobs = {}  # session_id -> ResumeJob, removed once processing has finished
+ats_pending = {}  # exp2.ats_cache_key -> Future of a speculative ATS analysis (this worker only)
+ats_lock = threading.Lock()
+
+
+class ResumeJob:
+    """Progress of text extraction and question generation for one upload."""
+
+    def __init__(self):
+        self.text_ready = threading.Event()
+        self.done = threading.Event()
+
+
+def process_resume(session_id, resume_path):
+    """Background step after upload: extract text, build the digest, generate questions.
+
+    Any failing step degrades to an empty resume / DEFAULT_QUESTIONS, so the
+    session always ends up "ready".
+    """
+    job = resume_jobs[session_id]
     try:
-        if "resume" not in request.files:
-            return jsonify({"error": "No file uploaded"}), 400
-        resume_file = request.files["resume"]
-        out_path = save_uploaded_file(resume_file, UPLOAD_DIR, f"{uuid.uuid4()}_{resume_file.filename}")
-
-        # Extract text
+        active_sessions.update(session_id, status="extracting")
         try:
-            resume_text = exp2.extract_text_from_pdf(str(out_path))
+            resume_text = exp2.extract_text_from_pdf(str(resume_path))
         except Exception as e:
             print("⚠️ extract_text_from_pdf failed:", e)
             resume_text = ""
 
-        # Generate questions
+        # Structured resume summary reused by every downstream prompt
+        resume_digest = exp2.build_resume_digest(resume_text)
+        active_sessions.update(session_id, resume_text=resume_text, resume_digest=resume_digest,
+                               status="generating_questions")
+        if ATS_SPECULATIVE:
+            schedule_speculative_ats(session_id, resume_text, resume_digest)
+        job.text_ready.set()
+
+        skills = resume_digest.get("skills", [])
+        questions, source = None, None
+        if question_bank.QUESTION_BANK_ENABLED:
+            questions, source = question_bank.question_bank.get(resume_text, skills)
+        if questions:
+            print(f"📚 Questions served from the question bank ({source} match)")
+        else:
+            source = "gemini"
+            try:
+                q_text = exp2.generate_questions_from_resume(resume_text)
+                questions = exp2.parse_questions_properly(q_text)
+            except Exception as e:
+                print("⚠️ Question generation failed:", e)
+                questions = []
+            if questions and question_bank.QUESTION_BANK_ENABLED:
+                question_bank.question_bank.add(resume_text, skills, questions)
+        active_sessions.update(
+            session_id,
+            questions=questions or list(DEFAULT_QUESTIONS),
+            questions_fallback=not questions,
+            questions_source=source if questions else "default",
+        )
+        schedule_key_points(session_id, questions or list(DEFAULT_QUESTIONS), resume_digest)
+    except Exception as e:
+        print("❌ resume processing error:", e)
+        session = active_sessions.get(session_id)
+        if session is not None and not session.get("questions"):
+            active_sessions.update(session_id, questions=list(DEFAULT_QUESTIONS), questions_fallback=True,
+                                   questions_source="default")
+    finally:
+        active_sessions.update(session_id, status="ready")
+        job.text_ready.set()
+        job.done.set()
+        resume_jobs.pop(session_id, None)
+
+
+def schedule_speculative_ats(session_id, resume_text, resume_digest):
+    """Queue a low-priority ATS analysis for the default (empty) job description.
+
+    Most users run the ATS check after uploading. The outcome is written to
+    the session as `ats_speculative` ({key, status, result}), so
+    /api/ats-check can serve it from whichever worker receives the request.
+    """
+    key = exp2.ats_cache_key(resume_text, "")
+
+    def run():
         try:
-            q_text = exp2.generate_questions_from_resume(resume_text)
-            questions = exp2.parse_questions_properly(q_text)
-            if not questions:
-                questions = [
-                    "Tell me about yourself",
-                    "Describe a project you built",
-                    "Explain a technical challenge you solved"
-                ]
+            result, _cached = exp2.cached_ats_analysis(
+                resume_text, "", resume_digest=resume_digest, task="ats_speculative", fallback=False
+            )
         except Exception as e:
-            print("⚠️ Question generation failed:", e)
-            questions = [
-                "Tell me about yourself",
-                "Describe a project you built",
-                "Explain a technical challenge you solved"
-            ]
+            print("⚠️ speculative ATS analysis failed:", e)
+            result = None
+        try:
+            with active_sessions.edit(session_id) as session:
+                session["ats_speculative"] = {
+                    "key": key,
+                    "status": "done" if result is not None else "failed",
+                    "result": result,
+                }
+                if result is not None:
+                    session.setdefault("ats_result", result)
+        except KeyError:
+            pass
+        return result
+
+    with ats_lock:
+        if key in ats_pending:
+            return
+        active_sessions.update(session_id, ats_speculative={"key": key, "status": "pending", "since": time.time()})
+        future = background_executor.submit(run)
+        ats_pending[key] = future
+    future.add_done_callback(lambda _f: discard_pending_ats(key))
+
+
+def discard_pending_ats(key):
+    with ats_lock:
+        ats_pending.pop(key, None)
+
+
+def speculative_ats_settled(session, key):
+    speculative = session.get("ats_speculative") or {}
+    if speculative.get("key") != key or speculative.get("status") != "pending":
+        return True
+    # A worker that died mid-analysis leaves "pending" behind; stop waiting for it eventually
+    return time.time() - speculative.get("since", 0) > RESUME_WAIT_SEC
+
+
+def speculative_ats_result(session_id, key):
+    """The speculative ATS result for this key, waiting for it while it is still running.
+
+    Returns None when there is no successful speculative analysis for the key.
+    """
+    with ats_lock:
+        pending = ats_pending.get(key)
+    if pending is not None:
+        try:
+            pending.result(timeout=RESUME_WAIT_SEC)
+        except Exception as e:
+            print("⚠️ waiting for speculative ATS analysis failed:", e)
+
+    # The analysis may be running in another worker; its outcome lands in the session store
+    session = poll_session(session_id, lambda s: speculative_ats_settled(s, key), RESUME_WAIT_SEC) or {}
+    speculative = session.get("ats_speculative") or {}
+    if speculative.get("key") == key and speculative.get("status") == "done":
+        return speculative.get("result")
+    return None
+
+
+def schedule_key_points(session_id, questions, resume_digest):
+    """Generate the answer key (expected key points per question) once, right after the questions.
+
+    Answers that arrive before it is ready are pre-scored against the question text instead.
+    """
+    active_sessions.update(session_id, key_points=[[] for _ in questions])
+
+    def run():
+        try:
+            key_points = exp2.generate_question_key_points(questions, resume_digest)
+        except Exception as e:
+            print("⚠️ key point generation failed:", e)
+            return
+        try:
+            with active_sessions.edit(session_id) as session:
+                if session.get("questions") == questions:
+                    session["key_points"] = key_points
+        except KeyError:
+            pass
+
+    background_executor.submit(run)
+
+
+def key_points_for(session, q_idx):
+    key_points = session.get("key_points") or []
+    return key_points[q_idx] if q_idx < len(key_points) else []
+
+
+def answer_mode(session, requested=None):
+    """Per-answer mode: the request's `mode` if given, else the one chosen at upload."""
+    mode = (requested or session.get("mode") or INTERVIEW_MODE).strip().lower()
+    return PRACTICE_MODE if mode == PRACTICE_MODE else INTERVIEW_MODE
+
+
+def poll_session(session_id, predicate, timeout):
+    """Wait until predicate(session) holds, re-reading the store (the work may run in another worker)."""
+    deadline = time.monotonic() + timeout
+    while True:
+        session = active_sessions.get(session_id)
+        if session is None or predicate(session):
+            return session
+        if time.monotonic() >= deadline:
+            return session
+        time.sleep(SESSION_POLL_SEC)
+
+
+def resume_ready(session, text_only=False):
+    status = session.get("status", "ready")
+    if text_only:
+        return status not in ("queued", "extracting")
+    return status == "ready"
+
+
+def wait_for_resume(session_id, text_only=False, timeout=RESUME_WAIT_SEC):
+    """Block until the session's background processing (or just its text) is done.
+
+    Returns the session as it is afterwards (None if it does not exist).
+    """
+    job = resume_jobs.get(session_id)
+    if job is not None:
+        (job.text_ready if text_only else job.done).wait(timeout)
+        return active_sessions.get(session_id)
+    return poll_session(session_id, lambda s: resume_ready(s, text_only), timeout)
+
+
+def session_status_payload(session):
+    ready = session.get("status") == "ready"
+    questions = session.get("questions", []) if ready else []
+    return {
+        "session_id": session["session_id"],
+        "status": session.get("status"),
+        "questions": questions,
+        "question_count": len(questions),
+        "questions_fallback": session.get("questions_fallback", False),
+        "questions_source": session.get("questions_source"),
+        "mode": session.get("mode", INTERVIEW_MODE),
+        "resume_digest": session.get("resume_digest"),
+    }
+
+
+# =========================
+# Endpoint: upload resume
+# =========================
+@app.route("/api/upload-resume", methods=["POST"])
+def upload_resume():
+    """
+    Saves the PDF and returns the session_id right away (202). Text
+    extraction and question generation run in the background; poll
+    /api/session-status/<session_id> or stream its /stream variant.
+    """
+    try:
+        if "resume" not in request.files:
+            return jsonify({"error": "No file uploaded"}), 400
+        resume_file = request.files["resume"]
+        out_path = save_uploaded_file(resume_file, UPLOAD_DIR, f"{uuid.uuid4()}_{resume_file.filename}")
 
         session_id = str(uuid.uuid4())
-        active_sessions[session_id] = {
+        session = {
             "session_id": session_id,
             "created_at": datetime.utcnow().isoformat(),
+            "status": "queued",
             "resume_path": str(out_path),
-            "resume_text": resume_text,
-            "questions": questions,
-            "answers": [],
-            "evaluations": [],
+            "resume_text": "",
+            "resume_digest": None,
+            "mode": answer_mode({}, request.form.get("mode")),
+            "questions": [],
+            "key_points": [],
+            "slots": [],
             "monitoring": None,
             "report_path": None
         }
+        active_sessions.save(session)
+        resume_jobs[session_id] = ResumeJob()
+        resume_executor.submit(process_resume, session_id, out_path)
 
-        return jsonify({
-            "session_id": session_id,
-            "questions": questions,
-            "question_count": len(questions)
-        })
+        payload = session_status_payload(session)
+        payload["status_url"] = f"/api/session-status/{session_id}"
+        return jsonify(payload), 202
     except Exception as e:
         print("❌ upload-resume error:", e)
         return jsonify({"error": str(e)}), 500
 
+
+# =========================
+# Endpoint: session status
+# =========================
+@app.route("/api/session-status/<session_id>", methods=["GET"])
+def session_status(session_id):
+    session = active_sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Invalid session"}), 400
+    return jsonify(session_status_payload(session))
+
+
+@app.route("/api/session-status/<session_id>/stream", methods=["GET"])
+def session_status_stream(session_id):
+    """SSE: `status` events as processing advances, then `ready` with the questions."""
+    session = active_sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Invalid session"}), 400
+
+    def generate():
+        current = session
+        if not resume_ready(current):
+            yield sse_event("status", {"status": current.get("status")})
+            current = wait_for_resume(session_id, text_only=True) or current
+            if not resume_ready(current):
+                yield sse_event("status", {
+                    "status": current.get("status"),
+                    "resume_digest": current.get("resume_digest"),
+                })
+            current = wait_for_resume(session_id) or current
+        yield sse_event("ready", session_status_payload(current))
+        yield sse_event("done", {})
+
+    return sse_response(generate())
+
+# =========================
+# Answer slots + idempotent submissions
+# =========================
+SUBMISSION_WAIT_SEC = float(os.getenv("SUBMISSION_WAIT_SEC", "120"))
+EVAL_WORKERS = int(os.getenv("EVAL_WORKERS", "8"))
+
+# Background evaluations of `async` submissions; LLM concurrency is still capped by llm_scheduler
+evaluation_executor = ThreadPoolExecutor(max_workers=EVAL_WORKERS, thread_name_prefix="evaluation")
+submissions_lock = threading.Lock()
+submissions_in_flight = {}  # (session_id, question_index, fingerprint) -> threading.Event, this worker only
+
+
+def answer_slots(session):
+    """One slot per question (None until answered); a new answer to a question replaces its slot.
+
+    A slot is "pending" while its evaluation runs in the background and
+    "done" once the evaluation has landed.
+    """
+    slots = session.setdefault("slots", [])
+    missing = len(session.get("questions", [])) - len(slots)
+    if missing > 0:
+        slots.extend([None] * missing)
+    return slots
+
+
+def slot_done(slot):
+    return slot is not None and slot.get("status", "done") == "done"
+
+
+def slot_in_progress(slot, fingerprint=None):
+    """A pending slot whose evaluation is still expected to land (in any worker)."""
+    if slot is None or slot.get("status") != "pending":
+        return False
+    if fingerprint is not None and slot.get("fingerprint") != fingerprint:
+        return False
+    # A worker that was recycled mid-evaluation leaves its slot pending forever
+    return time.time() - slot.get("pending_since", 0) < SUBMISSION_WAIT_SEC
+
+
+def answered_results(session):
+    """(questions, answers, evaluations) of the evaluated questions, aligned and in question order."""
+    questions, answers, evaluations = [], [], []
+    for q_idx, slot in enumerate(answer_slots(session)):
+        if slot_done(slot):
+            questions.append(session["questions"][q_idx])
+            answers.append(slot["answer"])
+            evaluations.append(slot["evaluation"])
+    return questions, answers, evaluations
+
+
+def answer_fingerprint(ans_type, answer="", audio_bytes=None):
+    digest = hashlib.sha256(f"{ans_type}\0".encode("utf-8"))
+    digest.update(audio_bytes if audio_bytes is not None else answer.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def request_idempotency_key(fields):
+    """`Idempotency-Key` header, or an `idempotency_key` field in the JSON body / form."""
+    key = request.headers.get("Idempotency-Key") or fields.get("idempotency_key")
+    key = str(key).strip() if key else ""
+    return key or None
+
+
+def request_wants_async(fields):
+    """`async: true` in the body / form, or a `Prefer: respond-async` header."""
+    flag = fields.get("async")
+    if isinstance(flag, str):
+        flag = flag.strip().lower() in ("1", "true", "yes")
+    return bool(flag) or "respond-async" in request.headers.get("Prefer", "")
+
+
+def stored_submission(session, q_idx, key, fingerprint):
+    """The evaluated slot a submission repeats (same idempotency key, or same answer to the same question)."""
+    slots = answer_slots(session)
+    if key:
+        stored_idx = session.get("idempotency_keys", {}).get(key)
+        if stored_idx is not None and slot_done(slots[stored_idx]) \
+                and slots[stored_idx].get("idempotency_key") == key:
+            return slots[stored_idx]
+    slot = slots[q_idx]
+    if slot_done(slot) and slot.get("fingerprint") == fingerprint:
+        return slot
+    return None
+
+
+def claim_submission(session_id, q_idx, key, fingerprint, wait=True):
+    """Returns (stored slot, None) for a repeat, or (None, token) when the caller should evaluate.
+
+    An identical submission that is still being evaluated (a client retry
+    after a timeout, possibly in another worker) is waited for rather than
+    run twice. (None, None) means it is still running, after
+    SUBMISSION_WAIT_SEC or straight away when `wait` is False.
+    """
+    session = active_sessions.get(session_id) or {}
+    slot = stored_submission(session, q_idx, key, fingerprint) if session else None
+    if slot is not None:
+        return slot, None
+    token = (session_id, q_idx, fingerprint)
+    with submissions_lock:
+        pending = submissions_in_flight.get(token)
+        if pending is None and not slot_in_progress(answer_slots(session)[q_idx] if session else None, fingerprint):
+            submissions_in_flight[token] = threading.Event()
+            return None, token
+    if not wait:
+        return None, None
+    if pending is not None:
+        pending.wait(SUBMISSION_WAIT_SEC)
+    session = poll_session(
+        session_id, lambda s: not slot_in_progress(answer_slots(s)[q_idx], fingerprint), SUBMISSION_WAIT_SEC
+    ) or {}
+    slot = stored_submission(session, q_idx, key, fingerprint) if session else None
+    if slot is not None:
+        return slot, None
+    with submissions_lock:
+        if token in submissions_in_flight:
+            return None, None
+        submissions_in_flight[token] = threading.Event()  # the first attempt failed; take over
+        return None, token
+
+
+def release_submission(token):
+    with submissions_lock:
+        pending = submissions_in_flight.pop(token, None)
+    if pending is not None:
+        pending.set()
+
+
+def wait_for_evaluations(session_id, timeout=SUBMISSION_WAIT_SEC):
+    """Block until every in-flight submission of the session has been evaluated (or `timeout`).
+
+    Returns the session as it is afterwards.
+    """
+    deadline = time.monotonic() + timeout
+    with submissions_lock:
+        pending = [event for token, event in submissions_in_flight.items() if token[0] == session_id]
+    for event in pending:
+        event.wait(max(0.0, deadline - time.monotonic()))
+    # Evaluations queued by other workers
+    return poll_session(
+        session_id,
+        lambda s: not any(slot_in_progress(slot) for slot in answer_slots(s)),
+        max(0.0, deadline - time.monotonic()),
+    )
+
+
+def submission_response(slot, replayed=False):
+    return {
+        "question_index": slot["question_index"],
+        "status": slot.get("status", "done"),
+        "transcript": slot["answer"],
+        "evaluation": slot["evaluation"],
+        "provisional": slot.get("provisional"),
+        "mode": slot.get("mode", INTERVIEW_MODE),
+        "replayed": replayed,
+    }
+
+
+def still_processing():
+    return jsonify({"error": "An identical submission is still being processed"}), 409
+
+
+# =========================
+# Running aggregate + final assessment
+# =========================
+FINAL_ASSESSMENT_REFINE = os.getenv("FINAL_ASSESSMENT_REFINE", "1") == "1"
+assessment_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="assessment")
+
+
+def mark_pending(session_id, q_idx, answer, provisional=None, mode=INTERVIEW_MODE, fingerprint=None,
+                 idempotency_key=None):
+    """Put a pending slot in place for an answer whose evaluation runs in the background."""
+    slot = {
+        "question_index": q_idx,
+        "status": "pending",
+        "submission_id": str(uuid.uuid4()),
+        "answer": answer,
+        "evaluation": None,
+        "provisional": provisional,
+        "mode": mode,
+        "fingerprint": fingerprint,
+        "idempotency_key": idempotency_key,
+        "submitted_at": datetime.utcnow().isoformat(),
+        "pending_since": time.time(),
+    }
+    with active_sessions.edit(session_id) as session:
+        previous = answer_slots(session)[q_idx]
+        session["slots"][q_idx] = slot
+        if slot_done(previous):
+            # The replaced evaluation leaves the aggregate now, not when the new one lands
+            session["results_version"] = session.get("results_version", 0) + 1
+            session["aggregate"] = exp2.build_interview_aggregate(answered_results(session)[2])
+            refresh_final_assessment(session)
+    return slot
+
+
+def record_evaluation(session_id, q_idx, answer, evaluation, provisional=None, mode=INTERVIEW_MODE,
+                      fingerprint=None, idempotency_key=None, submission_id=None):
+    """Store an answer in its question's slot and fold it into the session's running aggregate.
+
+    `submission_id` ties a background evaluation to the pending slot it was
+    started for; if that slot has been replaced since, the result is dropped.
+    """
+    with active_sessions.edit(session_id) as session:
+        slots = answer_slots(session)
+        current = slots[q_idx]
+        if submission_id is not None and (current is None or current.get("submission_id") != submission_id):
+            print(f"↩️ Dropping stale evaluation for question {q_idx}")
+            return current
+        slot = {
+            "question_index": q_idx,
+            "status": "done",
+            "submission_id": submission_id or str(uuid.uuid4()),
+            "answer": answer,
+            "evaluation": evaluation,
+            "provisional": provisional,
+            "mode": mode,
+            "fingerprint": fingerprint,
+            "idempotency_key": idempotency_key,
+            "submitted_at": current["submitted_at"] if submission_id else datetime.utcnow().isoformat(),
+        }
+        slots[q_idx] = slot
+        if idempotency_key:
+            session.setdefault("idempotency_keys", {})[idempotency_key] = q_idx
+        session["results_version"] = session.get("results_version", 0) + 1
+
+        if slot_done(current):
+            # A changed answer to an already answered question: its old evaluation must leave the aggregate
+            session["aggregate"] = exp2.build_interview_aggregate(answered_results(session)[2])
+        else:
+            aggregate = session.get("aggregate") or exp2.new_interview_aggregate()
+            session["aggregate"] = exp2.update_interview_aggregate(aggregate, evaluation)
+        refresh_final_assessment(session)
+    return slot
+
+
+def refresh_final_assessment(session):
+    """Recompute the local final assessment; after the last answer, refine it with Gemini in the background.
+
+    Call it inside active_sessions.edit() for this session.
+    """
+    aggregate = session.get("aggregate") or exp2.new_interview_aggregate()
+    session["final_assessment"] = exp2.local_final_assessment(aggregate)
+    session["final_assessment_source"] = "local"
+    version = session.get("results_version", 0)
+    if not FINAL_ASSESSMENT_REFINE or session.get("mode") == PRACTICE_MODE \
+            or not all(slot_done(slot) for slot in answer_slots(session)):
+        return
+    if session.get("refinement_scheduled_for") == version:
+        return
+    session["refinement_scheduled_for"] = version
+    session_id = session["session_id"]
+    evaluations = answered_results(session)[2]
+    resume_ctx = session.get("resume_digest") or session.get("resume_text", "")
+
+    def run():
+        try:
+            refined = exp2.generate_final_interview_assessment(evaluations, resume_ctx, fallback=False)
+        except Exception as e:
+            print("⚠️ final assessment refinement failed:", e)
+            return
+        if refined is None:
+            return
+        # Discard the result if answers changed while Gemini was working
+        try:
+            with active_sessions.edit(session_id) as current:
+                if current.get("results_version", 0) == version:
+                    current["final_assessment"] = refined
+                    current["final_assessment_source"] = "gemini"
+        except KeyError:
+            pass
+
+    assessment_executor.submit(run)
+
+
 # =========================
 # Endpoint: submit answer
 # =========================
+def evaluate_submission(session, q_idx, answer, ans_type="text", mode=INTERVIEW_MODE, provisional=None):
+    """Provisional local score plus the stored evaluation (Gemini unless in practice mode)."""
+    question = session["questions"][q_idx]
+    resume_ctx = session.get("resume_digest") or session.get("resume_text", "")
+    key_points = key_points_for(session, q_idx)
+    if provisional is None:
+        provisional = exp2.provisional_score(question, answer, key_points, ans_type)
+
+    # Route to code evaluator or normal evaluator
+    if mode == PRACTICE_MODE:
+        evaluation = exp2.provisional_evaluation(question, answer, key_points, ans_type, provisional)
+    elif ans_type == "code":
+        try:
+            evaluation = exp2.evaluate_code_answer(question, answer, resume_ctx)
+        except Exception as e:
+            print("⚠️ evaluate_code_answer failed:", e)
+            # fallback: try enhanced_evaluate_answer or wrap fallback
+            try:
+                evaluation = exp2.enhanced_evaluate_answer(question, answer, resume_ctx)
+            except Exception as e2:
+                print("⚠️ fallback evaluator also failed:", e2)
+                evaluation = exp2.provisional_evaluation(question, answer, key_points, ans_type, provisional)
+    else:
+        try:
+            evaluation = exp2.enhanced_evaluate_answer(question, answer, resume_ctx)
+        except Exception as e:
+            print("⚠️ enhanced_evaluate_answer failed:", e)
+            try:
+                evaluation = exp2.evaluate_answer(answer)
+            except Exception as e2:
+                print("⚠️ evaluate_answer fallback failed:", e2)
+                evaluation = exp2.provisional_evaluation(question, answer, key_points, ans_type, provisional)
+
+    # Normalize evaluation to dict (safety)
+    return normalize_evaluation(evaluation), provisional
+
+
+def run_submission(session, q_idx, answer, ans_type, mode, fingerprint, key, audio_path=None,
+                   provisional=None, submission_id=None):
+    """Transcribe (audio only), evaluate and store one answer. Returns its slot."""
+    if audio_path is not None:
+        # Transcribe audio (exp2 helper)
+        try:
+            answer = exp2.transcribe_with_whisper(str(audio_path))
+        except Exception as e:
+            print("⚠️ transcribe_with_whisper failed:", e)
+            answer = ""
+    evaluation, provisional = evaluate_submission(session, q_idx, answer, ans_type, mode, provisional)
+    return record_evaluation(session["session_id"], q_idx, answer, evaluation, provisional, mode, fingerprint, key,
+                             submission_id)
+
+
+def submit_in_background(session, q_idx, answer, ans_type, mode, fingerprint, key, token, audio_path=None):
+    """Queue the evaluation on evaluation_executor and return the pending slot."""
+    provisional = None
+    if audio_path is None:
+        question = session["questions"][q_idx]
+        provisional = exp2.provisional_score(question, answer, key_points_for(session, q_idx), ans_type)
+    slot = mark_pending(session["session_id"], q_idx, answer, provisional, mode, fingerprint, key)
+
+    def run():
+        try:
+            run_submission(session, q_idx, answer, ans_type, mode, fingerprint, key, audio_path,
+                           provisional, slot["submission_id"])
+        except Exception as e:
+            print(f"❌ background evaluation of question {q_idx} failed:", e)
+            try:
+                with active_sessions.edit(session["session_id"]) as current:
+                    pending = answer_slots(current)[q_idx]
+                    if pending is not None and pending.get("submission_id") == slot["submission_id"]:
+                        current["slots"][q_idx] = None  # let the client resubmit
+            except KeyError:
+                pass
+        finally:
+            release_submission(token)
+
+    try:
+        evaluation_executor.submit(run)
+    except Exception:
+        release_submission(token)
+        raise
+    return slot
+
+
+def pending_response(session_id, q_idx):
+    session = active_sessions.get(session_id) or {}
+    slot = answer_slots(session)[q_idx] if session else None
+    if slot is not None and slot.get("status") == "pending":
+        payload = submission_response(slot)
+    else:  # an identical synchronous submission holds the claim
+        payload = {"question_index": q_idx, "status": "pending", "provisional": None}
+    payload["status_url"] = f"/api/answers-status/{session_id}"
+    return jsonify(payload), 202
+
+
 @app.route("/api/submit-answer", methods=["POST"])
 def submit_answer():
     """
     Accepts either:
-    - JSON: { session_id, question_index, answer, type: "text"|"code" }
-    - multipart/form-data: session_id, question_index, audio=file
+    - JSON: { session_id, question_index, answer, type: "text"|"code", mode?: "interview"|"practice",
+      idempotency_key?, async? }
+    - multipart/form-data: session_id, question_index, audio=file, mode?, idempotency_key?, async?
+
+    Each question has one evaluation slot. A retry (same Idempotency-Key
+    header / idempotency_key, or the same answer to the same question)
+    returns the stored result with `replayed: true` and skips Whisper and
+    Gemini; a different answer to an answered question replaces its slot.
+
+    With `async` (or `Prefer: respond-async`) the answer is queued and the
+    response is 202 with status "pending"; answers to several questions can
+    then be graded in parallel. Poll /api/answers-status/<session_id>.
+
+    The response carries `provisional`: an instant local score and key-point
+    coverage. In practice mode that local result is the evaluation and
+    Gemini is not called.
     """
     try:
+        fields = request.get_json() if request.is_json else request.form
+        session_id = fields.get("session_id")
+        session = wait_for_resume(session_id) if session_id else None
+        if session is None:
+            return jsonify({"error": "Invalid or missing session_id"}), 400
+
+        try:
+            q_idx = int(fields.get("question_index", 0))
+        except Exception:
+            q_idx = 0
+
+        # validate question index
+        questions = session.get("questions", [])
+        if q_idx < 0 or q_idx >= len(questions):
+            return jsonify({"error": "Invalid question_index"}), 400
+
+        mode = answer_mode(session, fields.get("mode"))
+        key = request_idempotency_key(fields)
+        run_async = request_wants_async(fields)
+
         # JSON path (text/code)
         if request.is_json:
-            data = request.get_json()
-            session_id = data.get("session_id")
-            try:
-                q_idx = int(data.get("question_index", 0))
-            except Exception:
-                q_idx = 0
-            answer = data.get("answer", "") or ""
-            ans_type = data.get("type", "text")
+            answer = fields.get("answer", "") or ""
+            ans_type = fields.get("type", "text")
+            fingerprint = answer_fingerprint(ans_type, answer)
+        # multipart/form-data path (audio upload)
+        else:
+            if "audio" not in request.files:
+                return jsonify({"error": "No audio uploaded"}), 400
+            audio_file = request.files["audio"]
+            answer, ans_type = None, "text"
+            fingerprint = answer_fingerprint("audio", audio_bytes=audio_file.read())
+            audio_file.stream.seek(0)
 
-            if not session_id or session_id not in active_sessions:
-                return jsonify({"error": "Invalid or missing session_id"}), 400
+        stored, token = claim_submission(session_id, q_idx, key, fingerprint, wait=not run_async)
+        if stored is not None:
+            return jsonify(submission_response(stored, replayed=True))
+        if token is None:
+            return pending_response(session_id, q_idx) if run_async else still_processing()
 
-            session = active_sessions[session_id]
+        try:
+            audio_path = None
+            if answer is None:
+                audio_path = save_uploaded_file(audio_file, UPLOAD_DIR, f"{uuid.uuid4()}_{audio_file.filename}")
+            if run_async:
+                submit_in_background(session, q_idx, answer, ans_type, mode, fingerprint, key, token, audio_path)
+                return pending_response(session_id, q_idx)
+            slot = run_submission(session, q_idx, answer, ans_type, mode, fingerprint, key, audio_path)
+        except Exception:
+            release_submission(token)
+            raise
+        release_submission(token)
+        return jsonify(submission_response(slot))
 
-            # validate question index
-            questions = session.get("questions", [])
-            if q_idx < 0 or q_idx >= len(questions):
-                return jsonify({"error": "Invalid question_index"}), 400
+    except Exception as e:
+        print("❌ submit-answer error:", e)
+        return jsonify({"error": str(e)}), 500
 
-            question = questions[q_idx]
-            resume_ctx = session.get("resume_text", "")
 
-            # Route to code evaluator or normal evaluator
-            if ans_type == "code":
-                try:
-                    eval_result = exp2.evaluate_code_answer(question, answer, resume_ctx)
-                except Exception as e:
-                    print("⚠️ evaluate_code_answer failed:", e)
-                    # fallback: try enhanced_evaluate_answer or wrap fallback
-                    try:
-                        eval_result = exp2.enhanced_evaluate_answer(question, answer, resume_ctx)
-                    except Exception as e2:
-                        print("⚠️ fallback evaluator also failed:", e2)
-                        eval_result = {
-                            "overall_score": 50,
-                            "category_scores": {},
-                            "strengths": [],
-                            "weaknesses": ["Evaluation failed"],
-                            "detailed_feedback": str(e2)
-                        }
-            else:
-                try:
-                    eval_result = exp2.enhanced_evaluate_answer(question, answer, resume_ctx)
-                except Exception as e:
-                    print("⚠️ enhanced_evaluate_answer failed:", e)
-                    try:
-                        eval_result = exp2.evaluate_answer(answer)
-                    except Exception as e2:
-                        print("⚠️ evaluate_answer fallback failed:", e2)
-                        eval_result = {
-                            "overall_score": 50,
-                            "category_scores": {},
-                            "strengths": [],
-                            "weaknesses": ["Evaluation failed"],
-                            "detailed_feedback": str(e2)
-                        }
-
-            # Normalize evaluation to dict (safety)
-            eval_result = normalize_evaluation(eval_result)
-
-            # store
-            session["answers"].append(answer)
-            session["evaluations"].append(eval_result)
+# =========================
+# Endpoint: submit answer (chunked audio)
+# =========================
+# Audio answers transcribed segment by segment while they are being recorded
+answer_streams = chunked_transcription.ChunkedTranscriber(exp2.transcribe_with_whisper)
+STREAM_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
 
-            return jsonify({
-                "transcript": answer,
-                "evaluation": eval_result
-            })
 
-        # multipart/form-data path (audio upload)
+@app.route("/api/submit-answer/chunk", methods=["POST"])
+def submit_answer_chunk():
+    """
+    Chunked audio variant of /api/submit-answer, posted while the candidate speaks.
+
+    multipart/form-data: session_id, question_index, stream_id (chosen by the
+    client, [A-Za-z0-9_-]), seq (0, 1, 2, ...), audio=file, final?, and on the
+    final chunk mode?, idempotency_key?, async?
+
+    The chunks are the consecutive pieces of one recording (MediaRecorder
+    with a timeslice). Each one returns 202 at once with the transcript so
+    far; segments are transcribed in the background as audio accumulates.
+    The chunk with `final` set (its audio may be left out) waits for any
+    chunk still in flight, transcribes the rest and then behaves exactly like
+    an audio answer to /api/submit-answer, with the same response.
+    """
+    try:
+        fields = request.form
+        session_id = fields.get("session_id")
+        session = active_sessions.get(session_id) if session_id else None
+        if session is None:
+            return jsonify({"error": "Invalid or missing session_id"}), 400
+
+        try:
+            q_idx = int(fields.get("question_index", 0))
+            seq = int(fields.get("seq", ""))
+        except ValueError:
+            return jsonify({"error": "question_index and seq must be integers"}), 400
+        stream_id = fields.get("stream_id", "")
+        if not STREAM_ID_RE.match(stream_id) or seq < 0:
+            return jsonify({"error": "Invalid stream_id or seq"}), 400
+        if q_idx < 0 or q_idx >= len(session.get("questions", [])):
+            return jsonify({"error": "Invalid question_index"}), 400
+
+        final = str(fields.get("final", "")).strip().lower() in ("1", "true", "yes")
+        stream_key = f"{session_id}-{q_idx}-{stream_id}"
+        audio_file = request.files.get("audio")
+        if audio_file is not None:
+            answer_streams.add_chunk(stream_key, seq, audio_file.read(), final)
+        elif not final:
+            return jsonify({"error": "No audio uploaded"}), 400
+        if not final:
+            return jsonify(answer_streams.status(stream_key)), 202
+
+        last_seq = seq if audio_file is not None else seq - 1
+        try:
+            stream = answer_streams.finish(stream_key, last_seq)
+        except chunked_transcription.ChunkStreamError as e:
+            return jsonify({"error": str(e)}), 400
+
+        session = wait_for_resume(session_id)
+        if session is None:
+            return jsonify({"error": "Invalid or missing session_id"}), 400
+        mode = answer_mode(session, fields.get("mode"))
+        key = request_idempotency_key(fields)
+        run_async = request_wants_async(fields)
+        answer = stream["transcript"]
+        fingerprint = answer_fingerprint("audio", stream["audio_sha256"])
+
+        stored, token = claim_submission(session_id, q_idx, key, fingerprint, wait=not run_async)
+        if stored is not None:
+            return jsonify(submission_response(stored, replayed=True))
+        if token is None:
+            return pending_response(session_id, q_idx) if run_async else still_processing()
+
+        try:
+            if run_async:
+                submit_in_background(session, q_idx, answer, "text", mode, fingerprint, key, token)
+                return pending_response(session_id, q_idx)
+            slot = run_submission(session, q_idx, answer, "text", mode, fingerprint, key)
+        except Exception:
+            release_submission(token)
+            raise
+        release_submission(token)
+        return jsonify(submission_response(slot))
+
+    except Exception as e:
+        print("❌ submit-answer chunk error:", e)
+        return jsonify({"error": str(e)}), 500
+
+
+# =========================
+# Endpoint: answers status
+# =========================
+@app.route("/api/answers-status/<session_id>", methods=["GET"])
+def answers_status(session_id):
+    """Per-question state of a session's answers: "unanswered", "pending" or "done" (with its evaluation)."""
+    session = active_sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Invalid session"}), 400
+    slots = answer_slots(session)
+    answers = []
+    for q_idx, slot in enumerate(slots):
+        if slot is None:
+            answers.append({"question_index": q_idx, "status": "unanswered"})
         else:
-            session_id = request.form.get("session_id")
-            if not session_id or session_id not in active_sessions:
-                return jsonify({"error": "Invalid or missing session_id"}), 400
+            answers.append(submission_response(slot))
+    pending = [a["question_index"] for a in answers if a["status"] == "pending"]
+    return jsonify({
+        "session_id": session_id,
+        "question_count": len(slots),
+        "answered": [a["question_index"] for a in answers if a["status"] == "done"],
+        "pending": pending,
+        "complete": all(a["status"] == "done" for a in answers),
+        "answers": answers,
+    })
+
+
+# ==================================
+# Endpoint: submit answer (streaming)
+# ==================================
+def sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+def sse_response(events):
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-            try:
-                q_idx = int(request.form.get("question_index", 0))
-            except Exception:
-                q_idx = 0
 
-            session = active_sessions[session_id]
-            questions = session.get("questions", [])
-            if q_idx < 0 or q_idx >= len(questions):
-                return jsonify({"error": "Invalid question_index"}), 400
+@app.route("/api/submit-answer/stream", methods=["POST"])
+def submit_answer_stream():
+    """
+    Server-Sent Events variant of /api/submit-answer. Same inputs; emits
+    `transcript`, `provisional` (instant local score), `score`, `strengths`,
+    `weaknesses`, `feedback`, `explanation_delta` and finally `evaluation` (the normalized result that
+    is also stored in the session), then `done`. A repeated submission gets
+    `transcript`, `provisional` and `evaluation` (with `replayed: true`) straight from its slot.
+    """
+    try:
+        if request.is_json:
+            fields = request.get_json()
+            answer = fields.get("answer", "") or ""
+            ans_type = fields.get("type", "text")
+        else:
+            fields = request.form
+            answer = None
+            ans_type = "text"
+        session_id = fields.get("session_id")
+
+        session = wait_for_resume(session_id) if session_id else None
+        if session is None:
+            return jsonify({"error": "Invalid or missing session_id"}), 400
+        try:
+            q_idx = int(fields.get("question_index", 0))
+        except Exception:
+            q_idx = 0
 
+        questions = session.get("questions", [])
+        if q_idx < 0 or q_idx >= len(questions):
+            return jsonify({"error": "Invalid question_index"}), 400
+
+        mode = answer_mode(session, fields.get("mode"))
+        key = request_idempotency_key(fields)
+        if answer is None:
             if "audio" not in request.files:
                 return jsonify({"error": "No audio uploaded"}), 400
-
             audio_file = request.files["audio"]
-            out_path = save_uploaded_file(audio_file, UPLOAD_DIR, f"{uuid.uuid4()}_{audio_file.filename}")
+            fingerprint = answer_fingerprint("audio", audio_bytes=audio_file.read())
+            audio_file.stream.seek(0)
+        else:
+            fingerprint = answer_fingerprint(ans_type, answer)
+
+        stored, token = claim_submission(session_id, q_idx, key, fingerprint)
+        if stored is not None:
+            replay = submission_response(stored, replayed=True)
+
+            def replay_events():
+                yield sse_event("transcript", {"transcript": replay["transcript"]})
+                if replay["provisional"] is not None:
+                    yield sse_event("provisional", dict(replay["provisional"], mode=replay["mode"]))
+                yield sse_event("evaluation", replay)
+                yield sse_event("done", {})
+
+            return sse_response(replay_events())
+        if token is None:
+            return still_processing()
+
+        # Audio is saved now; transcription happens inside the stream so the
+        # client gets the transcript event as soon as Whisper is done
+        audio_path = None
+        try:
+            if answer is None:
+                audio_path = save_uploaded_file(audio_file, UPLOAD_DIR, f"{uuid.uuid4()}_{audio_file.filename}")
+        except Exception:
+            release_submission(token)
+            raise
 
-            # Transcribe audio (exp2 helper)
-            try:
-                transcript = exp2.transcribe_with_whisper(str(out_path))
-            except Exception as e:
-                print("⚠️ transcribe_with_whisper failed:", e)
-                transcript = ""
+        question = questions[q_idx]
+        resume_ctx = session.get("resume_digest") or session.get("resume_text", "")
+        key_points = key_points_for(session, q_idx)
+    except Exception as e:
+        print("❌ submit-answer/stream error:", e)
+        return jsonify({"error": str(e)}), 500
 
-            # Evaluate using enhanced evaluator (question context + resume)
-            question = questions[q_idx]
-            resume_ctx = session.get("resume_text", "")
+    def generate():
+        slot = None
+        try:
+            transcript = answer
+            if audio_path is not None:
+                try:
+                    transcript = exp2.transcribe_with_whisper(str(audio_path))
+                except Exception as e:
+                    print("⚠️ transcribe_with_whisper failed:", e)
+                    transcript = ""
+            yield sse_event("transcript", {"transcript": transcript})
+            provisional = exp2.provisional_score(question, transcript, key_points, ans_type)
+            yield sse_event("provisional", dict(provisional, mode=mode))
+
+            if mode == PRACTICE_MODE:
+                events = iter([("evaluation", exp2.provisional_evaluation(
+                    question, transcript, key_points, ans_type, provisional))])
+            else:
+                events = exp2.stream_evaluate_answer(question, transcript, resume_ctx, answer_type=ans_type)
+            evaluation = None
             try:
-                evaluation = exp2.enhanced_evaluate_answer(question, transcript, resume_ctx)
+                for event, payload in events:
+                    if event == "evaluation":
+                        evaluation = payload
+                        break
+                    yield sse_event(event, payload)
             except Exception as e:
-                print("⚠️ enhanced_evaluate_answer failed:", e)
-                try:
-                    evaluation = exp2.evaluate_answer(transcript)
-                except Exception as e2:
-                    print("⚠️ fallback evaluate_answer failed:", e2)
-                    evaluation = {
-                        "overall_score": 0,
-                        "strengths": [],
-                        "weaknesses": ["Evaluation failed"],
-                        "detailed_feedback": str(e2)
-                    }
-
-            # Normalize and store
-            evaluation = normalize_evaluation(evaluation)
-            session["answers"].append(transcript)
-            session["evaluations"].append(evaluation)
+                print("⚠️ stream_evaluate_answer failed:", e)
+            finally:
+                # Finish the evaluation even if the client went away mid-stream,
+                # so the session never ends up without a stored result
+                if evaluation is None:
+                    try:
+                        for event, payload in events:
+                            if event == "evaluation":
+                                evaluation = payload
+                    except Exception as e:
+                        print("⚠️ stream_evaluate_answer failed:", e)
+                evaluation = normalize_evaluation(evaluation if evaluation is not None else "")
+                slot = record_evaluation(session_id, q_idx, transcript, evaluation, provisional, mode, fingerprint, key)
+        finally:
+            release_submission(token)
+
+        yield sse_event("evaluation", submission_response(slot))
+        yield sse_event("done", {})
+
+    response = sse_response(generate())
+    # Frees the claim even if the client disconnects before the stream starts
+    response.call_on_close(lambda: release_submission(token))
+    return response
 
-            return jsonify({
-                "transcript": transcript,
-                "evaluation": evaluation
-            })
+# =========================
+# Endpoint: re-score session
+# =========================
+@app.route("/api/rescore-session", methods=["POST"])
+def rescore_session():
+    """Re-evaluate every stored answer of a session with batched LLM calls."""
+    try:
+        data = request.get_json() or {}
+        session_id = data.get("session_id")
+        session = wait_for_evaluations(session_id) if session_id else None
+        if session is None:
+            return jsonify({"error": "Invalid session"}), 400
+
+        answered = [slot for slot in answer_slots(session) if slot_done(slot)]
+        pairs = [(session["questions"][slot["question_index"]], slot["answer"]) for slot in answered]
+        if not pairs:
+            return jsonify({"error": "No answers to re-score"}), 400
+
+        resume_ctx = session.get("resume_digest") or session.get("resume_text", "")
+        evaluations = [normalize_evaluation(ev) for ev in exp2.batch_evaluate_answers(pairs, resume_ctx)]
+        with active_sessions.edit(session_id) as session:
+            slots = answer_slots(session)
+            for slot, evaluation in zip(answered, evaluations):
+                # Slots replaced by a newer answer while the batch ran keep their new evaluation
+                current = slots[slot["question_index"]]
+                if current is not None and current.get("submission_id") == slot.get("submission_id"):
+                    current["evaluation"] = evaluation
+            session["results_version"] = session.get("results_version", 0) + 1
+            session["aggregate"] = exp2.build_interview_aggregate(answered_results(session)[2])
+            refresh_final_assessment(session)
+
+        return jsonify({"evaluations": answered_results(session)[2]})
 
     except Exception as e:
-        print("❌ submit-answer error:", e)
+        print("❌ rescore-session error:", e)
         return jsonify({"error": str(e)}), 500
 
 # ===========================
@@ -356,10 +1253,10 @@ def start_monitoring():
         print(f"📷 Monitoring started for session: {session_id}, provisional: {provisional_report}")
 
         # Store for frontend polling
-        active_sessions[session_id]["monitoring"] = {
+        active_sessions.update(session_id, monitoring={
             "duration": duration,
             "report_path": provisional_report
-        }
+        })
 
         # Return the provisional PDF path so frontend can poll
         return jsonify({
@@ -380,10 +1277,10 @@ def check_monitoring_status():
         data = request.get_json()
         session_id = data.get("session_id")
 
-        if session_id not in active_sessions:
+        session = active_sessions.get(session_id)
+        if session is None:
             return jsonify({"error": "Invalid session"}), 400
 
-        session = active_sessions[session_id]
         m = session.get("monitoring", {})
 
         provisional_path = m.get("report_path")
@@ -394,7 +1291,7 @@ def check_monitoring_status():
             # ⭐ NEW: Upload monitoring report to Supabase
             upload_info = store_report_and_get_url(provisional_path, session_id)
 
-            session["monitoring_report"] = upload_info  # store cloud info
+            active_sessions.update(session_id, monitoring_report=upload_info)  # store cloud info
 
             return jsonify({
                 "ready": True,
@@ -419,15 +1316,22 @@ def ats_check():
         session_id = data.get("session_id")
         job_description = data.get("job_description", "")
 
-        if not session_id or session_id not in active_sessions:
+        session = wait_for_resume(session_id, text_only=True) if session_id else None
+        if session is None:
             return jsonify({"error": "Invalid session_id"}), 400
 
-        session = active_sessions[session_id]
         resume_text = session.get("resume_text", "")
 
-        # Call analyzer in exp2
+        # A speculative analysis for the same resume + job description may have run (or be running)
+        ats_result = speculative_ats_result(session_id, exp2.ats_cache_key(resume_text, job_description))
+        cached = ats_result is not None
+
+        # Call analyzer in exp2 (answered from exp2.ats_cache when already analyzed)
         try:
-            ats_result = exp2.analyze_resume_for_ats(resume_text, job_description)
+            if ats_result is None:
+                ats_result, cached = exp2.cached_ats_analysis(
+                    resume_text, job_description, resume_digest=session.get("resume_digest")
+                )
         except Exception as e:
             print("⚠️ analyze_resume_for_ats failed:", e)
             ats_result = {
@@ -442,9 +1346,9 @@ def ats_check():
             }
 
         # store in session for later report generation
-        session["ats_result"] = ats_result
+        active_sessions.update(session_id, ats_result=ats_result)
 
-        return jsonify({"ats_result": ats_result})
+        return jsonify({"ats_result": ats_result, "cached": cached})
 
     except Exception as e:
         print("❌ ats-check error:", e)
@@ -461,33 +1365,27 @@ def generate_report():
         session_id = data.get("session_id")
         if session_id not in active_sessions:
             return jsonify({"error": "Invalid session"}), 400
+        wait_for_resume(session_id)
 
-        session = active_sessions[session_id]
+        # Answers submitted with `async` may still be grading; the report should include them
+        session = wait_for_evaluations(session_id)
+        if session is None:
+            return jsonify({"error": "Invalid session"}), 400
 
-        questions = session.get("questions", [])
-        answers = session.get("answers", [])
-        evaluations = session.get("evaluations", [])
+        # Answered questions only, so questions, answers and evaluations line up in the report
+        questions, answers, evaluations = answered_results(session)
         resume_text = session.get("resume_text", "")
 
-        # ✅ Build a minimal final_assessment dict so PDF has data
-        final_assessment = {
-            "final_recommendation": "Promising candidate, recommended for further rounds.",
-            "confidence_level": 8,
-            "overall_assessment": "The candidate performed well overall. Strengths outweigh weaknesses.",
-            "key_strengths": ["Good technical foundation", "Clear communication"],
-            "development_areas": ["Handle edge cases better", "Optimize code efficiency"],
-            "technical_level": "Intermediate to Advanced",
-            "communication_rating": 8,
-            "problem_solving_rating": 7,
-            "role_fit": "Strong fit for software engineering roles requiring problem-solving.",
-            "next_steps": "Schedule a live technical round for deeper evaluation."
-        }
+        # ✅ Final assessment is kept up to date as answers land (see record_evaluation)
+        aggregate = session.get("aggregate") or exp2.build_interview_aggregate(evaluations)
+        final_assessment = session.get("final_assessment") or exp2.local_final_assessment(aggregate)
 
         # ✅ Save PDF to repo-root /reports folder
         report_path = exp2.create_comprehensive_report(
             questions, answers, evaluations, final_assessment, resume_text,
         )
 
+        meta = {"storage": "local", "path": report_path, "url": None}
         if supabase:  # only if Supabase client configured
             try:
                 storage_key = f"{session_id}/{os.path.basename(report_path)}"
@@ -510,13 +1408,17 @@ def generate_report():
                 print("⚠️ Supabase upload failed:", e)
 
 
-        session["report_path"] = report_path
-        session["report_meta"] = meta
+        active_sessions.update(session_id, report_path=report_path, report_meta=meta)
 
         return jsonify({
             "report_path": report_path,
             "report_url": meta.get("url"),
-            "evaluations": evaluations
+            "questions": questions,
+            "answers": answers,
+            "evaluations": evaluations,
+            "final_assessment": final_assessment,
+            "final_assessment_source": session.get("final_assessment_source", "local"),
+            "summary": exp2.summarize_interview_aggregate(aggregate),
         })
 
     except Exception as e:
@@ -530,10 +1432,10 @@ def generate_report():
 @app.route("/api/download-report/<session_id>", methods=["GET"])
 def download_report(session_id):
     try:
-        if session_id not in active_sessions:
+        session = active_sessions.get(session_id)
+        if session is None:
             return jsonify({"error": "Invalid session"}), 400
 
-        session = active_sessions[session_id]
         meta = session.get("report_meta") or {}
         report_path = session.get("report_path")
 
@@ -560,10 +1462,10 @@ def generate_ats_report():
     try:
         data = request.get_json()
         session_id = data.get("session_id")
-        if session_id not in active_sessions:
+        session = active_sessions.get(session_id)
+        if session is None:
             return jsonify({"error": "Invalid session"}), 400
 
-        session = active_sessions[session_id]
         ats_result = session.get("ats_result")
         
         if not ats_result:
@@ -602,8 +1504,7 @@ def generate_ats_report():
             except Exception as e:
                 print("⚠️ Supabase upload failed for ATS report:", e)
 
-        session["ats_report_path"] = report_path
-        session["ats_report_meta"] = meta
+        active_sessions.update(session_id, ats_report_path=report_path, ats_report_meta=meta)
 
         return jsonify({
             "report_path": report_path,
@@ -622,10 +1523,10 @@ def generate_ats_report():
 @app.route("/api/download-ats-report/<session_id>", methods=["GET"])
 def download_ats_report(session_id):
     try:
-        if session_id not in active_sessions:
+        session = active_sessions.get(session_id)
+        if session is None:
             return jsonify({"error": "Invalid session"}), 400
 
-        session = active_sessions[session_id]
         meta = session.get("ats_report_meta") or {}
         report_path = session.get("ats_report_path")
 
@@ -0,0 +1,189 @@
+# benchmark_stt.py
+"""Compare speech-to-text engines on a folder of sample clips.
+
+Reports load time, real-time factor (RTF: seconds of processing per second
+of audio; below 1 is faster than real time), word error rate against
+reference transcripts and the share of audio trimmed as silence (run
+again with --no-vad to see what trimming saves).
+
+A clip is any audio file ffmpeg can read (.wav, .webm, .mp3, .m4a, .ogg,
+.flac). Its reference transcript sits next to it with the same name and a
+.txt extension. A clip without one counts towards RTF only. Candidate
+recordings are personal data and are not committed. Record a few answers
+of typical length (30 s - 2 min) into Backend/data/stt_clips (gitignored)
+or point --clips at any folder.
+
+    python benchmark_stt.py
+    python benchmark_stt.py --engines faster-whisper --compute-type int8 --threads 4
+    python benchmark_stt.py --clips /path/to/clips --model base --json
+"""
+import os
+import re
+import sys
+import json
+import time
+import wave
+import argparse
+import subprocess
+
+import stt_engines
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CLIPS_DIR = os.path.join(BASE_DIR, "data", "stt_clips")
+AUDIO_EXTENSIONS = (".wav", ".webm", ".mp3", ".m4a", ".ogg", ".flac")
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def normalize_words(text):
+    """Lowercase words without punctuation, so only real word differences count as errors."""
+    return _WORD_RE.findall((text or "").lower())
+
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance (substitutions + insertions + deletions)."""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,  # deletion
+                current[j - 1] + 1,  # insertion
+                previous[j - 1] + (ref_word != hyp_word),  # substitution
+            )
+        previous = current
+    return previous[-1], len(ref)
+
+
+def audio_duration(path):
+    """Clip length in seconds (wave header for WAV, otherwise decoded with ffmpeg)."""
+    if path.lower().endswith(".wav"):
+        try:
+            with wave.open(path, "rb") as wav:
+                return wav.getnframes() / float(wav.getframerate())
+        except (wave.Error, EOFError):
+            pass  # not plain PCM; let ffmpeg decode it
+    proc = subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", "-i", path, "-f", "s16le", "-ac", "1", "-ar", "16000", "-"],
+        capture_output=True,
+        check=True,
+    )
+    return len(proc.stdout) / (2 * 16000)
+
+
+def find_clips(clips_dir):
+    clips = []
+    for name in sorted(os.listdir(clips_dir)):
+        path = os.path.join(clips_dir, name)
+        if not name.lower().endswith(AUDIO_EXTENSIONS):
+            continue
+        reference_path = os.path.splitext(path)[0] + ".txt"
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path, encoding="utf-8") as f:
+                reference = f.read().strip()
+        clips.append({"name": name, "path": path, "duration": audio_duration(path), "reference": reference})
+    return clips
+
+
+def benchmark_engine(engine, clips, runs=1):
+    started = time.monotonic()
+    engine.load()
+    load_sec = time.monotonic() - started
+
+    # The first call pays one-off costs (allocations, kernel selection); keep it out of the numbers
+    engine.transcribe(clips[0]["path"])
+
+    per_clip, busy_sec, audio_sec, errors, ref_words = [], 0.0, 0.0, 0, 0
+    runs = max(1, runs)
+    for clip in clips:
+        clip_sec = 0.0
+        for _ in range(runs):
+            started = time.monotonic()
+            text = engine.transcribe(clip["path"])
+            clip_sec += time.monotonic() - started
+        busy_sec += clip_sec
+        audio_sec += clip["duration"] * runs
+        entry = {"clip": clip["name"], "duration_sec": round(clip["duration"], 2),
+                 "rtf": round(clip_sec / (clip["duration"] * runs), 3) if clip["duration"] else None,
+                 "text": text}
+        if clip["reference"] is not None:
+            clip_errors, clip_words = word_errors(clip["reference"], text)
+            errors += clip_errors
+            ref_words += clip_words
+            entry["wer"] = round(clip_errors / clip_words, 4) if clip_words else None
+        per_clip.append(entry)
+
+    return {
+        "engine": engine.describe(),
+        "threads": engine.threads,
+        "beam_size": engine.beam_size,
+        "vad": engine.vad,
+        "vad_removed_ratio": engine.stats()["vad_removed_ratio"] if engine.vad else None,
+        "load_sec": round(load_sec, 2),
+        "audio_sec": round(audio_sec, 2),
+        "busy_sec": round(busy_sec, 2),
+        "rtf": round(busy_sec / audio_sec, 3) if audio_sec else None,
+        "wer": round(errors / ref_words, 4) if ref_words else None,
+        "clips": per_clip,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", default=DEFAULT_CLIPS_DIR, help="folder of audio clips with .txt references")
+    parser.add_argument("--engines", default=",".join(stt_engines.ENGINES),
+                        help="comma-separated engine names")
+    parser.add_argument("--model", default=stt_engines.WHISPER_MODEL_NAME)
+    parser.add_argument("--compute-type", default=stt_engines.STT_COMPUTE_TYPE, help="faster-whisper only")
+    parser.add_argument("--threads", type=int, default=stt_engines.STT_THREADS)
+    parser.add_argument("--beam-size", type=int, default=stt_engines.STT_BEAM_SIZE)
+    parser.add_argument("--device", default=stt_engines.STT_DEVICE)
+    parser.add_argument("--no-vad", action="store_true", help="transcribe whole clips without trimming silence")
+    parser.add_argument("--runs", type=int, default=1, help="timed passes over each clip")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="list every clip")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.clips):
+        print(f"❌ No clips folder at {args.clips}. See the docstring of {os.path.basename(__file__)}.")
+        return 1
+    clips = find_clips(args.clips)
+    if not clips:
+        print(f"❌ No audio clips in {args.clips}")
+        return 1
+
+    results = []
+    for name in [n.strip() for n in args.engines.split(",") if n.strip()]:
+        engine_cls = stt_engines.ENGINES.get(name)
+        if engine_cls is None or not engine_cls.available():
+            print(f"⚠️ Skipping {name}: not installed")
+            continue
+        engine = stt_engines.create_engine(
+            name, model_name=args.model, device=args.device, threads=args.threads,
+            beam_size=args.beam_size, compute_type=args.compute_type, vad=not args.no_vad,
+        )
+        results.append(benchmark_engine(engine, clips, args.runs))
+
+    if args.json:
+        print(json.dumps({"clips_dir": args.clips, "results": results}, indent=2))
+        return 0
+
+    total_audio = sum(clip["duration"] for clip in clips)
+    with_reference = sum(1 for clip in clips if clip["reference"] is not None)
+    print(f"\n📊 {len(clips)} clips, {total_audio:.1f}s of audio, {with_reference} with reference transcripts")
+    print(f"{'engine':<36} {'load s':>7} {'RTF':>7} {'WER':>7} {'trimmed':>8}")
+    for result in results:
+        wer = f"{result['wer']:.1%}" if result["wer"] is not None else "-"
+        trimmed = f"{result['vad_removed_ratio']:.1%}" if result["vad_removed_ratio"] is not None else "-"
+        print(f"{result['engine']:<36} {result['load_sec']:>7.2f} {result['rtf']:>7.3f} {wer:>7} {trimmed:>8}")
+        if args.verbose:
+            for clip in result["clips"]:
+                clip_wer = f"{clip['wer']:.1%}" if clip.get("wer") is not None else "-"
+                print(f"   {clip['clip']:<33} {clip['duration_sec']:>6.1f}s {clip['rtf']:>7.3f} {clip_wer:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
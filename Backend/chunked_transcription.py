@@ -0,0 +1,370 @@
+# chunked_transcription.py
+"""Transcribe an audio answer while the candidate is still speaking.
+
+The browser records with a MediaRecorder timeslice and posts each piece as
+soon as it is ready (/api/submit-answer/chunk). The pieces are consecutive
+parts of one recording. Only the first carries the container header, so
+they are appended to one file in order, and the audio decoded so far is
+cut into segments. Once CHUNK_SEGMENT_SEC of new audio has arrived, the
+next segment is transcribed in the background. Each segment starts
+CHUNK_OVERLAP_SEC before the end of the previous one, so a word cut at a
+boundary is heard whole at least once. merge_transcripts then drops the
+words the two segments share. When the last chunk lands only the tail is
+still untranscribed, so evaluation can start almost as soon as the
+candidate stops talking.
+
+Streams are kept on disk in CHUNK_DIR, so the chunks of one answer may
+reach different gunicorn workers. Only one thread at a time works on a
+stream (session_store.SessionLocks, exclusive across processes). Audio is
+decoded with ffmpeg, as Whisper does. Streams that were never finished
+are removed after CHUNK_STREAM_TTL_SEC.
+
+Environment:
+    CHUNK_DIR              where streams are kept (default Backend/data/answer_chunks)
+    CHUNK_SEGMENT_SEC      new audio needed before a segment is transcribed (default 8)
+    CHUNK_OVERLAP_SEC      audio shared by consecutive segments (default 1.5)
+    CHUNK_WAIT_SEC         how long the last chunk waits for missing ones (default 15)
+    CHUNK_STREAM_TTL_SEC   age after which streams are removed (default 3600)
+    CHUNK_WORKERS          background segment transcriptions per worker (default 2)
+"""
+import os
+import re
+import json
+import time
+import wave
+import shutil
+import hashlib
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from session_store import SessionLocks
+
+CHUNK_DIR = os.getenv(
+    "CHUNK_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "answer_chunks"),
+)
+CHUNK_SEGMENT_SEC = float(os.getenv("CHUNK_SEGMENT_SEC", "8"))
+CHUNK_OVERLAP_SEC = float(os.getenv("CHUNK_OVERLAP_SEC", "1.5"))
+CHUNK_WAIT_SEC = float(os.getenv("CHUNK_WAIT_SEC", "15"))
+CHUNK_STREAM_TTL_SEC = float(os.getenv("CHUNK_STREAM_TTL_SEC", "3600"))
+CHUNK_WORKERS = int(os.getenv("CHUNK_WORKERS", "2"))
+
+SAMPLE_RATE = 16000  # what Whisper resamples to anyway
+MIN_TAIL_SEC = 0.3  # a shorter remainder after the last segment is not worth a transcription
+MAX_OVERLAP_WORDS = 12
+PURGE_INTERVAL_SEC = 60
+
+_CHUNK_FILE_RE = re.compile(r"^(\d{6})\.chunk$")
+_WORD_RE = re.compile(r"[\w']+")
+
+
+class ChunkStreamError(ValueError):
+    """A stream is unknown or could not be completed (e.g. chunks never arrived)."""
+
+
+def decode_pcm(path):
+    """16 kHz mono 16-bit PCM of everything ffmpeg can decode from `path`.
+
+    A recording that is still growing ends in a partial frame; ffmpeg
+    reports it but still returns the audio before it.
+    """
+    proc = subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", "-i", path, "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"],
+        capture_output=True,
+    )
+    if proc.returncode != 0 and not proc.stdout:
+        raise ChunkStreamError(f"ffmpeg could not decode {path}: {proc.stderr.decode(errors='ignore').strip()}")
+    return proc.stdout
+
+
+def write_wav(path, pcm):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+
+
+def _normalize(word):
+    return "".join(_WORD_RE.findall(word.lower()))
+
+
+def _same_word(old, new, first, last):
+    """`old` ends the previous transcript, `new` starts the next one.
+
+    The boundary can clip the last word of the previous segment
+    ("intere" / "interesting") or the first word of the overlap
+    ("esting" / "interesting").
+    """
+    if old == new:
+        return bool(old)
+    shorter = min(len(old), len(new))
+    if shorter < 3:
+        return False
+    return (last and new.startswith(old)) or (first and old.endswith(new))
+
+
+def merge_transcripts(previous, new, max_overlap_words=MAX_OVERLAP_WORDS):
+    """Join the transcripts of two overlapping segments, keeping the shared words once.
+
+    Looks for the longest run of words that ends `previous` and starts
+    `new`. Within that run the longer spelling of each word wins, since a
+    clipped word is the shorter one.
+    """
+    old_words, new_words = previous.split(), new.split()
+    if not old_words or not new_words:
+        return " ".join(old_words + new_words)
+    old_norm = [_normalize(w) for w in old_words]
+    new_norm = [_normalize(w) for w in new_words]
+    for k in range(min(len(old_words), len(new_words), max_overlap_words), 0, -1):
+        tail, head = old_norm[-k:], new_norm[:k]
+        if all(_same_word(tail[i], head[i], i == 0, i == k - 1) for i in range(k)):
+            overlap = [new_words[i] if len(head[i]) >= len(tail[i]) else old_words[i - k] for i in range(k)]
+            return " ".join(old_words[:-k] + overlap + new_words[k:])
+    return " ".join(old_words + new_words)
+
+
+class ChunkedTranscriber:
+    """Answer streams on disk: chunks in, overlapping segment transcripts out.
+
+    `transcribe` is called with the path of a WAV segment and returns its
+    text; it may delete the file (exp2.transcribe_with_whisper does).
+    """
+
+    def __init__(self, transcribe, root=CHUNK_DIR, segment_sec=CHUNK_SEGMENT_SEC, overlap_sec=CHUNK_OVERLAP_SEC,
+                 wait_sec=CHUNK_WAIT_SEC, ttl_sec=CHUNK_STREAM_TTL_SEC, workers=CHUNK_WORKERS):
+        self.transcribe = transcribe
+        self.root = root
+        self.segment_sec = float(segment_sec)
+        self.overlap_sec = min(float(overlap_sec), self.segment_sec / 2)
+        self.wait_sec = float(wait_sec)
+        self.ttl_sec = float(ttl_sec)
+        self.locks = SessionLocks(os.path.join(root, "locks"))
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="chunk-transcribe")
+        self._queued = set()  # stream ids with an advance() waiting in this worker's executor
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        self._counters = {"chunks": 0, "segments": 0, "segment_audio_sec": 0.0, "finished": 0,
+                          "tail_audio_sec": 0.0, "errors": 0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    # ---------- files ----------
+    def _dir(self, stream_id):
+        return os.path.join(self.root, stream_id)
+
+    def _load_state(self, stream_id):
+        try:
+            with open(os.path.join(self._dir(stream_id), "state.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self, stream_id, state):
+        path = os.path.join(self._dir(stream_id), "state.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(path + ".tmp", path)
+
+    def _new_state(self, stream_id):
+        return {"stream_id": stream_id, "assembled": 0, "audio_sec": 0.0, "committed_sec": 0.0,
+                "segments": [], "transcript": "", "done": False}
+
+    def _waiting_chunks(self, stream_id, start):
+        """Sequence numbers of the chunks on disk that continue the assembled audio without a gap."""
+        present = set()
+        for name in os.listdir(self._dir(stream_id)):
+            match = _CHUNK_FILE_RE.match(name)
+            if match:
+                present.add(int(match.group(1)))
+        seqs = []
+        while start + len(seqs) in present:
+            seqs.append(start + len(seqs))
+        return seqs
+
+    def _append_chunks(self, stream_id, state):
+        # caller holds the stream lock; returns True if the recording grew
+        stream_dir = self._dir(stream_id)
+        seqs = self._waiting_chunks(stream_id, state["assembled"])
+        if not seqs:
+            return False
+        chunk_paths = [os.path.join(stream_dir, f"{seq:06d}.chunk") for seq in seqs]
+        with open(os.path.join(stream_dir, "audio"), "ab") as audio:
+            for chunk_path in chunk_paths:
+                with open(chunk_path, "rb") as chunk:
+                    shutil.copyfileobj(chunk, audio)
+        state["assembled"] = seqs[-1] + 1
+        self._save_state(stream_id, state)  # before the chunks go, so status() never loses count
+        for chunk_path in chunk_paths:
+            os.remove(chunk_path)
+        return True
+
+    # ---------- public API ----------
+    def add_chunk(self, stream_id, seq, data, final=False):
+        """Store chunk `seq` (0-based) of a stream and transcribe in the background when a segment is due.
+
+        The last chunk (`final`) is only stored; finish() transcribes the rest.
+        """
+        stream_dir = self._dir(stream_id)
+        if seq == 0:
+            self.purge()
+        os.makedirs(stream_dir, exist_ok=True)
+        path = os.path.join(stream_dir, f"{seq:06d}.chunk")
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)  # a retried chunk simply replaces itself
+        self._count("chunks")
+        if final:
+            return
+        with self._lock:
+            if stream_id in self._queued:
+                return
+            self._queued.add(stream_id)
+        self._executor.submit(self._advance_in_background, stream_id)
+
+    def _advance_in_background(self, stream_id):
+        with self._lock:
+            self._queued.discard(stream_id)
+        try:
+            self.advance(stream_id)
+        except Exception as e:
+            self._count("errors")
+            print(f"⚠️ Chunked transcription of {stream_id} failed: {e}")
+
+    def advance(self, stream_id, final=False):
+        """Append the chunks that arrived and transcribe the next segment if one is due.
+
+        With `final`, everything left is transcribed. Returns the stream state.
+        """
+        with self.locks.hold(stream_id):
+            if not os.path.isdir(self._dir(stream_id)):
+                raise ChunkStreamError(f"Unknown audio stream {stream_id}")
+            state = self._load_state(stream_id) or self._new_state(stream_id)
+            if state["done"]:
+                return state
+            grew = self._append_chunks(stream_id, state)
+            if grew or final:
+                audio_path = os.path.join(self._dir(stream_id), "audio")
+                pcm = decode_pcm(audio_path) if os.path.exists(audio_path) else b""
+                state["audio_sec"] = len(pcm) / (2 * SAMPLE_RATE)
+                pending = state["audio_sec"] - state["committed_sec"]
+                if pending >= self.segment_sec or (final and (pending >= MIN_TAIL_SEC or not state["segments"])):
+                    self._transcribe_segment(stream_id, state, pcm, final)
+            self._save_state(stream_id, state)
+            return state
+
+    def _transcribe_segment(self, stream_id, state, pcm, final):
+        # caller holds the stream lock
+        start_sec = max(0.0, state["committed_sec"] - self.overlap_sec) if state["segments"] else 0.0
+        end_sec = state["audio_sec"]
+        start_byte = int(start_sec * SAMPLE_RATE) * 2
+        index = len(state["segments"])
+        segment_path = os.path.join(self._dir(stream_id), f"segment-{index:03d}.wav")
+        write_wav(segment_path, pcm[start_byte:])
+        started = time.monotonic()
+        try:
+            text = (self.transcribe(segment_path) or "").strip()
+        finally:
+            if os.path.exists(segment_path):
+                os.remove(segment_path)
+        state["segments"].append({
+            "index": index,
+            "start_sec": round(start_sec, 2),
+            "end_sec": round(end_sec, 2),
+            "text": text,
+            "transcribe_sec": round(time.monotonic() - started, 2),
+        })
+        state["transcript"] = merge_transcripts(state["transcript"], text)
+        self._count("segments")
+        self._count("segment_audio_sec", end_sec - start_sec)
+        if final:
+            self._count("tail_audio_sec", end_sec - start_sec)
+        state["committed_sec"] = end_sec
+
+    def finish(self, stream_id, last_seq):
+        """Wait for chunks 0..last_seq, transcribe the tail and close the stream.
+
+        Returns the final state: "transcript", "audio_sha256" of the whole
+        recording, and the segments. The audio is deleted; the state stays
+        until the TTL, so a retried last chunk gets the same answer.
+        Raises ChunkStreamError if chunks are still missing after CHUNK_WAIT_SEC.
+        """
+        deadline = time.monotonic() + self.wait_sec
+        while True:
+            state = self._load_state(stream_id)
+            if state is not None and state["done"]:
+                return state
+            assembled = state["assembled"] if state else 0
+            if not os.path.isdir(self._dir(stream_id)):
+                raise ChunkStreamError(f"Unknown audio stream {stream_id}")
+            if assembled + len(self._waiting_chunks(stream_id, assembled)) > last_seq:
+                break
+            if time.monotonic() >= deadline:
+                missing = assembled + len(self._waiting_chunks(stream_id, assembled))
+                raise ChunkStreamError(f"Audio chunk {missing} of stream {stream_id} never arrived")
+            time.sleep(0.1)
+
+        with self.locks.hold(stream_id):
+            state = self.advance(stream_id, final=True)
+            if state["done"]:
+                return state
+            audio_path = os.path.join(self._dir(stream_id), "audio")
+            digest = hashlib.sha256()
+            if os.path.exists(audio_path):
+                with open(audio_path, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(block)
+                os.remove(audio_path)
+            state["audio_sha256"] = digest.hexdigest()
+            state["done"] = True
+            self._save_state(stream_id, state)
+        self._count("finished")
+        print(f"📝 Chunked transcript ({len(state['segments'])} segments, {state['audio_sec']:.1f}s): "
+              f"'{state['transcript']}'")
+        return state
+
+    def status(self, stream_id):
+        state = self._load_state(stream_id) or self._new_state(stream_id)
+        received = state["assembled"]
+        if os.path.isdir(self._dir(stream_id)):
+            received += len(self._waiting_chunks(stream_id, received))
+        return {
+            "stream_id": stream_id,
+            "chunks_received": received,
+            "audio_sec": round(state["audio_sec"], 2),
+            "transcribed_sec": round(state["committed_sec"], 2),
+            "partial_transcript": state["transcript"],
+            "done": state["done"],
+        }
+
+    def purge(self):
+        """Remove streams (finished or abandoned) older than the TTL."""
+        now = time.time()
+        with self._lock:
+            if now - self._last_purge < PURGE_INTERVAL_SEC:
+                return
+            self._last_purge = now
+        if not os.path.isdir(self.root):
+            return
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name == "locks" or not os.path.isdir(path):
+                continue
+            try:
+                if now - os.path.getmtime(path) > self.ttl_sec:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters["queued"] = len(self._queued)
+        counters["segment_audio_sec"] = round(counters["segment_audio_sec"], 2)
+        counters["tail_audio_sec"] = round(counters["tail_audio_sec"], 2)
+        counters["segment_sec"] = self.segment_sec
+        counters["overlap_sec"] = self.overlap_sec
+        return counters
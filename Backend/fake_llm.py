@@ -0,0 +1,345 @@
+# fake_llm.py
+"""Deterministic local stand-in for Gemini, for benchmarking and CI.
+
+Enable with LLM_BACKEND=fake. exp2.call_llm / exp2.stream_llm and
+livevid1.get_gemini_report then never touch the network: prompts are
+classified (questions, evaluation, batch evaluation, code evaluation, ATS,
+final assessment, monitoring summary) and answered with schema-valid output
+that is stable for a given prompt.
+
+Environment:
+    FAKE_LLM_LATENCY      "fixed:MS", "uniform:LO:HI" or "lognormal:MEDIAN_MS:SIGMA"
+    FAKE_LLM_ERROR_RATE   probability (0-1) that a call raises FakeLLMError
+    FAKE_LLM_SEED         seed for latency/error sampling
+    FAKE_LLM_REPLAY_FILE  JSONL of recorded responses to serve by cache key
+    FAKE_LLM_REPLAY_STRICT  "1" -> error on replay miss instead of synthesizing
+    LLM_RECORD_FILE       append real Gemini responses here (JSONL) for replay
+"""
+import os
+import re
+import json
+import math
+import time
+import random
+import hashlib
+import threading
+
+import llm_cache
+
+ENABLED = os.getenv("LLM_BACKEND", "gemini").lower() == "fake"
+LLM_RECORD_FILE = os.getenv("LLM_RECORD_FILE")
+
+
+class FakeLLMError(RuntimeError):
+    """Injected upstream failure."""
+
+
+# ------------------- Configuration -------------------
+def parse_latency_spec(spec):
+    """Parse a latency spec into (kind, params). Values are milliseconds."""
+    spec = (spec or "fixed:0").strip()
+    kind, _, rest = spec.partition(":")
+    params = [float(x) for x in rest.split(":") if x] if rest else []
+    kind = kind.lower()
+    if kind == "fixed" and len(params) == 1:
+        return kind, params
+    if kind == "uniform" and len(params) == 2:
+        return kind, params
+    if kind == "lognormal" and len(params) == 2:
+        return kind, params
+    raise ValueError(f"Invalid FAKE_LLM_LATENCY spec: {spec!r}")
+
+
+class FakeLLMConfig:
+    def __init__(self, latency="fixed:0", error_rate=0.0, seed=0, replay_file=None, replay_strict=False):
+        self.latency = parse_latency_spec(latency)
+        self.error_rate = float(error_rate)
+        self.replay_file = replay_file
+        self.replay_strict = bool(replay_strict)
+        self.rng = random.Random(seed)
+        self.replay = load_replay(replay_file) if replay_file else {}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            latency=os.getenv("FAKE_LLM_LATENCY", "fixed:0"),
+            error_rate=os.getenv("FAKE_LLM_ERROR_RATE", "0"),
+            seed=int(os.getenv("FAKE_LLM_SEED", "0")),
+            replay_file=os.getenv("FAKE_LLM_REPLAY_FILE"),
+            replay_strict=os.getenv("FAKE_LLM_REPLAY_STRICT", "0") == "1",
+        )
+
+
+_lock = threading.Lock()
+_record_lock = threading.Lock()
+config = FakeLLMConfig.from_env() if ENABLED else FakeLLMConfig()
+_counters = {"calls": 0, "errors": 0, "replayed": 0, "synthesized": 0}
+
+
+def configure(enabled=True, **kwargs):
+    """Switch the fake backend on/off and replace its config (benchmarks, tests)."""
+    global ENABLED, config
+    with _lock:
+        ENABLED = bool(enabled)
+        config = FakeLLMConfig(**kwargs)
+        for k in _counters:
+            _counters[k] = 0
+
+
+def stats():
+    with _lock:
+        counters = dict(_counters)
+    counters["enabled"] = ENABLED
+    counters["replay_entries"] = len(config.replay)
+    return counters
+
+
+# ------------------- Record / replay -------------------
+def load_replay(path):
+    responses = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if rec.get("key") and isinstance(rec.get("response"), str):
+                    responses[rec["key"]] = rec["response"]
+    except OSError as e:
+        print(f"⚠️ Could not load fake LLM replay file {path}: {e}")
+    return responses
+
+
+def record(prompt, model_name, generation_config, response):
+    """Append a real upstream response to LLM_RECORD_FILE (no-op when unset)."""
+    if not LLM_RECORD_FILE or not isinstance(response, str):
+        return
+    rec = {
+        "key": llm_cache.make_cache_key(prompt, model_name, generation_config),
+        "task": classify_prompt(prompt),
+        "model": model_name,
+        "recorded_at": time.time(),
+        "response": response,
+    }
+    with _record_lock:
+        with open(LLM_RECORD_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+
+# ------------------- Prompt classification -------------------
+def classify_prompt(prompt):
+    p = (prompt or "").lower()
+    if "coding solution" in p:
+        return "code_evaluation"
+    if "evaluate these candidate answers" in p:
+        return "batch_evaluation"
+    if "evaluate this candidate's answer" in p:
+        return "evaluation"
+    if "ats compatibility" in p:
+        return "ats"
+    if "final assessment" in p:
+        return "final_assessment"
+    if "expected key points" in p:
+        return "key_points"
+    if "interview questions" in p or "generate exactly" in p:
+        return "questions"
+    if "interview coach" in p:
+        return "monitoring_summary"
+    return "generic"
+
+
+def _prompt_rng(prompt):
+    seed = int(hashlib.sha256((prompt or "").encode("utf-8")).hexdigest()[:16], 16)
+    return random.Random(seed)
+
+
+def _split(total, weights):
+    return [int(total * w) for w in weights]
+
+
+def _fake_questions(rng):
+    topics = ["REST API design", "database indexing", "object-oriented design", "concurrency", "caching"]
+    rng.shuffle(topics)
+    return "\n".join([
+        f"1. Explain how you would approach {topics[0]} in a production system you have worked on.",
+        f"2. What trade-offs do you consider when choosing between approaches to {topics[1]}?",
+        f"3. Describe a situation where {topics[2]} helped you solve a real problem.",
+        "4. Write a Python function that returns the length of the longest substring without repeating characters.",
+        "5. Implement a function in C++ that detects a cycle in a singly linked list and explain its complexity.",
+    ])
+
+
+def _fake_evaluation(rng):
+    score = rng.randint(35, 92)
+    cats = _split(score, [0.25, 0.25, 0.20, 0.20, 0.10])
+    return {
+        "overall_score": score,
+        "category_scores": {
+            "technical_accuracy": cats[0],
+            "completeness": cats[1],
+            "communication": cats[2],
+            "problem_solving": cats[3],
+            "relevance": cats[4],
+        },
+        "strengths": ["Identifies the core concept", "Answer is structured"],
+        "weaknesses": ["Limited depth on edge cases", "Few concrete examples"],
+        "detailed_feedback": f"Synthetic evaluation (fake backend). Estimated quality {score}/100.",
+        "detailed_explanation": f"This answer is scored {score}/100 by the local fake LLM backend. " * 4,
+        "improvement_suggestions": ["Add a concrete example", "Discuss trade-offs"],
+        "interviewer_notes": "Generated by fake_llm",
+        "follow_up_questions": ["How would you test this?", "What would you change at scale?"],
+    }
+
+
+def _fake_code_evaluation(rng):
+    score = rng.randint(30, 95)
+    cats = _split(score, [0.40, 0.20, 0.15, 0.15, 0.10])
+    return {
+        "overall_score": score,
+        "category_scores": {
+            "correctness": cats[0],
+            "efficiency": cats[1],
+            "code_quality": cats[2],
+            "edge_cases": cats[3],
+            "communication": cats[4],
+        },
+        "strengths": ["Reasonable algorithm choice"],
+        "weaknesses": ["Edge cases not handled"],
+        "detailed_feedback": f"Synthetic code evaluation (fake backend). Score {score}/100.",
+        "detailed_explanation": f"Overall score {score}/100 from the local fake LLM backend.",
+        "improvement_suggestions": ["Handle empty input", "State the time complexity"],
+        "interviewer_notes": "Generated by fake_llm",
+        "follow_up_questions": ["What is the time complexity?"],
+    }
+
+
+def _fake_ats(rng):
+    sections = {name: rng.randint(50, 95) for name in ("keywords", "formatting", "experience", "skills")}
+    overall = int(sections["keywords"] * 0.35 + sections["formatting"] * 0.2
+                  + sections["experience"] * 0.25 + sections["skills"] * 0.2)
+    return {
+        "overallScore": overall,
+        "sections": {name: {"score": sc, "feedback": ["Synthetic tip", "Fake backend"]} for name, sc in sections.items()},
+        "suggestions": ["Add role keywords", "Quantify achievements"],
+    }
+
+
+def _fake_final_assessment(rng):
+    level = rng.choice(["Junior", "Mid", "Senior"])
+    return {
+        "final_recommendation": rng.choice(["Strong Hire", "Hire", "Maybe", "No Hire"]),
+        "confidence_level": rng.randint(4, 9),
+        "overall_assessment": "Synthetic final assessment produced by the fake LLM backend.",
+        "key_strengths": ["Technical knowledge", "Structured answers"],
+        "development_areas": ["System design", "Edge cases"],
+        "technical_level": level,
+        "communication_rating": rng.randint(4, 9),
+        "problem_solving_rating": rng.randint(4, 9),
+        "role_fit": f"{level} developer role",
+        "salary_recommendation": f"Market rate for {level.lower()} position",
+        "onboarding_focus": ["Codebase walkthrough", "Mentorship"],
+        "next_steps": "Proceed to next round",
+    }
+
+
+def _fake_key_points(rng, count):
+    pool = ["time and space complexity", "handles empty input", "uses a hash map for lookups",
+            "explains the trade-offs", "gives a concrete example", "mentions testing strategy",
+            "discusses scalability", "defines the core concept"]
+    return {"questions": [{"index": i, "key_points": rng.sample(pool, 4)} for i in range(1, count + 1)]}
+
+
+def _fake_monitoring_summary(rng):
+    return (
+        "Executive Summary: Synthetic monitoring summary from the fake LLM backend.\n\n"
+        "Observations: Eye contact mostly centered; posture occasionally tilted.\n\n"
+        "Actionable Tips: Keep the camera at eye level and pause before answering."
+    )
+
+
+def synthesize(prompt):
+    """Schema-valid response text for a prompt, stable across runs."""
+    rng = _prompt_rng(prompt)
+    task = classify_prompt(prompt)
+    if task == "questions":
+        return _fake_questions(rng)
+    if task == "evaluation":
+        return json.dumps(_fake_evaluation(rng), indent=2)
+    if task == "batch_evaluation":
+        count = len(re.findall(r"^ANSWER \d+$", prompt, flags=re.MULTILINE))
+        batch = [dict(_fake_evaluation(rng), index=i) for i in range(1, count + 1)]
+        return json.dumps({"evaluations": batch}, indent=2)
+    if task == "code_evaluation":
+        return json.dumps(_fake_code_evaluation(rng), indent=2)
+    if task == "ats":
+        return json.dumps(_fake_ats(rng))
+    if task == "final_assessment":
+        return json.dumps(_fake_final_assessment(rng), indent=2)
+    if task == "key_points":
+        count = len(re.findall(r"^QUESTION \d+$", prompt, flags=re.MULTILINE))
+        return json.dumps(_fake_key_points(rng, count))
+    if task == "monitoring_summary":
+        return _fake_monitoring_summary(rng)
+    return "Hello, Gemini API is working!"
+
+
+# ------------------- Backend entry points -------------------
+def _sample_latency_sec():
+    kind, params = config.latency
+    with _lock:
+        if kind == "fixed":
+            ms = params[0]
+        elif kind == "uniform":
+            ms = config.rng.uniform(params[0], params[1])
+        else:
+            ms = config.rng.lognormvariate(math.log(max(params[0], 1e-3)), params[1])
+        fail = config.rng.random() < config.error_rate
+    return max(0.0, ms) / 1000.0, fail
+
+
+def _respond(prompt, model_name, generation_config):
+    """Pick the response text (replay or synthetic) and count it."""
+    key = llm_cache.make_cache_key(prompt, model_name, generation_config)
+    replayed = config.replay.get(key)
+    with _lock:
+        _counters["calls"] += 1
+        if replayed is not None:
+            _counters["replayed"] += 1
+        elif not config.replay_strict:
+            _counters["synthesized"] += 1
+    if replayed is not None:
+        return replayed
+    if config.replay_strict:
+        raise FakeLLMError(f"No recorded response for key {key[:12]}")
+    return synthesize(prompt)
+
+
+def generate(prompt, model_name=None, generation_config=None):
+    """Blocking fake call: sleep for a sampled latency, maybe fail, then respond."""
+    delay, fail = _sample_latency_sec()
+    time.sleep(delay)
+    if fail:
+        with _lock:
+            _counters["errors"] += 1
+        raise FakeLLMError("Injected fake LLM failure")
+    return _respond(prompt, model_name, generation_config)
+
+
+def stream(prompt, model_name=None, generation_config=None, chunk_chars=48):
+    """Streaming fake call: ~30% of the latency before the first chunk, the rest spread over chunks."""
+    delay, fail = _sample_latency_sec()
+    time.sleep(delay * 0.3)
+    if fail:
+        with _lock:
+            _counters["errors"] += 1
+        raise FakeLLMError("Injected fake LLM failure")
+    text = _respond(prompt, model_name, generation_config)
+    chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)] or [""]
+    per_chunk = (delay * 0.7) / len(chunks)
+    for chunk in chunks:
+        yield chunk
+        time.sleep(per_chunk)
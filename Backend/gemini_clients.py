@@ -0,0 +1,91 @@
+# gemini_clients.py
+"""Process-wide registry of long-lived Gemini model clients.
+
+`genai.GenerativeModel` objects are cheap to call but not free to build, and
+every fresh instance resolves its own client on first use. This registry keeps
+one instance per (model_name, generation_config) and hands the same object to
+every request thread, so the underlying HTTP/gRPC connection is reused.
+
+Model objects hold no per-request state, so sharing them across gthread
+threads is safe. The registry is reset automatically after a fork (e.g.
+gunicorn --preload) so workers never share a connection with their parent.
+
+google.generativeai is imported (and configured with GEMINI_API_KEY) on
+the first get_model() call rather than at import time; it takes most of a
+second to load and a worker that only serves cached or local results never
+needs it.
+"""
+import os
+import json
+import threading
+import importlib.util
+
+_lock = threading.Lock()
+_models = {}  # (model_name, frozen generation_config) -> GenerativeModel
+_owner_pid = os.getpid()
+_counters = {"created": 0, "reused": 0}
+_configured = False
+
+
+def api_key():
+    return os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+
+
+def api_key_available():
+    """True when a key is set and google.generativeai is installed (checked without importing it)."""
+    try:
+        installed = importlib.util.find_spec("google.generativeai") is not None
+    except (ImportError, ValueError):
+        installed = False
+    return bool(api_key()) and installed
+
+
+def _freeze(generation_config):
+    """Hashable, order-independent form of a generation config."""
+    if not generation_config:
+        return ""
+    return json.dumps(generation_config, sort_keys=True, default=str)
+
+
+def _reset_after_fork():
+    # caller holds _lock
+    global _owner_pid
+    if os.getpid() != _owner_pid:
+        _models.clear()
+        _owner_pid = os.getpid()
+
+
+def get_model(model_name, generation_config=None):
+    """Return the shared GenerativeModel for this model name and config."""
+    global _configured
+    import google.generativeai as genai
+
+    key = (model_name, _freeze(generation_config))
+    with _lock:
+        _reset_after_fork()
+        if not _configured:
+            genai.configure(api_key=api_key())
+            _configured = True
+        model = _models.get(key)
+        if model is not None:
+            _counters["reused"] += 1
+            return model
+        if generation_config:
+            model = genai.GenerativeModel(model_name=model_name, generation_config=generation_config)
+        else:
+            model = genai.GenerativeModel(model_name=model_name)
+        _models[key] = model
+        _counters["created"] += 1
+        return model
+
+
+def clear():
+    with _lock:
+        _models.clear()
+
+
+def stats():
+    with _lock:
+        counters = dict(_counters)
+        counters["models"] = len(_models)
+    return counters
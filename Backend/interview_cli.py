@@ -0,0 +1,392 @@
+# interview_cli.py
+"""Desktop / terminal interview: speaks the questions, records answers from
+the microphone and writes the PDF report.
+
+Split out of exp2 so the API server never imports sounddevice or pyttsx3.
+Run `python interview_cli.py` (add `--batch` to score every answer in one
+batched call after the last question).
+"""
+import os
+import sys
+import time
+import wave
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pyttsx3
+import sounddevice as sd
+
+import exp2
+import gemini_clients
+
+
+# ========== Global variables for smart recording ==========
+is_recording = False
+silence_duration = 0
+max_silence_before_stop = 3.0
+min_answer_duration = 5.0
+audio_buffer = []
+
+# ========== PDF Handling ==========
+def select_pdf_file():
+    """Select a PDF file path.
+    On server (Render), tkinter is not available, so fallback to input().
+    """
+    try:
+        # In headless environments, just ask for manual input
+        pdf_path = input("📂 Enter the path to your resume PDF: ").strip()
+        return pdf_path
+    except Exception as e:
+        print(f"⚠️ Error selecting file: {e}")
+        return ""
+
+
+# ========== Audio Recording ==========
+def detect_speech_activity(audio_chunk, threshold=0.01):
+    if len(audio_chunk) == 0:
+        return False
+    rms = np.sqrt(np.mean(audio_chunk ** 2))
+    return rms > threshold
+
+def smart_audio_recording(max_duration=120, silence_threshold=3.0, min_duration=5.0):
+    global is_recording, audio_buffer
+    
+    samplerate = 16000
+    chunk_duration = 0.1
+    chunk_size = int(samplerate * chunk_duration)
+    
+    audio_buffer = []
+    silence_counter = 0.0
+    total_duration = 0.0
+    
+    is_recording = True
+    print("🎙️ Recording started... Speak your answer!")
+    print(f"📍 Will auto-stop after {silence_threshold}s of silence (minimum {min_duration}s)")
+    
+    try:
+        def audio_callback(indata, frames, time, status):
+            if status:
+                print(f"Audio status: {status}")
+            audio_buffer.append(indata.copy())
+        
+        with sd.InputStream(samplerate=samplerate, channels=1, 
+                           callback=audio_callback, blocksize=chunk_size):
+            
+            while is_recording and total_duration < max_duration:
+                time.sleep(chunk_duration)
+                total_duration += chunk_duration
+                
+                if len(audio_buffer) > 0:
+                    latest_chunk = audio_buffer[-1].flatten()
+                    has_speech = detect_speech_activity(latest_chunk, threshold=0.015)
+                    
+                    if has_speech:
+                        silence_counter = 0.0
+                        print("🗣️", end="", flush=True)
+                    else:
+                        silence_counter += chunk_duration
+                        if silence_counter > 0.5:
+                            print(".", end="", flush=True)
+                    
+                    if (total_duration >= min_duration and 
+                        silence_counter >= silence_threshold):
+                        print(f"\n⏹️ Auto-stopped after {silence_threshold}s of silence")
+                        break
+                
+                if int(total_duration) % 5 == 0 and total_duration > 0:
+                    remaining = max_duration - total_duration
+                    print(f"\n⏱️ {int(total_duration)}s recorded, {int(remaining)}s remaining")
+    
+    except Exception as e:
+        print(f"\n❌ Recording error: {e}")
+        return None
+    
+    finally:
+        is_recording = False
+    
+    print(f"\n✅ Recording completed ({total_duration:.1f}s total)")
+    
+    if audio_buffer:
+        combined_audio = np.concatenate(audio_buffer, axis=0).flatten()
+        return combined_audio
+    
+    return None
+
+def create_temp_wav_file(audio_data, samplerate=16000):
+    try:
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.wav', prefix='interview_audio_')
+        os.close(temp_fd)
+        
+        if audio_data.dtype != np.int16:
+            if audio_data.dtype == np.float32:
+                audio_data = np.clip(audio_data, -1.0, 1.0)
+                audio_data = (audio_data * 32767).astype(np.int16)
+            else:
+                audio_data = audio_data.astype(np.int16)
+        
+        with wave.open(temp_path, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(samplerate)
+            wav_file.writeframes(audio_data.tobytes())
+        
+        if os.path.exists(temp_path) and os.path.getsize(temp_path) > 0:
+            print(f"✅ Created temp audio file: {temp_path} ({os.path.getsize(temp_path)} bytes)")
+            return temp_path
+        else:
+            print(f"❌ Failed to create valid temp file: {temp_path}")
+            return None
+            
+    except Exception as e:
+        print(f"❌ Error creating temp WAV file: {e}")
+        return None
+
+def listen_to_answer():
+    print("\n" + "="*50)
+    print("🎙️ READY TO RECORD YOUR ANSWER")
+    print("="*50)
+    
+    try:
+        audio_data = smart_audio_recording(
+            max_duration=120,
+            silence_threshold=3.0,
+            min_duration=5.0
+        )
+        
+        if audio_data is None or len(audio_data) == 0:
+            print("❌ No audio data recorded")
+            return ""
+        
+        max_amplitude = np.max(np.abs(audio_data))
+        if max_amplitude < 0.005:
+            print("⚠️ Audio seems very quiet - please speak louder next time")
+        
+        temp_audio_path = create_temp_wav_file(audio_data, samplerate=16000)
+        if not temp_audio_path:
+            print("❌ Failed to create temporary audio file")
+            return ""
+        
+        return exp2.transcribe_with_whisper(temp_audio_path)
+        
+    except Exception as e:
+        print(f"❌ Error in listen_to_answer: {e}")
+        return ""
+
+def speak_text(text, voice_id=None):
+    engine = pyttsx3.init()
+    if voice_id:
+        engine.setProperty('voice', voice_id)
+    engine.setProperty('rate', 150)
+    engine.say(text)
+    engine.runAndWait()
+
+
+def get_time_greeting():
+    hour = datetime.now().hour
+    if hour < 12:
+        return "Good morning"
+    elif hour < 17:
+        return "Good afternoon"
+    else:
+        return "Good evening"
+
+def ensure_api_key():
+    """Ask for the Gemini API key when it is not in the environment (terminal use only)."""
+    if os.getenv("GEMINI_API_KEY"):
+        return
+    print("❌ GEMINI_API_KEY not found in environment variables")
+    os.environ["GEMINI_API_KEY"] = input("Please enter your Gemini API key: ").strip()
+    exp2.GENAI_AVAILABLE = gemini_clients.api_key_available()
+
+
+# ========== Main Flow with Fixed Question Parsing ==========
+def main():
+    ensure_api_key()
+
+    print("🚀 AI INTERVIEW SYSTEM - ENHANCED WITH DETAILED EXPLANATIONS")
+    print("=" * 70)
+    
+    if exp2.WHISPER_AVAILABLE:
+        print("📌 Speech Recognition: Whisper AI (Offline, High Accuracy)")
+    else:
+        print("📌 Speech Recognition: Google STT (Online Fallback)")
+    
+    print(f"🤖 AI Evaluation: Gemini {'New API' if exp2.GENAI_AVAILABLE else 'Legacy API'}")
+    print("✨ Features: Smart auto-stop, Real Gemini evaluation, Detailed explanations")
+    
+    # Test Gemini API first
+    print("\n🔧 Testing Gemini API...")
+    test_response = exp2.call_llm("Say 'Hello, Gemini API is working!' in exactly those words.")
+    if "Hello, Gemini API is working!" in test_response:
+        print("✅ Gemini API test successful!")
+    else:
+        print(f"⚠️ Gemini API test response: {test_response}")
+        response = input("Gemini API may not be working properly. Continue anyway? (y/n): ")
+        if response.lower() != 'y':
+            return
+    
+    # PDF processing
+    pdf_path = select_pdf_file()
+    if not pdf_path:
+        print("❌ No PDF selected. Exiting.")
+        return
+
+    resume_text = exp2.extract_text_from_pdf(pdf_path)
+    if not resume_text:
+        print("❌ Could not extract resume text. Exiting.")
+        return
+
+    resume_digest = exp2.build_resume_digest(resume_text)
+
+    print("🔄 Generating personalized interview questions using Gemini...")
+    questions_text = exp2.generate_questions_from_resume(resume_text)
+    
+    # ✅ FIXED: Properly parse questions and remove intro text
+    main_questions = exp2.parse_questions_properly(questions_text)
+
+    print(f"\n📝 Generated {len(main_questions)} questions:")
+    for i, q in enumerate(main_questions, 1):
+        print(f"{i}. {q[:100]}{'...' if len(q) > 100 else ''}")
+
+    if len(main_questions) < 5:
+        print("⚠️ Less than 5 questions generated. Consider checking your resume content.")
+
+    # Start interview
+    greeting = get_time_greeting()
+    
+    print("\n🎤 STARTING INTERVIEW SESSION")
+    print("=" * 40)
+    
+    speak_text(f"{greeting}. Welcome to your comprehensive AI interview assessment powered by Gemini. "
+               f"I'll ask you {len(main_questions)} questions. Answer naturally - "
+               f"the system will automatically detect when you're finished speaking.")
+
+    # Introduction
+    speak_text("Let's begin with your introduction. Please tell me about yourself, your background, and your experience.")
+    intro_answer = listen_to_answer()
+
+    # --batch: record every answer first, then score them in one batched call
+    BATCH_MODE = "--batch" in sys.argv[1:]
+    pending_batch = []
+
+    # Collect all responses
+    all_questions = ["Please introduce yourself and tell me about your background"] + main_questions
+    all_answers = [intro_answer]
+    all_evaluations = []
+
+    # Evaluate introduction
+    print("\n🔄 Evaluating your introduction...")
+    if len(intro_answer.split()) > 5:
+        intro_eval = exp2.enhanced_evaluate_answer(
+            "Please introduce yourself and tell me about your background", 
+            intro_answer, 
+            resume_digest
+        )
+        all_evaluations.append(intro_eval)
+        speak_text(f"Thank you for your introduction. You scored {intro_eval['overall_score']} out of 100.")
+        print(f"📊 Introduction score: {intro_eval['overall_score']}/100")
+    else:
+        speak_text("Thank you. Your introduction was brief - consider providing more detail in future interviews.")
+        all_evaluations.append({
+            "overall_score": 25,
+            "category_scores": {"technical_accuracy": 5, "completeness": 5, "communication": 5, "problem_solving": 5, "relevance": 5},
+            "strengths": ["Provided basic response"],
+            "weaknesses": ["Very brief introduction", "Lacks detail about experience"],
+            "detailed_feedback": "Introduction was too brief to properly assess candidate background and experience.",
+            "detailed_explanation": "This introduction received 25/100 points because it was too brief to evaluate technical competency, communication skills, or relevant experience. A good introduction should include background information, key skills, relevant experience, and career objectives. The brevity suggests the candidate may be nervous or unprepared for the interview process.",
+            "improvement_suggestions": ["Provide more detail about background", "Highlight key experiences", "Be more specific about skills"],
+            "interviewer_notes": "Candidate may be nervous or unprepared",
+            "follow_up_questions": ["Can you tell me more about your experience?", "What are your key skills?"]
+        })
+
+    # Main interview questions
+    for idx, question in enumerate(main_questions, start=1):
+        print(f"\n{'='*60}")
+        print(f"QUESTION {idx} OF {len(main_questions)}")
+        print('='*60)
+        
+        speak_text(f"Question {idx}: {question}")
+        
+        print(f"\n🔥 Question: {question}")
+        print("\nYour answer will be automatically recorded. Speak naturally and the system will detect when you're finished.")
+        
+        answer = listen_to_answer()
+        all_answers.append(answer)
+
+        if BATCH_MODE and len(answer.split()) > 5:
+            # Scored together after the last question (one round-trip per batch)
+            pending_batch.append(len(all_evaluations))
+            all_evaluations.append(None)
+            speak_text("Thank you. Your answer has been recorded.")
+        elif len(answer.split()) > 5:
+            print(f"\n🔄 Evaluating your answer using Gemini AI...")
+            evaluation = exp2.enhanced_evaluate_answer(question, answer, resume_digest)
+            all_evaluations.append(evaluation)
+            
+            score = evaluation['overall_score']
+            speak_text(f"Thank you for your detailed answer. You scored {score} out of 100 for this question.")
+            print(f"📊 Question {idx} score: {score}/100")
+            
+            # Provide brief feedback
+            if len(evaluation['strengths']) > 0:
+                print(f"✅ Key strength: {evaluation['strengths'][0]}")
+            if len(evaluation['improvement_suggestions']) > 0:
+                print(f"💡 Improvement tip: {evaluation['improvement_suggestions'][0]}")
+                
+        else:
+            speak_text("Thank you for your response. Consider providing more detailed answers.")
+            all_evaluations.append({
+                "overall_score": 20,
+                "category_scores": {"technical_accuracy": 4, "completeness": 4, "communication": 4, "problem_solving": 4, "relevance": 4},
+                "strengths": ["Attempted to answer"],
+                "weaknesses": ["Response too brief", "Lacks technical detail"],
+                "detailed_feedback": "Answer was too brief to properly evaluate technical knowledge and communication skills.",
+                "detailed_explanation": "This answer received 20/100 points due to its brevity. Brief answers make it difficult to assess technical competency, problem-solving abilities, and communication skills. In a technical interview, detailed responses that demonstrate understanding of concepts, provide examples, and show logical thinking are essential for proper evaluation.",
+                "improvement_suggestions": ["Provide more detailed responses", "Include specific examples", "Elaborate on technical concepts"],
+                "interviewer_notes": "May need encouragement to provide more comprehensive answers",
+                "follow_up_questions": ["Can you elaborate on that?", "What specific experience do you have with this?"]
+            })
+
+    if pending_batch:
+        print(f"\n🔄 Evaluating {len(pending_batch)} answers in batch using Gemini AI...")
+        batch_results = exp2.batch_evaluate_answers(
+            [(all_questions[i], all_answers[i]) for i in pending_batch], resume_digest
+        )
+        for i, evaluation in zip(pending_batch, batch_results):
+            all_evaluations[i] = evaluation
+            print(f"📊 Question {i} score: {evaluation['overall_score']}/100")
+
+    # Generate comprehensive assessment
+    speak_text("Thank you for completing the interview. I'm now generating your comprehensive assessment report with detailed explanations using Gemini AI.")
+    
+    print("\n🔄 Generating final assessment using Gemini AI...")
+    final_assessment = exp2.generate_final_interview_assessment(all_evaluations, resume_digest)
+    
+    print("📊 Creating comprehensive interview report with detailed explanations...")
+    report_path = exp2.create_comprehensive_report(all_questions, all_answers, all_evaluations, final_assessment, resume_text)
+    
+    # Final summary
+    avg_score = sum(eval_data["overall_score"] for eval_data in all_evaluations) / len(all_evaluations)
+    
+    print("\n" + "="*60)
+    print("🎯 INTERVIEW COMPLETED - COMPREHENSIVE SUMMARY")
+    print("="*60)
+    print(f"📊 Overall Performance: {avg_score:.1f}/100")
+    print(f"🎯 Final Recommendation: {final_assessment['final_recommendation']}")
+    print(f"📈 Technical Level: {final_assessment['technical_level']}")
+    print(f"💬 Communication Rating: {final_assessment['communication_rating']}/10")
+    print(f"🧠 Problem Solving: {final_assessment['problem_solving_rating']}/10")
+    print(f"📄 Detailed Report: {report_path}")
+    print("="*60)
+    
+    speak_text(f"Your interview assessment is complete. Your overall performance score is {avg_score:.0f} out of 100. "
+               f"The recommendation is {final_assessment['final_recommendation']}. "
+               f"A comprehensive report with detailed explanations has been generated for your review.")
+    
+    print(f"\n✅ Interview session completed successfully!")
+    print(f"📁 Open '{report_path}' for your detailed assessment report with explanations.")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,34 +7,29 @@ import math
 import traceback
 import threading
 import shutil
+import importlib.util
 from datetime import datetime
 from pathlib import Path
 from typing import Tuple
 from PIL import Image
 
+import fake_llm
+import gemini_clients
+import llm_router
+
 # ------------------- Dependencies & Setup -------------------
-try:
-    import mediapipe as mp
-    MP_AVAILABLE = True
-except Exception as e:
-    MP_AVAILABLE = False
-    print("⚠️ Mediapipe not available:", e)
-
-# Gemini / Google Generative AI Setup (optional)
-GENAI_AVAILABLE = False
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.0")
-
-try:
-    import google.generativeai as genai
-    if GEMINI_API_KEY:
-        genai.configure(api_key=GEMINI_API_KEY)
-        GENAI_AVAILABLE = True
-        print("✅ Gemini API configured successfully")
-    else:
-        print("⚠️ Gemini API key not found — fallback text mode enabled")
-except Exception as e:
-    print("⚠️ google.generativeai import failed:", e)
+# mediapipe is imported when monitoring starts, not when the API server boots
+MP_AVAILABLE = importlib.util.find_spec("mediapipe") is not None
+if not MP_AVAILABLE:
+    print("⚠️ Mediapipe not available")
+
+# Gemini / Google Generative AI Setup (optional; gemini_clients imports and configures it on first use)
+GEMINI_MODEL = os.getenv("GEMINI_MODEL")  # optional override; otherwise llm_router picks the model
+GENAI_AVAILABLE = gemini_clients.api_key_available()
+if GENAI_AVAILABLE:
+    print("✅ Gemini API configured successfully")
+else:
+    print("⚠️ Gemini API key or google.generativeai not found — fallback text mode enabled")
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
@@ -103,6 +98,13 @@ def build_gemini_prompt(log_dict):
 
 def get_gemini_report(log_dict):
     """Safely generate AI report or fallback to static text."""
+    model_name = GEMINI_MODEL or llm_router.router.route("monitoring_summary")
+    if fake_llm.ENABLED:
+        try:
+            return fake_llm.generate(build_gemini_prompt(log_dict), model_name)
+        except Exception as e:
+            print("⚠️ Fake LLM generation failed, using fallback:", e)
+
     if not GENAI_AVAILABLE:
         return (
             "Executive summary: The candidate showed a mix of good and improvable behaviours.\n\n"
@@ -110,11 +112,14 @@ def get_gemini_report(log_dict):
             "Actionable tips: Maintain eye contact, sit upright, and reduce excessive hand gestures."
         )
 
+    started = time.monotonic()
     try:
-        model = genai.GenerativeModel(GEMINI_MODEL)
+        model = gemini_clients.get_model(model_name)
         resp = model.generate_content(build_gemini_prompt(log_dict))
+        llm_router.router.observe(model_name, "monitoring_summary", time.monotonic() - started, ok=True)
         return getattr(resp, "text", "") or "AI summary generated but text missing."
     except Exception as e:
+        llm_router.router.observe(model_name, "monitoring_summary", time.monotonic() - started, ok=False)
         print("⚠️ Gemini generation failed, using fallback:", e)
         return (
             "Executive summary: The candidate showed a mix of good and improvable behaviours.\n\n"
@@ -265,6 +270,7 @@ def run_monitor_for_session(session_id: str, duration_sec: int = 180) -> Tuple[d
     """Run camera monitoring for duration."""
     if not MP_AVAILABLE:
         raise RuntimeError("Mediapipe not installed or available")
+    import mediapipe as mp
 
     log = new_log(session_id)
     start_ts = time.time()
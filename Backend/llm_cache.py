@@ -0,0 +1,206 @@
+# llm_cache.py
+"""Content-addressed cache for Gemini responses.
+
+Responses are keyed by a SHA-256 hash of (prompt, model name, generation
+config). Lookups go through an in-memory LRU tier first and then, when
+LLM_CACHE_DIR is set, through a disk tier that is shared by every gunicorn
+worker on the box. Both tiers honour a TTL and a size cap.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# ------------------- Configuration -------------------
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+LLM_CACHE_TTL_SEC = float(os.getenv("LLM_CACHE_TTL_SEC", "3600"))
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR")  # unset -> memory tier only
+LLM_CACHE_DISK_MAX_MB = float(os.getenv("LLM_CACHE_DISK_MAX_MB", "256"))
+DISK_EVICT_EVERY = 32
+
+
+def make_cache_key(prompt, model_name, generation_config):
+    """Stable hash of everything that determines the model output."""
+    payload = json.dumps(
+        {"prompt": prompt, "model": model_name, "config": generation_config or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + optional disk) cache with TTL and size eviction."""
+
+    def __init__(self, max_entries=512, ttl_sec=3600.0, disk_dir=None, disk_max_bytes=256 * 1024 * 1024):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_sec = float(ttl_sec)
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = int(disk_max_bytes)
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._disk_writes = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    # ---------- public API ----------
+    def get(self, key):
+        """Return the cached text for `key`, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self._expired(stored_at, now):
+                    del self._entries[key]
+                    self._counters["expirations"] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return value
+
+        value = self._disk_get(key, now)
+        with self._lock:
+            if value is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+            self._memory_put(key, value, now)
+        return value
+
+    def set(self, key, value):
+        if not isinstance(value, str) or not value:
+            return
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, value, now)
+            self._counters["stores"] += 1
+        self._disk_put(key, value, now)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            for path, _size, _mtime in self._disk_files():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters["memory_entries"] = len(self._entries)
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        counters["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        counters["disk_enabled"] = bool(self.disk_dir)
+        return counters
+
+    # ---------- memory tier ----------
+    def _expired(self, stored_at, now):
+        return self.ttl_sec > 0 and (now - stored_at) > self.ttl_sec
+
+    def _memory_put(self, key, value, now):
+        # caller holds self._lock
+        self._entries[key] = (now, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    # ---------- disk tier ----------
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _disk_get(self, key, now):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self._expired(float(record.get("stored_at", 0)), now):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            with self._lock:
+                self._counters["expirations"] += 1
+            return None
+        value = record.get("value")
+        return value if isinstance(value, str) else None
+
+    def _disk_put(self, key, value, now):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": now, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)  # atomic, safe across gunicorn workers
+        except OSError as e:
+            print(f"⚠️ LLM cache disk write failed: {e}")
+            return
+        # Walking the cache dir is not free, so only check the size cap periodically
+        with self._lock:
+            self._disk_writes += 1
+            should_evict = self._disk_writes % DISK_EVICT_EVERY == 1
+        if should_evict:
+            self._disk_evict()
+
+    def _disk_files(self):
+        files = []
+        for root, _dirs, names in os.walk(self.disk_dir):
+            for name in names:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((path, st.st_size, st.st_mtime))
+        return files
+
+    def _disk_evict(self):
+        files = self._disk_files()
+        total = sum(size for _path, size, _mtime in files)
+        if total <= self.disk_max_bytes:
+            return
+        # Oldest first until we are back under the cap
+        for path, size, _mtime in sorted(files, key=lambda f: f[2]):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self._counters["evictions"] += 1
+            if total <= self.disk_max_bytes:
+                break
+
+
+# Process-wide cache used by exp2.call_llm
+response_cache = ResponseCache(
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    ttl_sec=LLM_CACHE_TTL_SEC,
+    disk_dir=LLM_CACHE_DIR,
+    disk_max_bytes=int(LLM_CACHE_DISK_MAX_MB * 1024 * 1024),
+)
@@ -0,0 +1,56 @@
+# llm_coalesce.py
+"""Single-flight coalescing for identical in-flight LLM calls.
+
+While a call for a given key is running, later callers with the same key
+block on the leader's Future instead of issuing their own request.
+"""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; duplicates share the result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> Future
+        self._counters = {"leaders": 0, "coalesced": 0, "errors": 0}
+
+    def do(self, key, fn):
+        """Return (result, shared). `shared` is True when another caller did the work."""
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self._counters["coalesced"] += 1
+                leader = False
+            else:
+                fut = Future()
+                self._inflight[key] = fut
+                self._counters["leaders"] += 1
+                leader = True
+
+        if not leader:
+            return fut.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                self._counters["errors"] += 1
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+        fut.set_result(result)
+        return result, False
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters["in_flight"] = len(self._inflight)
+        return counters
+
+
+# Process-wide coalescer used by exp2.call_llm
+inflight = SingleFlight()
@@ -0,0 +1,277 @@
+# llm_resilience.py
+"""Deadlines, hedged requests and circuit breaking for LLM calls.
+
+Every call site ("task") gets a latency budget. The upstream call runs on a
+small shared pool while the request thread waits at most that long, so a
+stuck Gemini request can no longer pin a gunicorn thread until the worker
+timeout. With LLM_HEDGE=1 a second attempt is fired once the first has been
+running longer than the task's observed p95. A per-model circuit breaker
+short-circuits calls after repeated failures so callers drop straight to
+their heuristic fallbacks.
+
+Environment:
+    LLM_BUDGETS              "evaluation=20,ats=12" overrides per-task budgets (seconds)
+    LLM_HEDGE                "1" enables hedged retries
+    LLM_HEDGE_MIN_DELAY_SEC  never hedge earlier than this (default 1.0)
+    LLM_BREAKER_FAILURES     consecutive failures that open the breaker (default 5)
+    LLM_BREAKER_RESET_SEC    how long the breaker stays open before a probe (default 30)
+    LLM_MAX_CONCURRENCY      size of the upstream call pool (default 16)
+"""
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+DEFAULT_BUDGETS_SEC = {
+    "questions": 25.0,
+    "key_points": 30.0,
+    "evaluation": 30.0,
+    "code_evaluation": 30.0,
+    "batch_evaluation": 90.0,
+    "ats": 20.0,
+    "ats_speculative": 60.0,
+    "final_assessment": 40.0,
+    "monitoring_summary": 30.0,
+    "default": 30.0,
+}
+
+
+def _parse_budgets(spec):
+    budgets = dict(DEFAULT_BUDGETS_SEC)
+    for item in (spec or "").split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip():
+            try:
+                budgets[name.strip()] = float(value)
+            except ValueError:
+                print(f"⚠️ Ignoring invalid LLM budget: {item!r}")
+    return budgets
+
+
+BUDGETS_SEC = _parse_budgets(os.getenv("LLM_BUDGETS"))
+HEDGE_ENABLED = os.getenv("LLM_HEDGE", "0") == "1"
+HEDGE_MIN_DELAY_SEC = float(os.getenv("LLM_HEDGE_MIN_DELAY_SEC", "1.0"))
+HEDGE_MIN_SAMPLES = 20
+BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SEC = float(os.getenv("LLM_BREAKER_RESET_SEC", "30"))
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+
+class LLMTimeout(TimeoutError):
+    """The call did not finish within its task budget."""
+
+
+def budget_for(task):
+    return BUDGETS_SEC.get(task, BUDGETS_SEC["default"])
+
+
+# ------------------- Latency tracking -------------------
+class LatencyTracker:
+    """Sliding window of recent successful latencies per task."""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def observe(self, task, seconds):
+        with self._lock:
+            self._samples.setdefault(task, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, task, pct):
+        with self._lock:
+            samples = sorted(self._samples.get(task, ()))
+        if not samples:
+            return None
+        idx = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[idx]
+
+    def count(self, task):
+        with self._lock:
+            return len(self._samples.get(task, ()))
+
+    def stats(self):
+        with self._lock:
+            tasks = list(self._samples)
+        return {
+            task: {
+                "samples": self.count(task),
+                "p50_sec": self.percentile(task, 50),
+                "p95_sec": self.percentile(task, 95),
+            }
+            for task in tasks
+        }
+
+
+# ------------------- Circuit breaker -------------------
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures -> half-open single probe."""
+
+    def __init__(self, name, failure_threshold=5, reset_timeout_sec=30.0):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout_sec = float(reset_timeout_sec)
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.short_circuited = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout_sec:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def is_open(self):
+        """True while the breaker is open and not yet due for a probe (does not claim the probe)."""
+        with self._lock:
+            return self.state == "open" and time.monotonic() - self.opened_at < self.reset_timeout_sec
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Give back a claimed half-open probe whose call ended without an outcome.
+
+        The next caller probes instead; the breaker stays half-open.
+        """
+        with self._lock:
+            if self.state == "half_open":
+                self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"⛔ LLM circuit breaker opened for {self.name}")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "short_circuited": self.short_circuited,
+            }
+
+
+# ------------------- Module state -------------------
+latency = LatencyTracker()
+_breakers = {}
+_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+_counters = {"calls": 0, "timeouts": 0, "hedges": 0, "hedge_wins": 0, "errors": 0}
+
+
+def breaker_for(name):
+    with _lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, BREAKER_FAILURES, BREAKER_RESET_SEC)
+            _breakers[name] = breaker
+        return breaker
+
+
+def _pool():
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="llm-call")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def hedge_delay_for(task, budget):
+    """p95-derived delay before firing a hedge, or None when hedging is off or cold."""
+    if not HEDGE_ENABLED or latency.count(task) < HEDGE_MIN_SAMPLES:
+        return None
+    p95 = latency.percentile(task, 95)
+    return min(max(p95, HEDGE_MIN_DELAY_SEC), budget * 0.75)
+
+
+def _count(name):
+    with _lock:
+        _counters[name] += 1
+
+
+def call_with_deadline(task, fn, budget=None, admit_hedge=None):
+    """Run fn(timeout_sec) within the task's budget, hedging if configured.
+
+    `budget` overrides the task budget (e.g. what is left after queueing);
+    `admit_hedge` is asked before firing a hedge and can veto it.
+    Returns the first successful result. Raises LLMTimeout when the budget is
+    exhausted, or the last error when every attempt failed.
+    """
+    if budget is None:
+        budget = budget_for(task)
+    started = time.monotonic()
+    deadline = started + budget
+    hedge_at = None
+    delay = hedge_delay_for(task, budget)
+    if delay is not None:
+        hedge_at = started + delay
+
+    _count("calls")
+    pool = _pool()
+    primary = pool.submit(fn, budget)
+    attempts = [primary]
+    last_error = None
+
+    while attempts:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        wait_until = deadline if hedge_at is None else min(deadline, hedge_at)
+        done, _ = wait(attempts, timeout=max(0.0, wait_until - now), return_when=FIRST_COMPLETED)
+        for fut in done:
+            attempts.remove(fut)
+            try:
+                result = fut.result()
+            except Exception as e:
+                last_error = e
+                continue
+            latency.observe(task, time.monotonic() - started)
+            if fut is not primary:
+                _count("hedge_wins")
+            return result
+        if hedge_at is not None and time.monotonic() >= hedge_at and attempts:
+            hedge_at = None
+            if admit_hedge is not None and not admit_hedge():
+                continue
+            _count("hedges")
+            print(f"🪁 Hedging slow {task} LLM call")
+            attempts.append(pool.submit(fn, max(0.1, deadline - time.monotonic())))
+
+    if last_error is not None and not attempts:
+        _count("errors")
+        raise last_error
+    _count("timeouts")
+    raise LLMTimeout(f"{task} LLM call exceeded its {budget:.0f}s budget")
+
+
+def stats():
+    with _lock:
+        counters = dict(_counters)
+        breakers = {name: b.stats() for name, b in _breakers.items()}
+    counters["hedging_enabled"] = HEDGE_ENABLED
+    counters["budgets_sec"] = dict(BUDGETS_SEC)
+    counters["latency"] = latency.stats()
+    counters["breakers"] = breakers
+    return counters
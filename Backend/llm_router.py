@@ -0,0 +1,246 @@
+# llm_router.py
+"""Task -> Gemini model routing with latency-aware failover.
+
+Each call site ("task") maps to a model tier, and each tier maps to a
+model name. Both maps come from configuration. For every model the router
+keeps a time-windowed record of latencies (per task) and outcomes. When the
+primary model for a task looks unhealthy it routes to the next faster tier
+instead. Unhealthy means its circuit breaker is open, its p95 for that task
+is over the task's p95 target, or its error rate is too high. Samples age
+out of the window, so traffic returns to the primary once the bad period
+has passed.
+
+The p95 target is deliberately lower than the task's deadline
+(llm_resilience.budget_for): calls slower than the deadline are cut off,
+so a p95 measured from finished calls never exceeds it. The target sets a
+point where a model is slow enough to fail over but still finishes its calls.
+
+Environment:
+    LLM_MODEL_FAST / LLM_MODEL_STANDARD / LLM_MODEL_DEEP   model name per tier
+    LLM_ROUTES                 "questions=fast,code_evaluation=deep" (a tier or a model name)
+    LLM_ROUTER_P95_TARGETS     "evaluation=10,ats=6" overrides per-task p95 targets (seconds)
+    LLM_ROUTER_WINDOW_SEC      how long samples count towards health (default 300)
+    LLM_ROUTER_MIN_SAMPLES     samples needed before a model can be judged (default 10)
+    LLM_ROUTER_MAX_ERROR_RATE  error rate that triggers failover (default 0.5)
+"""
+import os
+import time
+import threading
+from collections import deque
+
+import llm_resilience
+
+# Fastest first; failover walks towards the start of this list
+TIER_ORDER = ["fast", "standard", "deep"]
+
+MODEL_TIERS = {
+    "fast": os.getenv("LLM_MODEL_FAST", "gemini-2.5-flash-lite"),
+    "standard": os.getenv("LLM_MODEL_STANDARD", "gemini-2.5-flash"),
+    "deep": os.getenv("LLM_MODEL_DEEP", "gemini-2.5-pro"),
+}
+
+DEFAULT_ROUTES = {
+    "questions": "fast",
+    "key_points": "fast",
+    "evaluation": "standard",
+    "code_evaluation": "standard",
+    "batch_evaluation": "standard",
+    "ats": "fast",
+    "ats_speculative": "fast",
+    "final_assessment": "standard",
+    "monitoring_summary": "fast",
+    "default": "standard",
+}
+
+DEFAULT_P95_TARGETS_SEC = {
+    "questions": 12.0,
+    "key_points": 15.0,
+    "evaluation": 12.0,
+    "code_evaluation": 15.0,
+    "batch_evaluation": 45.0,
+    "ats": 8.0,
+    "ats_speculative": 30.0,
+    "final_assessment": 20.0,
+    "monitoring_summary": 15.0,
+    "default": 15.0,
+}
+
+# A target at or above the deadline could never trip, so it is capped at this share of the budget
+MAX_TARGET_BUDGET_FRACTION = 0.8
+
+WINDOW_SEC = float(os.getenv("LLM_ROUTER_WINDOW_SEC", "300"))
+MIN_SAMPLES = int(os.getenv("LLM_ROUTER_MIN_SAMPLES", "10"))
+MAX_ERROR_RATE = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.5"))
+
+
+def _parse_routes(spec):
+    routes = dict(DEFAULT_ROUTES)
+    for item in (spec or "").split(","):
+        task, _, target = item.partition("=")
+        if task.strip() and target.strip():
+            routes[task.strip()] = target.strip()
+    return routes
+
+
+def _parse_targets(spec):
+    targets = dict(DEFAULT_P95_TARGETS_SEC)
+    for item in (spec or "").split(","):
+        task, _, value = item.partition("=")
+        if task.strip() and value.strip():
+            try:
+                targets[task.strip()] = float(value)
+            except ValueError:
+                print(f"⚠️ Ignoring invalid p95 target: {item!r}")
+    return targets
+
+
+ROUTES = _parse_routes(os.getenv("LLM_ROUTES"))
+P95_TARGETS_SEC = _parse_targets(os.getenv("LLM_ROUTER_P95_TARGETS"))
+
+
+def model_for_tier(tier):
+    """Model name for a tier; anything that is not a tier is taken as a model name."""
+    return MODEL_TIERS.get(tier, tier)
+
+
+def primary_model(task):
+    return model_for_tier(ROUTES.get(task, ROUTES["default"]))
+
+
+def p95_target_for(task):
+    """Latency target for the task, kept below its deadline so failover can trigger."""
+    target = P95_TARGETS_SEC.get(task, P95_TARGETS_SEC["default"])
+    return min(target, llm_resilience.budget_for(task) * MAX_TARGET_BUDGET_FRACTION)
+
+
+def failover_chain(task):
+    """Primary model for the task followed by every faster tier, without duplicates."""
+    target = ROUTES.get(task, ROUTES["default"])
+    chain = [model_for_tier(target)]
+    if target in TIER_ORDER:
+        for tier in reversed(TIER_ORDER[:TIER_ORDER.index(target)]):
+            chain.append(MODEL_TIERS[tier])
+    return list(dict.fromkeys(chain))
+
+
+class ModelHealth:
+    """Time-windowed latency (per task) and outcome samples for one model."""
+
+    def __init__(self, window_sec=300.0):
+        self.window_sec = float(window_sec)
+        self._latency = {}  # task -> deque of (timestamp, seconds)
+        self._outcomes = deque()  # (timestamp, ok)
+        self._lock = threading.Lock()
+
+    def _prune(self, now):
+        # caller holds _lock
+        cutoff = now - self.window_sec
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+        for samples in self._latency.values():
+            while samples and samples[0][0] < cutoff:
+                samples.popleft()
+
+    def observe(self, task, seconds, ok):
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            self._outcomes.append((now, bool(ok)))
+            if seconds is not None:
+                self._latency.setdefault(task, deque()).append((now, seconds))
+
+    def p95(self, task):
+        with self._lock:
+            self._prune(time.monotonic())
+            samples = sorted(s for _, s in self._latency.get(task, ()))
+        if len(samples) < MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def error_rate(self):
+        with self._lock:
+            self._prune(time.monotonic())
+            total = len(self._outcomes)
+            errors = sum(1 for _, ok in self._outcomes if not ok)
+        if total < MIN_SAMPLES:
+            return None
+        return errors / total
+
+    def stats(self):
+        with self._lock:
+            self._prune(time.monotonic())
+            tasks = list(self._latency)
+            calls = len(self._outcomes)
+        return {
+            "calls_in_window": calls,
+            "error_rate": self.error_rate(),
+            "p95_sec": {task: self.p95(task) for task in tasks},
+        }
+
+
+class LLMRouter:
+    def __init__(self, window_sec=WINDOW_SEC, max_error_rate=MAX_ERROR_RATE):
+        self.window_sec = window_sec
+        self.max_error_rate = max_error_rate
+        self._health = {}
+        self._lock = threading.Lock()
+        self._counters = {"routed": 0, "failovers": 0}
+
+    def health(self, model_name):
+        with self._lock:
+            health = self._health.get(model_name)
+            if health is None:
+                health = ModelHealth(self.window_sec)
+                self._health[model_name] = health
+            return health
+
+    def unhealthy_reason(self, model_name, task):
+        """Why `model_name` should not take `task` right now, or None if it is fine."""
+        if llm_resilience.breaker_for(model_name).is_open():
+            return "circuit open"
+        health = self.health(model_name)
+        p95 = health.p95(task)
+        target = p95_target_for(task)
+        if p95 is not None and p95 > target:
+            return f"p95 {p95:.1f}s over {target:.0f}s target"
+        rate = health.error_rate()
+        if rate is not None and rate >= self.max_error_rate:
+            return f"error rate {rate:.0%}"
+        return None
+
+    def route(self, task):
+        """Model to use for this task: the primary unless it is unhealthy."""
+        chain = failover_chain(task)
+        chosen = chain[-1]  # the fastest tier takes the call if everything looks bad
+        reason = None
+        for model_name in chain:
+            why = self.unhealthy_reason(model_name, task)
+            if why is None:
+                chosen = model_name
+                break
+            reason = reason or why
+        with self._lock:
+            self._counters["routed"] += 1
+            if chosen != chain[0]:
+                self._counters["failovers"] += 1
+        if chosen != chain[0]:
+            print(f"🔀 Routing {task} from {chain[0]} to {chosen} ({reason})")
+        return chosen
+
+    def observe(self, model_name, task, seconds, ok):
+        """Record one finished call (seconds may be None when it never ran)."""
+        self.health(model_name).observe(task, seconds, ok)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            models = dict(self._health)
+        counters["routes"] = {task: primary_model(task) for task in ROUTES}
+        counters["tiers"] = dict(MODEL_TIERS)
+        counters["p95_targets_sec"] = {task: p95_target_for(task) for task in ROUTES}
+        counters["models"] = {name: health.stats() for name, health in models.items()}
+        return counters
+
+
+# Process-wide router used by exp2.call_llm / exp2.stream_llm and livevid1
+router = LLMRouter()
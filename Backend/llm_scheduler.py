@@ -0,0 +1,194 @@
+# llm_scheduler.py
+"""Priority-aware admission control for Gemini requests.
+
+Every upstream call first takes a slot from the scheduler. Slots are handed
+out in priority order (interactive answer evaluation first, then question
+generation, then ATS, then reports) and only while the requests-per-minute
+and tokens-per-minute token buckets have budget. Lower-priority classes also
+have to leave a reserve in both buckets, so under quota pressure ATS and
+report traffic back off before the live interview does.
+
+Budgets are per process: with `gunicorn -w N`, set them to the project quota
+divided by N.
+
+Environment:
+    LLM_RPM                  requests per minute budget (0 disables the limit)
+    LLM_TPM                  estimated tokens per minute budget (0 disables)
+    LLM_INTERACTIVE_RESERVE  fraction of each bucket held back for priority <= 1
+"""
+import os
+import time
+import heapq
+import itertools
+import threading
+from collections import deque
+
+LLM_RPM = float(os.getenv("LLM_RPM", "300"))
+LLM_TPM = float(os.getenv("LLM_TPM", "1000000"))
+LLM_INTERACTIVE_RESERVE = float(os.getenv("LLM_INTERACTIVE_RESERVE", "0.2"))
+
+# Lower number = more urgent
+TASK_PRIORITIES = {
+    "evaluation": 0,
+    "code_evaluation": 0,
+    "questions": 1,
+    "key_points": 2,
+    "default": 1,
+    "ats": 2,
+    "batch_evaluation": 2,
+    "final_assessment": 3,
+    "monitoring_summary": 3,
+    "ats_speculative": 3,  # pre-computed at upload, nobody is waiting yet
+}
+PRIORITY_NAMES = {0: "interactive", 1: "questions", 2: "ats", 3: "reports"}
+RESERVED_PRIORITY = 2  # classes at or below this urgency must leave the reserve
+
+
+class SchedulerTimeout(TimeoutError):
+    """No slot became available before the caller's deadline."""
+
+
+def priority_for(task):
+    return TASK_PRIORITIES.get(task, TASK_PRIORITIES["default"])
+
+
+def estimate_tokens(prompt, max_output_tokens):
+    """Rough token cost of a call: ~4 chars per prompt token plus the output cap."""
+    return len(prompt or "") // 4 + int(max_output_tokens or 0)
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute` units per minute, capped at one minute."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self):
+        return self.capacity <= 0
+
+    def refill(self, now):
+        if self.unlimited:
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def seconds_until(self, amount, reserve_fraction, now):
+        """Seconds until `amount` can be taken while keeping the reserve (0 = now)."""
+        if self.unlimited:
+            return 0.0
+        self.refill(now)
+        amount = min(amount, self.capacity)
+        needed = amount + self.capacity * reserve_fraction - self.tokens
+        if needed <= 0:
+            return 0.0
+        if amount + self.capacity * reserve_fraction > self.capacity:
+            needed = amount - self.tokens  # reserve cannot be honoured for oversized requests
+            if needed <= 0:
+                return 0.0
+        return needed / self.rate
+
+    def take(self, amount):
+        if not self.unlimited:
+            self.tokens -= min(amount, self.capacity)
+
+
+class LLMScheduler:
+    def __init__(self, rpm=LLM_RPM, tpm=LLM_TPM, reserve=LLM_INTERACTIVE_RESERVE):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.reserve = float(reserve)
+        self._cond = threading.Condition()
+        self._queue = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._waits = {name: deque(maxlen=500) for name in PRIORITY_NAMES.values()}
+        self._counters = {"admitted": 0, "timed_out": 0, "hedges_admitted": 0, "hedges_refused": 0}
+
+    def _seconds_until(self, priority, est_tokens, now):
+        reserve = self.reserve if priority >= RESERVED_PRIORITY else 0.0
+        return max(
+            self.requests.seconds_until(1, reserve, now),
+            self.tokens.seconds_until(est_tokens, reserve, now),
+        )
+
+    def _take(self, est_tokens):
+        self.requests.take(1)
+        self.tokens.take(est_tokens)
+
+    def acquire(self, task, est_tokens, timeout):
+        """Block until this call may go upstream. Returns seconds spent queued."""
+        priority = priority_for(task)
+        entry = (priority, next(self._seq))
+        started = time.monotonic()
+        deadline = started + max(0.0, timeout)
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait_for = None
+                    if self._queue[0] == entry:
+                        wait_for = self._seconds_until(priority, est_tokens, now)
+                        if wait_for <= 0:
+                            heapq.heappop(self._queue)
+                            self._take(est_tokens)
+                            waited = now - started
+                            self._counters["admitted"] += 1
+                            self._waits[PRIORITY_NAMES[priority]].append(waited)
+                            return waited
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._queue.remove(entry)
+                        heapq.heapify(self._queue)
+                        self._counters["timed_out"] += 1
+                        raise SchedulerTimeout(
+                            f"{task} call waited {now - started:.1f}s for LLM quota"
+                        )
+                    self._cond.wait(min(remaining, wait_for if wait_for else remaining))
+            finally:
+                self._cond.notify_all()
+
+    def try_acquire(self, task, est_tokens):
+        """Non-blocking slot for an optional extra request (hedges). Never queues."""
+        priority = priority_for(task)
+        with self._cond:
+            if self._queue or self._seconds_until(priority, est_tokens, time.monotonic()) > 0:
+                self._counters["hedges_refused"] += 1
+                return False
+            self._take(est_tokens)
+            self._counters["hedges_admitted"] += 1
+            return True
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _seq in self._queue:
+                depth[PRIORITY_NAMES[priority]] += 1
+            waits = {}
+            for name, samples in self._waits.items():
+                ordered = sorted(samples)
+                waits[name] = {
+                    "samples": len(ordered),
+                    "p50_sec": ordered[len(ordered) // 2] if ordered else None,
+                    "p95_sec": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else None,
+                }
+            counters = dict(self._counters)
+            counters.update({
+                "queue_depth": depth,
+                "wait_time": waits,
+                "rpm_limit": self.requests.capacity,
+                "tpm_limit": self.tokens.capacity,
+                "requests_available": None if self.requests.unlimited else round(self.requests.tokens, 1),
+                "tokens_available": None if self.tokens.unlimited else int(self.tokens.tokens),
+            })
+        return counters
+
+
+# Process-wide scheduler used by exp2.call_llm / exp2.stream_llm
+scheduler = LLMScheduler()
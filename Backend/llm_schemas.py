@@ -0,0 +1,256 @@
+# llm_schemas.py
+"""Response schemas for every structured Gemini call, declared once.
+
+Each schema is an OpenAPI-style dict. `to_response_schema()` trims it to the
+subset Gemini accepts as `response_schema` (JSON mode), and `parse()` checks
+and normalises the returned JSON against the full schema in a single pass:
+integers are coerced and clamped to their bounds, enum strings are matched
+case-insensitively, and missing optional fields get empty defaults. Anything
+that still does not fit is reported as an error so the caller can use its
+heuristic fallback.
+
+protos.Schema keeps `properties` in a map, so the declaration order does
+not reach Gemini and JSON-mode output comes back with its keys sorted.
+Streaming calls that read fields as they arrive therefore send no
+response_schema. They rely on the prompt instead, which lists the fields
+in order via `outline()`.
+"""
+import json
+import math
+
+# Keys understood by google.generativeai's protos.Schema
+GEMINI_SCHEMA_KEYS = {"type", "format", "description", "nullable", "enum", "items",
+                      "properties", "required", "max_items", "min_items"}
+
+
+def _integer(minimum, maximum, description=None):
+    schema = {"type": "integer", "minimum": minimum, "maximum": maximum}
+    if description:
+        schema["description"] = description
+    return schema
+
+
+def _string_list(description=None):
+    schema = {"type": "array", "items": {"type": "string"}}
+    if description:
+        schema["description"] = description
+    return schema
+
+
+def _object(properties, required):
+    return {"type": "object", "properties": properties, "required": list(required)}
+
+
+# ------------------- Answer evaluation -------------------
+_EVALUATION_OPTIONAL = {
+    "improvement_suggestions": _string_list("Actionable ways to improve the answer"),
+    "interviewer_notes": {"type": "string"},
+    "follow_up_questions": _string_list(),
+}
+
+
+def _evaluation_schema(categories):
+    properties = {
+        "overall_score": _integer(0, 100),
+        "category_scores": _object(
+            {name: _integer(0, cap) for name, cap in categories.items()}, categories
+        ),
+        "strengths": _string_list("Specific strengths, with reasoning"),
+        "weaknesses": _string_list("Specific weaknesses, with reasoning"),
+        "detailed_feedback": {"type": "string", "description": "Two or three sentence summary"},
+        "detailed_explanation": {
+            "type": "string",
+            "description": "Why this score, criterion by criterion",
+        },
+    }
+    required = list(properties)
+    properties.update(_EVALUATION_OPTIONAL)
+    return _object(properties, required)
+
+
+EVALUATION = _evaluation_schema({
+    "technical_accuracy": 25,
+    "completeness": 25,
+    "communication": 20,
+    "problem_solving": 20,
+    "relevance": 10,
+})
+
+CODE_EVALUATION = _evaluation_schema({
+    "correctness": 40,
+    "efficiency": 20,
+    "code_quality": 15,
+    "edge_cases": 15,
+    "communication": 10,
+})
+
+BATCH_EVALUATION_ITEM = dict(
+    EVALUATION,
+    properties=dict(EVALUATION["properties"], index={"type": "integer", "description": "The ANSWER number"}),
+    required=["index"] + EVALUATION["required"],
+)
+
+BATCH_EVALUATION = _object(
+    {"evaluations": {"type": "array", "items": BATCH_EVALUATION_ITEM}}, ["evaluations"]
+)
+
+# ------------------- Reference key points -------------------
+KEY_POINTS = _object(
+    {
+        "questions": {
+            "type": "array",
+            "items": _object(
+                {
+                    "index": {"type": "integer", "description": "The QUESTION number"},
+                    "key_points": _string_list("Short points a strong answer covers"),
+                },
+                ["index", "key_points"],
+            ),
+        }
+    },
+    ["questions"],
+)
+
+# ------------------- Resume ATS analysis -------------------
+_ATS_SECTION = _object(
+    {"score": _integer(0, 100), "feedback": _string_list("Brief 2-3 word items")},
+    ["score", "feedback"],
+)
+
+ATS = _object(
+    {
+        "overallScore": _integer(0, 100),
+        "sections": _object(
+            {name: _ATS_SECTION for name in ("keywords", "formatting", "experience", "skills")},
+            ["keywords", "formatting", "experience", "skills"],
+        ),
+        "suggestions": _string_list(),
+    },
+    ["overallScore", "sections", "suggestions"],
+)
+
+# ------------------- Final assessment -------------------
+FINAL_ASSESSMENT = _object(
+    {
+        "final_recommendation": {"type": "string", "enum": ["Strong Hire", "Hire", "Maybe", "No Hire"]},
+        "confidence_level": _integer(1, 10),
+        "overall_assessment": {"type": "string"},
+        "key_strengths": _string_list(),
+        "development_areas": _string_list(),
+        "technical_level": {"type": "string", "enum": ["Junior", "Mid", "Senior"]},
+        "communication_rating": _integer(1, 10),
+        "problem_solving_rating": _integer(1, 10),
+        "role_fit": {"type": "string"},
+        "salary_recommendation": {"type": "string"},
+        "onboarding_focus": _string_list(),
+        "next_steps": {"type": "string"},
+    },
+    ["final_recommendation", "confidence_level", "overall_assessment", "key_strengths",
+     "development_areas", "technical_level", "communication_rating", "problem_solving_rating"],
+)
+
+
+# ------------------- Helpers -------------------
+def to_response_schema(schema):
+    """The part of `schema` Gemini accepts as a response_schema."""
+    trimmed = {k: v for k, v in schema.items() if k in GEMINI_SCHEMA_KEYS}
+    if "items" in trimmed:
+        trimmed["items"] = to_response_schema(trimmed["items"])
+    if "properties" in trimmed:
+        trimmed["properties"] = {k: to_response_schema(v) for k, v in trimmed["properties"].items()}
+    return trimmed
+
+
+def outline(schema):
+    """Compact JSON template of `schema` with its properties in declaration order, for prompts."""
+    kind = schema.get("type")
+    if kind == "object":
+        fields = ", ".join(f'"{name}": {outline(sub)}' for name, sub in schema.get("properties", {}).items())
+        return "{" + fields + "}"
+    if kind == "array":
+        return f"[{outline(schema.get('items', {}))}, ...]"
+    if "enum" in schema:
+        return "<" + " | ".join(schema["enum"]) + ">"
+    if "minimum" in schema and "maximum" in schema:
+        return f"<{kind} {schema['minimum']}-{schema['maximum']}>"
+    return f"<{kind or 'value'}>"
+
+
+_EMPTY = {"string": "", "array": list, "object": dict}
+
+
+def validate(value, schema, path="$"):
+    """Check `value` against `schema`. Returns (normalised value, list of errors)."""
+    kind = schema.get("type")
+    errors = []
+
+    if kind == "object":
+        if not isinstance(value, dict):
+            return value, [f"{path}: expected object"]
+        out = dict(value)  # unknown keys are kept
+        for name, sub in schema.get("properties", {}).items():
+            if name in value:
+                out[name], sub_errors = validate(value[name], sub, f"{path}.{name}")
+                errors.extend(sub_errors)
+            elif name in schema.get("required", ()):
+                errors.append(f"{path}.{name}: missing")
+            elif sub.get("type") in _EMPTY:
+                default = _EMPTY[sub["type"]]
+                out[name] = default() if callable(default) else default
+        return out, errors
+
+    if kind == "array":
+        if not isinstance(value, list):
+            return value, [f"{path}: expected array"]
+        out = []
+        for i, item in enumerate(value):
+            item, item_errors = validate(item, schema.get("items", {}), f"{path}[{i}]")
+            out.append(item)
+            errors.extend(item_errors)
+        return out, errors
+
+    if kind in ("integer", "number"):
+        if isinstance(value, bool):
+            return value, [f"{path}: expected {kind}"]
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return value, [f"{path}: expected {kind}"]
+        if not math.isfinite(number):
+            return value, [f"{path}: expected {kind}"]
+        if "minimum" in schema:
+            number = max(schema["minimum"], number)
+        if "maximum" in schema:
+            number = min(schema["maximum"], number)
+        return (int(round(number)) if kind == "integer" else number), []
+
+    if kind == "string":
+        if isinstance(value, (dict, list)) or value is None:
+            return value, [f"{path}: expected string"]
+        value = str(value)
+        if "enum" in schema:
+            for option in schema["enum"]:
+                if option.lower() == value.strip().lower():
+                    return option, []
+            return value, [f"{path}: {value!r} not one of {schema['enum']}"]
+        return value, []
+
+    if kind == "boolean" and not isinstance(value, bool):
+        return value, [f"{path}: expected boolean"]
+    return value, errors
+
+
+def loads(text):
+    """json.loads that reports failure instead of raising. Returns (value, error)."""
+    try:
+        return json.loads(text, strict=False), None
+    except (TypeError, ValueError) as e:
+        return None, f"invalid JSON: {e}"
+
+
+def parse(text, schema):
+    """Decode and validate a JSON-mode response. Returns (value, errors)."""
+    value, error = loads((text or "").strip())
+    if error:
+        return None, [error]
+    return validate(value, schema)
@@ -0,0 +1,116 @@
+# measure_startup.py
+"""Measure how long a fresh process takes to import the API server.
+
+Each run starts a new interpreter with `-X importtime`, imports the module
+(backend_api by default), and records the wall-clock time and the slowest
+top-level imports. This is what every gunicorn worker pays before it can
+serve its first request.
+
+    python measure_startup.py                  # 5 runs of `import backend_api`
+    python measure_startup.py --runs 10 --max-seconds 3
+    python measure_startup.py --module exp2 --top 15
+
+With --max-seconds it exits with status 1 when the median is over the limit,
+so CI can use it as a gate. The runs load the real dependencies
+(requirements.txt) but make no network calls.
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+_SNIPPET = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print('STARTUP_SEC', time.perf_counter() - started)"
+)
+
+
+def run_once(module, env):
+    """One cold import. Returns (seconds, {top-level module: cumulative seconds})."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SNIPPET.format(module=module)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdin=subprocess.DEVNULL,  # an input() prompt at import time fails instead of hanging
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    seconds = None
+    for line in proc.stdout.splitlines():
+        if line.startswith("STARTUP_SEC"):
+            seconds = float(line.split()[1])
+    if proc.returncode != 0 or seconds is None:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    # -X importtime lists children before their parent: the module's direct
+    # imports are the one-level-deeper lines right above its own line
+    imports, children = {}, {}
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        depth, name = len(match.group(3)) // 2, match.group(4)
+        if depth == 1:
+            children[name] = int(match.group(2)) / 1e6
+        elif depth == 0:
+            if name == module:
+                imports = children
+            children = {}
+    return seconds, imports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="backend_api")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest direct imports to list")
+    parser.add_argument("--max-seconds", type=float, default=None, help="fail when the median is above this")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env.setdefault("GEMINI_API_KEY", "startup-measurement")  # the key is only checked for presence here
+
+    timings, per_import = [], {}
+    for _ in range(max(1, args.runs)):
+        seconds, imports = run_once(args.module, env)
+        timings.append(seconds)
+        for name, cost in imports.items():
+            per_import.setdefault(name, []).append(cost)
+
+    slowest = sorted(
+        ((name, statistics.median(costs)) for name, costs in per_import.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:args.top]
+    summary = {
+        "module": args.module,
+        "runs": len(timings),
+        "median_sec": round(statistics.median(timings), 3),
+        "min_sec": round(min(timings), 3),
+        "max_sec": round(max(timings), 3),
+        "slowest_imports": {name: round(cost, 3) for name, cost in slowest},
+    }
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"⏱️ import {args.module}: median {summary['median_sec']}s "
+              f"(min {summary['min_sec']}s, max {summary['max_sec']}s, {summary['runs']} runs)")
+        for name, cost in summary["slowest_imports"].items():
+            print(f"   {cost:7.3f}s  {name}")
+
+    if args.max_seconds is not None and summary["median_sec"] > args.max_seconds:
+        print(f"❌ Startup {summary['median_sec']}s is over the {args.max_seconds}s limit")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+# question_bank.py
+"""Persistent bank of generated interview question sets.
+
+The same resumes are uploaded over and over: one candidate practising
+several times, or a cohort sharing a template. Every question set Gemini
+generates is stored in a SQLite file under two keys. One is a hash of the
+normalised resume text. The other is the extracted skill set, so
+near-identical resumes can share sets. A new session is served from the
+bank when either key hits, and Gemini is called only on a miss.
+
+Matching on skills is opt-in (QUESTION_BANK_MATCH_SKILLS=1). The questions
+are written from one candidate's projects, so a skill match hands them to
+someone else. It also needs MIN_SKILLS_FOR_MATCH distinctive skills;
+ubiquitous ones such as Git, SQL or HTML do not count.
+
+For variety, each of the 5 question slots (3 conceptual, 2 coding) is
+sampled independently from all stored sets for the key. Until a key has
+QUESTION_BANK_MIN_SETS sets, lookups miss, so Gemini keeps generating
+fresh sets and the bank keeps storing them. Only then does reuse start,
+with enough sets to sample from. When the bank is over its size cap, the
+least recently served sets are evicted.
+The file is opened in WAL mode, so every gunicorn worker can share it.
+
+Environment:
+    QUESTION_BANK_ENABLED     "0" disables the bank
+    QUESTION_BANK_PATH        SQLite file (default Backend/data/question_bank.sqlite3)
+    QUESTION_BANK_MAX_SETS    size cap in question sets (default 2000)
+    QUESTION_BANK_MIN_SETS    sets per key before reuse starts (default 3)
+    QUESTION_BANK_MATCH_SKILLS  "1" also serves sets stored for the same skill set (default "0")
+"""
+import os
+import re
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import threading
+
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "1").lower() not in ("0", "false", "no")
+QUESTION_BANK_PATH = os.getenv(
+    "QUESTION_BANK_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "question_bank.sqlite3"),
+)
+QUESTION_BANK_MAX_SETS = int(os.getenv("QUESTION_BANK_MAX_SETS", "2000"))
+QUESTION_BANK_MIN_SETS = int(os.getenv("QUESTION_BANK_MIN_SETS", "3"))
+QUESTION_BANK_MATCH_SKILLS = os.getenv("QUESTION_BANK_MATCH_SKILLS", "0") == "1"
+
+MIN_RESUME_CHARS = 200  # below this the text is too generic to key on
+MIN_SKILLS_FOR_MATCH = 6
+# On most resumes, so they say nothing about which questions fit a candidate
+GENERIC_SKILLS = {"git", "sql", "html", "css", "linux", "rest apis", "dsa", "oop", "dbms",
+                  "operating systems", "computer networks"}
+QUESTIONS_PER_SET = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS question_sets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    resume_hash TEXT NOT NULL,
+    skill_key TEXT,
+    questions TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    uses INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_question_sets_resume ON question_sets (resume_hash);
+CREATE INDEX IF NOT EXISTS idx_question_sets_skills ON question_sets (skill_key);
+CREATE INDEX IF NOT EXISTS idx_question_sets_last_used ON question_sets (last_used);
+"""
+
+
+def resume_hash(resume_text):
+    """Hash of the resume text with case and whitespace differences removed."""
+    normalized = re.sub(r"\s+", " ", (resume_text or "").lower()).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def skill_key(skills):
+    """Order-independent key for the distinctive skills in a list, or None when too few to match on."""
+    names = sorted({s.strip().lower() for s in (skills or []) if s and s.strip()} - GENERIC_SKILLS)
+    if len(names) < MIN_SKILLS_FOR_MATCH:
+        return None
+    return hashlib.sha256("|".join(names).encode("utf-8")).hexdigest()
+
+
+class QuestionBank:
+    def __init__(self, path, max_sets=2000, min_sets=3, match_skills=False, rng=None):
+        self.path = path
+        self.max_sets = max(1, int(max_sets))
+        self.min_sets = max(1, int(min_sets))
+        self.match_skills = match_skills
+        self.rng = rng or random.Random()
+        self._conn = None
+        self._conn_pid = None
+        self._lock = threading.Lock()
+        self._counters = {"resume_hits": 0, "skills_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+
+    # ---------- connection ----------
+    def _db(self):
+        # caller holds self._lock; one connection per process (reopened after fork)
+        if self._conn is None or self._conn_pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    # ---------- public API ----------
+    def get(self, resume_text, skills=None):
+        """Returns (questions, source) with source "resume" or "skills", or (None, None) on a miss."""
+        if not resume_text or len(resume_text) < MIN_RESUME_CHARS:
+            return None, None
+        rhash = resume_hash(resume_text)
+        skey = skill_key(skills) if self.match_skills else None
+        try:
+            with self._lock:
+                db = self._db()
+                for column, key, source in (("resume_hash", rhash, "resume"), ("skill_key", skey, "skills")):
+                    if key is None:
+                        continue
+                    rows = db.execute(
+                        f"SELECT id, questions FROM question_sets WHERE {column} = ?", (key,)
+                    ).fetchall()
+                    if len(rows) < self.min_sets:
+                        continue
+                    questions = self._sample([json.loads(q) for _id, q in rows])
+                    db.executemany(
+                        "UPDATE question_sets SET last_used = ?, uses = uses + 1 WHERE id = ?",
+                        [(time.time(), row_id) for row_id, _q in rows],
+                    )
+                    db.commit()
+                    self._counters[f"{source}_hits"] += 1
+                    return questions, source
+                self._counters["misses"] += 1
+        except (sqlite3.Error, ValueError) as e:
+            print(f"⚠️ Question bank lookup failed: {e}")
+            with self._lock:
+                self._counters["errors"] += 1
+        return None, None
+
+    def add(self, resume_text, skills, questions):
+        """Store a freshly generated, complete question set."""
+        if not resume_text or len(resume_text) < MIN_RESUME_CHARS:
+            return
+        if len(questions or []) < QUESTIONS_PER_SET:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                db = self._db()
+                db.execute(
+                    "INSERT INTO question_sets (resume_hash, skill_key, questions, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (resume_hash(resume_text), skill_key(skills), json.dumps(questions[:QUESTIONS_PER_SET]), now, now),
+                )
+                self._counters["stores"] += 1
+                self._evict(db)
+                db.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Question bank store failed: {e}")
+            with self._lock:
+                self._counters["errors"] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            try:
+                counters["sets"] = self._db().execute("SELECT COUNT(*) FROM question_sets").fetchone()[0]
+            except sqlite3.Error:
+                counters["sets"] = None
+        hits = counters["resume_hits"] + counters["skills_hits"]
+        lookups = hits + counters["misses"]
+        counters["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        counters["max_sets"] = self.max_sets
+        return counters
+
+    # ---------- internals ----------
+    def _sample(self, sets):
+        """Pick each slot from a random stored set, keeping slot order (conceptual first, coding last)."""
+        questions = []
+        for slot in range(QUESTIONS_PER_SET):
+            candidates = [s[slot] for s in sets if len(s) > slot and s[slot] not in questions]
+            if candidates:
+                questions.append(self.rng.choice(candidates))
+        return questions
+
+    def _evict(self, db):
+        # caller holds self._lock
+        count = db.execute("SELECT COUNT(*) FROM question_sets").fetchone()[0]
+        excess = count - self.max_sets
+        if excess > 0:
+            db.execute(
+                "DELETE FROM question_sets WHERE id IN "
+                "(SELECT id FROM question_sets ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+            self._counters["evictions"] += excess
+
+
+# Process-wide bank used by backend_api.process_resume
+question_bank = QuestionBank(
+    QUESTION_BANK_PATH,
+    max_sets=QUESTION_BANK_MAX_SETS,
+    min_sets=QUESTION_BANK_MIN_SETS,
+    match_skills=QUESTION_BANK_MATCH_SKILLS,
+)
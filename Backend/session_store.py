@@ -0,0 +1,317 @@
+# session_store.py
+"""Interview session storage shared by every gunicorn worker.
+
+The Dockerfile runs `gunicorn -w 2`. With sessions in a process-local dict,
+a request routed to the other worker got "Invalid session", and every
+session was lost when a worker was recycled. Both backends here have the
+same interface:
+
+    MemorySessionStore  process-local dict; fine for `python backend_api.py`
+    SQLiteSessionStore  one JSON document per session in a SQLite file (WAL
+                        mode), shared by all workers on the host
+
+Sessions expire after SESSION_TTL_SEC without access. Past
+SESSION_MAX_ENTRIES, the least recently used sessions are evicted.
+
+`lock(session_id)` serialises changes to one session. It is re-entrant
+within a thread and, where fcntl is available, also exclusive across
+processes. `edit(session_id)` loads, yields and saves a session under that
+lock. Every change goes through it, so a read-modify-write in one worker
+never overwrites a concurrent one in another. Keep the body short: never
+call the LLM while holding the lock.
+
+Environment:
+    SESSION_STORE          "sqlite" (default) or "memory"
+    SESSION_STORE_PATH     SQLite file (default Backend/data/sessions.sqlite3)
+    SESSION_TTL_SEC        idle time before a session expires (default 21600)
+    SESSION_MAX_ENTRIES    LRU cap on stored sessions (default 1000)
+"""
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks then only cover the threads of one process
+    fcntl = None
+
+SESSION_STORE = os.getenv("SESSION_STORE", "sqlite").lower()
+SESSION_STORE_PATH = os.getenv(
+    "SESSION_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sessions.sqlite3"),
+)
+SESSION_TTL_SEC = float(os.getenv("SESSION_TTL_SEC", "21600"))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "1000"))
+
+LOCK_STRIPES = 64
+TOUCH_INTERVAL_SEC = 30  # reads refresh a session's last access at most this often
+PURGE_EVERY_WRITES = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_last_access ON sessions (last_access);
+"""
+
+
+def _json_default(value):
+    # numpy scalars from the scoring code
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+class SessionLocks:
+    """Session ids hashed onto lock stripes.
+
+    Each stripe is an RLock, so it is re-entrant within a thread. When
+    `lock_dir` is set, the outermost acquisition also takes an flock on the
+    stripe's file, which makes it exclusive across processes.
+    """
+
+    def __init__(self, lock_dir=None, stripes=LOCK_STRIPES):
+        self.lock_dir = lock_dir if fcntl is not None else None
+        self._stripes = [threading.RLock() for _ in range(stripes)]
+        self._depth = [0] * stripes
+        self._files = {}
+        self._files_pid = os.getpid()
+
+    def _file(self, stripe):
+        # caller holds the stripe's RLock; files are per process (reopened after fork)
+        if self._files_pid != os.getpid():
+            self._files, self._files_pid = {}, os.getpid()
+        handle = self._files.get(stripe)
+        if handle is None:
+            os.makedirs(self.lock_dir, exist_ok=True)
+            handle = open(os.path.join(self.lock_dir, f"stripe-{stripe:02d}.lock"), "a+")
+            self._files[stripe] = handle
+        return handle
+
+    @contextmanager
+    def hold(self, session_id):
+        stripe = zlib.crc32(str(session_id).encode("utf-8")) % len(self._stripes)
+        with self._stripes[stripe]:
+            outermost = self._depth[stripe] == 0
+            if outermost and self.lock_dir:
+                fcntl.flock(self._file(stripe).fileno(), fcntl.LOCK_EX)
+            self._depth[stripe] += 1
+            try:
+                yield
+            finally:
+                self._depth[stripe] -= 1
+                if outermost and self.lock_dir:
+                    fcntl.flock(self._file(stripe).fileno(), fcntl.LOCK_UN)
+
+
+class SessionStore:
+    """Shared part of both backends: locking, `edit`, counters."""
+
+    def __init__(self, ttl_sec=21600.0, max_entries=1000, lock_dir=None):
+        self.ttl_sec = float(ttl_sec)
+        self.max_entries = max(1, int(max_entries))
+        self.locks = SessionLocks(lock_dir)
+        self._stats_lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "saves": 0, "expired": 0, "evicted": 0, "errors": 0}
+
+    def _count(self, name, n=1):
+        with self._stats_lock:
+            self._counters[name] += n
+
+    # ---------- public API ----------
+    def __contains__(self, session_id):
+        return bool(session_id) and self.get(session_id) is not None
+
+    def lock(self, session_id):
+        return self.locks.hold(session_id)
+
+    @contextmanager
+    def edit(self, session_id):
+        """Load a session under its lock, yield it for changes, then save it.
+
+        Raises KeyError if the session does not exist (or has expired).
+        """
+        with self.lock(session_id):
+            session = self.get(session_id)
+            if session is None:
+                raise KeyError(session_id)
+            yield session
+            self.save(session)
+
+    def update(self, session_id, **fields):
+        """Set top-level fields of a session. Returns False if the session is gone."""
+        try:
+            with self.edit(session_id) as session:
+                session.update(fields)
+            return True
+        except KeyError:
+            return False
+
+    def stats(self):
+        with self._stats_lock:
+            counters = dict(self._counters)
+        counters["backend"] = self.backend
+        counters["ttl_sec"] = self.ttl_sec
+        counters["max_entries"] = self.max_entries
+        return counters
+
+
+class MemorySessionStore(SessionStore):
+    """Process-local store. get() returns the live session dict."""
+
+    backend = "memory"
+
+    def __init__(self, ttl_sec=21600.0, max_entries=1000):
+        super().__init__(ttl_sec, max_entries)
+        self._sessions = OrderedDict()  # session_id -> (session, last_access), least recent first
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and now - entry[1] > self.ttl_sec:
+                del self._sessions[session_id]
+                self._count("expired")
+                entry = None
+            if entry is None:
+                self._count("misses")
+                return None
+            self._sessions[session_id] = (entry[0], now)
+            self._sessions.move_to_end(session_id)
+        self._count("hits")
+        return entry[0]
+
+    def save(self, session):
+        with self._lock:
+            self._sessions[session["session_id"]] = (session, time.time())
+            self._sessions.move_to_end(session["session_id"])
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+                self._count("evicted")
+        self._count("saves")
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self):
+        counters = super().stats()
+        with self._lock:
+            counters["sessions"] = len(self._sessions)
+        return counters
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions as JSON documents in a WAL-mode SQLite file shared by every worker.
+
+    get() returns a fresh copy, so changes only count once they go through
+    edit() / update() / save().
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path, ttl_sec=21600.0, max_entries=1000):
+        super().__init__(ttl_sec, max_entries, lock_dir=os.path.join(os.path.dirname(path) or ".", "session_locks"))
+        self.path = path
+        self._conn = None
+        self._conn_pid = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _db(self):
+        # caller holds self._lock; one connection per process (reopened after fork)
+        if self._conn is None or self._conn_pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def get(self, session_id):
+        now = time.time()
+        try:
+            with self._lock:
+                db = self._db()
+                row = db.execute("SELECT data, last_access FROM sessions WHERE id = ?", (session_id,)).fetchone()
+                if row is not None and now - row[1] > self.ttl_sec:
+                    db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                    db.commit()
+                    self._count("expired")
+                    row = None
+                if row is None:
+                    self._count("misses")
+                    return None
+                if now - row[1] > TOUCH_INTERVAL_SEC:
+                    db.execute("UPDATE sessions SET last_access = ? WHERE id = ?", (now, session_id))
+                    db.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Session store read failed: {e}")
+            self._count("errors")
+            return None
+        self._count("hits")
+        return json.loads(row[0])
+
+    def save(self, session):
+        data = json.dumps(session, default=_json_default)
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, last_access) VALUES (?, ?, ?)",
+                (session["session_id"], data, time.time()),
+            )
+            self._writes += 1
+            if self._writes % PURGE_EVERY_WRITES == 1:
+                self._purge(db)
+            db.commit()
+        self._count("saves")
+
+    def delete(self, session_id):
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            db.commit()
+
+    def _purge(self, db):
+        # caller holds self._lock
+        expired = db.execute("DELETE FROM sessions WHERE last_access < ?", (time.time() - self.ttl_sec,)).rowcount
+        excess = db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] - self.max_entries
+        if excess > 0:
+            db.execute(
+                "DELETE FROM sessions WHERE id IN (SELECT id FROM sessions ORDER BY last_access ASC LIMIT ?)",
+                (excess,),
+            )
+            self._count("evicted", excess)
+        if expired > 0:
+            self._count("expired", expired)
+
+    def stats(self):
+        counters = super().stats()
+        try:
+            with self._lock:
+                counters["sessions"] = self._db().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        except sqlite3.Error:
+            counters["sessions"] = None
+        return counters
+
+
+def create_session_store(kind=SESSION_STORE):
+    if kind == "memory":
+        return MemorySessionStore(SESSION_TTL_SEC, SESSION_MAX_ENTRIES)
+    if kind != "sqlite":
+        print(f"⚠️ Unknown SESSION_STORE {kind!r}, using sqlite")
+    return SQLiteSessionStore(SESSION_STORE_PATH, SESSION_TTL_SEC, SESSION_MAX_ENTRIES)
+
+
+# Process-wide store used by backend_api
+session_store = create_session_store()
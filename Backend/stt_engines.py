@@ -0,0 +1,272 @@
+# stt_engines.py
+"""Speech-to-text engines behind one interface.
+
+    openai-whisper   the original PyTorch Whisper (fp32 on CPU)
+    faster-whisper   Whisper on CTranslate2; int8 weights by default, which
+                     is several times faster on CPU-only hosts at about the
+                     same accuracy
+
+An engine is created by name and loads its model on the first call. It
+exposes transcribe(path) -> text and transcribe_batch(paths). The batch
+form returns one {"text"} or {"error"} per clip, which is what
+transcription_service sends back. exp2.transcribe_with_whisper and the
+transcription service workers both use the engine returned by
+get_engine().
+
+Every clip is decoded to 16 kHz mono first. Unless STT_VAD=0, its
+silences are then cut out with audio_vad.trim_silence before the model
+sees it. transcribe_detailed(path) also returns Whisper's segments, with
+timestamps mapped back onto the original recording, and the trimming
+report.
+
+Environment:
+    STT_ENGINE         "openai-whisper" (default) or "faster-whisper"
+    WHISPER_MODEL      model size or path (default "small")
+    STT_DEVICE         "cpu" (default) or "cuda"
+    STT_COMPUTE_TYPE   faster-whisper weights: "int8" (default), "int8_float32", "float32", ...
+    STT_THREADS        CPU threads per engine; 0 = the library default (default 0)
+    STT_BEAM_SIZE      1 = greedy decoding, as openai-whisper does by default (default 1)
+    STT_LANGUAGE       spoken language (default "en")
+    STT_VAD            "1" (default) trims silence first, "0" transcribes the whole clip (see audio_vad)
+"""
+import os
+import time
+import threading
+import importlib.util
+
+import audio_vad
+
+STT_ENGINE = os.getenv("STT_ENGINE", "openai-whisper").lower()
+WHISPER_MODEL_NAME = os.getenv("WHISPER_MODEL", "small")
+STT_DEVICE = os.getenv("STT_DEVICE", "cpu")
+STT_COMPUTE_TYPE = os.getenv("STT_COMPUTE_TYPE", "int8")
+STT_THREADS = int(os.getenv("STT_THREADS", "0"))
+STT_BEAM_SIZE = int(os.getenv("STT_BEAM_SIZE", "1"))
+STT_LANGUAGE = os.getenv("STT_LANGUAGE", "en")
+
+SAMPLE_RATE = 16000  # both engines decode to 16 kHz mono
+
+
+class STTEngine:
+    """Shared part of every engine: lazy, thread-safe loading and counters."""
+
+    name = "base"
+    package = None  # module that must be importable for the engine to work
+    batched_inference = False  # True only if transcribe_batch runs several clips through the model at once
+
+    def __init__(self, model_name="small", device="cpu", threads=0, beam_size=1, language="en", vad=True):
+        self.model_name = model_name
+        self.device = device
+        self.threads = max(0, int(threads))
+        self.beam_size = max(1, int(beam_size))
+        self.language = language
+        self.vad = vad
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._counters = {"clips": 0, "errors": 0, "audio_sec": 0.0, "busy_sec": 0.0, "load_sec": None,
+                          "vad_removed_sec": 0.0, "silent_clips": 0}
+
+    @classmethod
+    def available(cls):
+        return importlib.util.find_spec(cls.package) is not None
+
+    def describe(self):
+        return f"{self.name}:{self.model_name}"
+
+    # ---------- public API ----------
+    def load(self):
+        """Load the model once; later calls return the same object."""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    started = time.monotonic()
+                    print(f"🔄 Loading {self.describe()} on {self.device}...")
+                    self._model = self._load()
+                    self._counters["load_sec"] = round(time.monotonic() - started, 2)
+                    print(f"✅ {self.describe()} loaded in {self._counters['load_sec']}s")
+        return self._model
+
+    def transcribe(self, audio_path):
+        """Transcript of one clip. Raises on failure."""
+        return self.transcribe_detailed(audio_path)["text"]
+
+    def transcribe_detailed(self, audio_path):
+        """{"text", "segments", "audio_sec", "vad"} for one clip. Raises on failure.
+
+        Segment start/end times refer to the original recording, also when
+        silence was trimmed. "vad" is the trim_silence report (None with
+        STT_VAD=0).
+        """
+        if not os.path.exists(audio_path) or os.path.getsize(audio_path) == 0:
+            raise ValueError(f"Audio file missing or empty: {audio_path}")
+        model = self.load()
+        started = time.monotonic()
+        try:
+            audio = self._decode(audio_path)
+            audio_sec = len(audio) / SAMPLE_RATE
+            report, time_map = None, None
+            if self.vad:
+                audio, time_map, report = audio_vad.trim_silence(audio, SAMPLE_RATE)
+            # A clip without any speech never reaches the model
+            text, segments = self._transcribe(model, audio) if len(audio) else ("", [])
+        except Exception:
+            with self._stats_lock:
+                self._counters["errors"] += 1
+            raise
+        if time_map is not None and segments:
+            for segment in segments:
+                segment["start"] = round(time_map.to_original(segment["start"]), 2)
+                segment["end"] = round(time_map.to_original(segment["end"]), 2)
+        with self._stats_lock:
+            self._counters["clips"] += 1
+            self._counters["busy_sec"] += time.monotonic() - started
+            self._counters["audio_sec"] += audio_sec
+            if report is not None:
+                self._counters["vad_removed_sec"] += report["removed_sec"]
+                self._counters["silent_clips"] += report["regions"] == 0
+        if report is not None and report["removed_sec"] > 0:
+            print(f"✂️ Trimmed {report['removed_sec']:.1f}s of silence from {audio_sec:.1f}s of audio "
+                  f"({report['removed_ratio']:.0%})")
+        return {"text": text, "segments": segments, "audio_sec": round(audio_sec, 2), "vad": report}
+
+    def transcribe_batch(self, audio_paths):
+        """One {"text"} or {"error"} per clip, in order."""
+        results = []
+        for path in audio_paths:
+            try:
+                results.append({"text": self.transcribe(path)})
+            except Exception as e:
+                results.append({"error": str(e)})
+        return results
+
+    def stats(self):
+        with self._stats_lock:
+            counters = dict(self._counters)
+        counters["engine"] = self.describe()
+        counters["busy_sec"] = round(counters["busy_sec"], 2)
+        counters["audio_sec"] = round(counters["audio_sec"], 2)
+        counters["vad_removed_sec"] = round(counters["vad_removed_sec"], 2)
+        counters["vad_removed_ratio"] = (
+            round(counters["vad_removed_sec"] / counters["audio_sec"], 3) if counters["audio_sec"] else None
+        )
+        # Real-time factor: processing time per second of audio (lower is faster)
+        counters["rtf"] = round(counters["busy_sec"] / counters["audio_sec"], 3) if counters["audio_sec"] else None
+        return counters
+
+    # ---------- per engine ----------
+    def _load(self):
+        raise NotImplementedError
+
+    def _decode(self, audio_path):
+        """16 kHz mono float32 samples of the clip."""
+        raise NotImplementedError
+
+    def _transcribe(self, model, audio):
+        """Returns (text, [{"start", "end", "text"}, ...]) with times in seconds into `audio`."""
+        raise NotImplementedError
+
+
+class OpenAIWhisperEngine(STTEngine):
+    name = "openai-whisper"
+    package = "whisper"
+
+    def _load(self):
+        import whisper
+
+        if self.threads:
+            import torch
+
+            torch.set_num_threads(self.threads)
+        return whisper.load_model(self.model_name, device=self.device)
+
+    def _decode(self, audio_path):
+        import whisper
+
+        return whisper.load_audio(audio_path)
+
+    def _transcribe(self, model, audio):
+        result = model.transcribe(
+            audio,
+            language=self.language,
+            task="transcribe",
+            fp16=self.device != "cpu",  # fp16 is not supported on CPU; avoids the warning
+            beam_size=self.beam_size if self.beam_size > 1 else None,
+        )
+        segments = [{"start": s["start"], "end": s["end"], "text": s["text"].strip()} for s in result["segments"]]
+        return result["text"].strip(), segments
+
+
+class FasterWhisperEngine(STTEngine):
+    name = "faster-whisper"
+    package = "faster_whisper"
+
+    def __init__(self, model_name="small", device="cpu", threads=0, beam_size=1, language="en", vad=True,
+                 compute_type="int8"):
+        super().__init__(model_name, device, threads, beam_size, language, vad)
+        self.compute_type = compute_type
+
+    def describe(self):
+        return f"{self.name}:{self.model_name}:{self.compute_type}"
+
+    def _load(self):
+        from faster_whisper import WhisperModel
+
+        return WhisperModel(
+            self.model_name,
+            device=self.device,
+            compute_type=self.compute_type,
+            cpu_threads=self.threads,
+        )
+
+    def _decode(self, audio_path):
+        from faster_whisper import decode_audio
+
+        return decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+
+    def _transcribe(self, model, audio):
+        segments, _ = model.transcribe(
+            audio,
+            language=self.language,
+            task="transcribe",
+            beam_size=self.beam_size,
+        )
+        # segments is a generator; decoding happens while it is consumed
+        segments = [{"start": s.start, "end": s.end, "text": s.text.strip()} for s in segments]
+        return " ".join(s["text"] for s in segments).strip(), segments
+
+
+ENGINES = {engine.name: engine for engine in (OpenAIWhisperEngine, FasterWhisperEngine)}
+
+
+def create_engine(name=STT_ENGINE, model_name=WHISPER_MODEL_NAME, device=STT_DEVICE, threads=STT_THREADS,
+                  beam_size=STT_BEAM_SIZE, language=STT_LANGUAGE, compute_type=STT_COMPUTE_TYPE,
+                  vad=audio_vad.STT_VAD):
+    engine_cls = ENGINES.get(name)
+    if engine_cls is None:
+        raise ValueError(f"Unknown STT engine {name!r}; choose from {sorted(ENGINES)}")
+    kwargs = {"model_name": model_name, "device": device, "threads": threads, "beam_size": beam_size,
+              "language": language, "vad": vad}
+    if engine_cls is FasterWhisperEngine:
+        kwargs["compute_type"] = compute_type
+    return engine_cls(**kwargs)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """The process-wide engine configured by STT_ENGINE, or None if its package is not installed."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine_cls = ENGINES.get(STT_ENGINE)
+                if engine_cls is None:
+                    print(f"⚠️ Unknown STT_ENGINE {STT_ENGINE!r}, using openai-whisper")
+                    engine_cls = OpenAIWhisperEngine
+                if not engine_cls.available():
+                    return None
+                _engine = create_engine(engine_cls.name)
+    return _engine
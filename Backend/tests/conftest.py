@@ -0,0 +1,56 @@
+import os
+import sys
+
+# The backend is a flat directory of modules, not a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Never touch the real session file or call Gemini from a test
+os.environ.setdefault("SESSION_STORE", "memory")
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def fake_llm_backend():
+    """The deterministic fake Gemini backend with fresh counters; `configure(latency=...)` to slow it down."""
+    import fake_llm
+    fake_llm.configure(latency="fixed:0")
+    yield fake_llm
+    fake_llm.configure(latency="fixed:0")
+
+
+@pytest.fixture
+def api(fake_llm_backend):
+    """Flask test client for backend_api; `api.new_session(questions)` stores a ready session."""
+    import types
+    import uuid
+
+    import backend_api
+
+    def new_session(questions, **fields):
+        session_id = str(uuid.uuid4())
+        session = {"session_id": session_id, "status": "ready", "resume_text": "", "resume_digest": None,
+                   "questions": list(questions), "key_points": [[] for _ in questions], "slots": []}
+        session.update(fields)
+        backend_api.active_sessions.save(session)
+        return session_id
+
+    return types.SimpleNamespace(
+        module=backend_api,
+        client=backend_api.app.test_client(),
+        sessions=backend_api.active_sessions,
+        new_session=new_session,
+    )
+
+
+def parse_sse(body):
+    """[(event, payload)] from a text/event-stream body."""
+    import json
+
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
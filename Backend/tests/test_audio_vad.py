@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+import audio_vad
+
+RATE = 16000
+
+
+def _clip(*parts):
+    """Concatenate (seconds, amplitude) parts: a 220 Hz tone, or silence for amplitude 0."""
+    pieces = []
+    for seconds, amplitude in parts:
+        t = np.arange(int(seconds * RATE)) / RATE
+        pieces.append((amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32))
+    return np.concatenate(pieces)
+
+
+def test_frame_rms():
+    rms = audio_vad.frame_rms(np.ones(250, dtype=np.float32), 100)
+    assert rms == pytest.approx([1.0, 1.0, np.sqrt(0.5)])
+
+
+def test_speech_frames_pads_and_fills_short_pauses():
+    rms = np.array([0, 0, 0, 1, 1, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0], dtype=float)
+    keep = audio_vad.speech_frames(rms, min_rms=0.1, pad_frames=1, min_silence_frames=2)
+    assert keep.tolist() == [False, False, True, True, True, True, True, True, True] + [False] * 7
+
+
+def test_speech_frames_without_speech():
+    assert not audio_vad.speech_frames(np.zeros(10), min_rms=0.1).any()
+    assert audio_vad.speech_frames(np.zeros(0)).size == 0
+
+
+def test_trim_silence_cuts_leading_trailing_and_long_pauses():
+    clip = _clip((2.0, 0), (1.0, 0.5), (3.0, 0), (1.0, 0.5), (2.0, 0))
+    trimmed, time_map, report = audio_vad.trim_silence(clip, RATE, pad_ms=100, min_silence_ms=500)
+    assert report["regions"] == 2
+    assert report["input_sec"] == 9.0
+    assert report["kept_sec"] == pytest.approx(2.4, abs=0.1)
+    assert len(trimmed) / RATE == pytest.approx(report["kept_sec"], abs=0.01)
+    # The start of the second region maps back to just before 6s in the original
+    second_start = time_map.kept_starts[1]
+    assert time_map.to_original(second_start) == pytest.approx(5.9, abs=0.05)
+
+
+def test_trim_silence_keeps_a_clip_with_little_to_remove():
+    clip = _clip((0.1, 0), (2.0, 0.5))
+    trimmed, time_map, report = audio_vad.trim_silence(clip, RATE)
+    assert len(trimmed) == len(clip)
+    assert report["removed_sec"] == 0.0
+    assert time_map.to_original(1.5) == 1.5
+
+
+def test_trim_silence_of_pure_silence_is_empty():
+    trimmed, _time_map, report = audio_vad.trim_silence(np.zeros(RATE * 3, dtype=np.float32), RATE)
+    assert len(trimmed) == 0
+    assert report["regions"] == 0
+    assert report["removed_ratio"] == 1.0
+
+
+def test_time_map():
+    time_map = audio_vad.TimeMap([0.0, 1.0], [2.0, 6.0], [1.0, 1.5])
+    assert time_map.to_original(0.5) == 2.5
+    assert time_map.to_original(1.25) == 6.25
+    assert time_map.to_original(9.0) == 7.5  # clamped to the end of the last region
+    assert time_map.to_original(np.array([0.0, 1.0])).tolist() == [2.0, 6.0]
+    assert time_map.as_list()[1] == {"start": 1.0, "original_start": 6.0, "duration": 1.5}
@@ -0,0 +1,40 @@
+import wave
+
+import pytest
+
+import chunked_transcription
+from chunked_transcription import merge_transcripts
+
+
+@pytest.mark.parametrize(
+    "previous, new, merged",
+    [
+        ("I built a REST API", "a REST API with Flask", "I built a REST API with Flask"),
+        ("it was very intere", "interesting work", "it was very interesting work"),
+        ("the most interesting", "esting part was", "the most interesting part was"),
+        ("Hello, world.", "world! Again", "Hello, world! Again"),
+        ("no shared words", "here at all", "no shared words here at all"),
+        ("", "only new", "only new"),
+        ("only old", "", "only old"),
+    ],
+)
+def test_merge_transcripts(previous, new, merged):
+    assert merge_transcripts(previous, new) == merged
+
+
+def test_merge_transcripts_ignores_short_partial_words():
+    # "a" is a prefix of "and" but too short to count as a clipped word
+    assert merge_transcripts("this is a", "and that") == "this is a and that"
+
+
+def test_merge_transcripts_respects_max_overlap():
+    words = " ".join(str(i) for i in range(20))
+    assert merge_transcripts(words, words, max_overlap_words=5) == f"{words} {words}"
+
+
+def test_write_wav(tmp_path):
+    path = str(tmp_path / "clip.wav")
+    chunked_transcription.write_wav(path, b"\x00\x01" * 16000)
+    with wave.open(path, "rb") as wav:
+        assert (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) == (1, 2, 16000)
+        assert wav.getnframes() == 16000
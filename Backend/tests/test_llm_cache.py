@@ -0,0 +1,60 @@
+import time
+
+import llm_cache
+
+
+def test_cache_key_depends_on_every_input():
+    key = llm_cache.make_cache_key("prompt", "model", {"temperature": 0.3})
+    assert key == llm_cache.make_cache_key("prompt", "model", {"temperature": 0.3})
+    assert key != llm_cache.make_cache_key("prompt!", "model", {"temperature": 0.3})
+    assert key != llm_cache.make_cache_key("prompt", "other", {"temperature": 0.3})
+    assert key != llm_cache.make_cache_key("prompt", "model", {"temperature": 0.4})
+
+
+def test_cache_key_ignores_config_key_order():
+    assert llm_cache.make_cache_key("p", "m", {"a": 1, "b": 2}) == llm_cache.make_cache_key("p", "m", {"b": 2, "a": 1})
+
+
+def test_memory_hit_and_miss():
+    cache = llm_cache.ResponseCache(max_entries=4)
+    assert cache.get("k") is None
+    cache.set("k", "value")
+    assert cache.get("k") == "value"
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_empty_and_non_string_values_are_not_stored():
+    cache = llm_cache.ResponseCache()
+    cache.set("empty", "")
+    cache.set("none", None)
+    assert cache.get("empty") is None and cache.get("none") is None
+
+
+def test_lru_eviction():
+    cache = llm_cache.ResponseCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+
+
+def test_ttl_expiry(monkeypatch):
+    cache = llm_cache.ResponseCache(ttl_sec=10)
+    cache.set("k", "v")
+    now = time.time()
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now + 11)
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_disk_tier_is_shared(tmp_path):
+    first = llm_cache.ResponseCache(disk_dir=str(tmp_path))
+    first.set("k", "from disk")
+    second = llm_cache.ResponseCache(disk_dir=str(tmp_path))
+    assert second.get("k") == "from disk"
+    assert second.stats()["disk_hits"] == 1
+    second.clear()
+    assert llm_cache.ResponseCache(disk_dir=str(tmp_path)).get("k") is None
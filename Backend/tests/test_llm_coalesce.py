@@ -0,0 +1,71 @@
+import threading
+import time
+
+import llm_coalesce
+
+
+def _run_concurrently(fn, count):
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_identical_concurrent_calls_run_once():
+    flight = llm_coalesce.SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "answer"
+
+    results = _run_concurrently(lambda: flight.do("key", slow), 5)
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert {result for result, _ in results} == {"answer"}
+    assert flight.stats() == {"leaders": 1, "coalesced": 4, "errors": 0, "in_flight": 0}
+
+
+def test_different_keys_do_not_coalesce():
+    flight = llm_coalesce.SingleFlight()
+    assert flight.do("a", lambda: 1) == (1, False)
+    assert flight.do("b", lambda: 2) == (2, False)
+    # A finished call is not reused: the next one with the same key runs again
+    assert flight.do("a", lambda: 3) == (3, False)
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    flight = llm_coalesce.SingleFlight()
+
+    def failing():
+        time.sleep(0.2)
+        raise RuntimeError("quota")
+
+    results = _run_concurrently(lambda: flight.do("key", failing), 3)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()["errors"] == 1
+    assert flight.do("key", lambda: "ok") == ("ok", False)
+
+
+def test_call_llm_sends_one_request_for_identical_prompts(fake_llm_backend):
+    import exp2
+
+    fake_llm_backend.configure(latency="fixed:300")
+    prompt = "Generate interview questions for a coalescing test"
+    results = _run_concurrently(lambda: exp2.call_llm(prompt, use_cache=False, task="questions"), 4)
+    assert fake_llm_backend.stats()["calls"] == 1
+    assert len(set(results)) == 1
+
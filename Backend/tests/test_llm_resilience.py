@@ -0,0 +1,142 @@
+import threading
+import time
+
+import pytest
+
+import llm_resilience
+
+
+def _open_breaker(reset_timeout_sec=0.1):
+    breaker = llm_resilience.CircuitBreaker("test-model", failure_threshold=2, reset_timeout_sec=reset_timeout_sec)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    return breaker
+
+
+# ---------- circuit breaker ----------
+def test_breaker_opens_after_consecutive_failures():
+    breaker = _open_breaker()
+    assert breaker.state == "open"
+    assert breaker.is_open()
+    assert breaker.allow() is False
+    assert breaker.stats()["short_circuited"] == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = llm_resilience.CircuitBreaker("test-model", failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_breaker_open_half_open_closed():
+    breaker = _open_breaker(reset_timeout_sec=0.05)
+    time.sleep(0.06)
+    assert not breaker.is_open()
+    # Exactly one probe goes through while half-open
+    assert breaker.allow() is True
+    assert breaker.state == "half_open"
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() is True
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = _open_breaker(reset_timeout_sec=0.05)
+    time.sleep(0.06)
+    assert breaker.allow() is True
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.allow() is False
+
+
+def test_released_probe_lets_the_next_caller_probe():
+    breaker = _open_breaker(reset_timeout_sec=0.05)
+    time.sleep(0.06)
+    assert breaker.allow() is True
+    breaker.release_probe()
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+
+
+def test_stream_closed_early_releases_the_probe(fake_llm_backend):
+    import exp2
+
+    model_name = "breaker-stream-test"
+    breaker = llm_resilience.breaker_for(model_name)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    breaker.opened_at -= breaker.reset_timeout_sec  # due for a probe
+
+    stream = exp2.stream_llm("Evaluate this answer for a breaker test", model_name=model_name, use_cache=False)
+    next(stream)
+    stream.close()
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+
+
+# ---------- deadlines and hedging ----------
+def test_call_returns_within_budget():
+    assert llm_resilience.call_with_deadline("evaluation", lambda timeout: "ok", budget=1) == "ok"
+
+
+def test_call_times_out():
+    with pytest.raises(llm_resilience.LLMTimeout):
+        llm_resilience.call_with_deadline("evaluation", lambda timeout: time.sleep(0.5), budget=0.05)
+
+
+def test_errors_are_raised():
+    def fail(timeout):
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        llm_resilience.call_with_deadline("evaluation", fail, budget=1)
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    tracker = llm_resilience.LatencyTracker()
+    for _ in range(llm_resilience.HEDGE_MIN_SAMPLES):
+        tracker.observe("evaluation", 0.05)
+    monkeypatch.setattr(llm_resilience, "latency", tracker)
+    monkeypatch.setattr(llm_resilience, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(llm_resilience, "HEDGE_MIN_DELAY_SEC", 0.05)
+
+
+def _first_call_slow():
+    calls = []
+    lock = threading.Lock()
+
+    def fn(timeout):
+        with lock:
+            calls.append(timeout)
+            attempt = len(calls)
+        if attempt == 1:
+            time.sleep(1.0)
+            return "primary"
+        return "hedge"
+
+    return fn, calls
+
+
+def test_hedge_wins_when_the_primary_is_slow(hedging):
+    fn, calls = _first_call_slow()
+    started = time.monotonic()
+    assert llm_resilience.call_with_deadline("evaluation", fn, budget=5) == "hedge"
+    assert time.monotonic() - started < 0.5
+    assert len(calls) == 2
+
+
+def test_hedge_can_be_vetoed(hedging):
+    fn, calls = _first_call_slow()
+    assert llm_resilience.call_with_deadline("evaluation", fn, budget=5, admit_hedge=lambda: False) == "primary"
+    assert len(calls) == 1
+
+
+def test_no_hedging_without_enough_samples(monkeypatch):
+    monkeypatch.setattr(llm_resilience, "latency", llm_resilience.LatencyTracker())
+    monkeypatch.setattr(llm_resilience, "HEDGE_ENABLED", True)
+    assert llm_resilience.hedge_delay_for("evaluation", 30) is None
@@ -0,0 +1,72 @@
+import pytest
+
+import llm_resilience
+import llm_router
+
+
+def test_failover_chain_walks_towards_faster_tiers():
+    tiers = llm_router.MODEL_TIERS
+    assert llm_router.failover_chain("evaluation") == [tiers["standard"], tiers["fast"]]
+    assert llm_router.failover_chain("questions") == [tiers["fast"]]
+
+
+def test_failover_chain_for_a_model_name(monkeypatch):
+    monkeypatch.setitem(llm_router.ROUTES, "evaluation", "custom-model")
+    assert llm_router.failover_chain("evaluation") == ["custom-model"]
+    assert llm_router.primary_model("evaluation") == "custom-model"
+
+
+def test_parse_routes():
+    routes = llm_router._parse_routes("questions=deep, ats = standard ,broken,=fast")
+    assert routes["questions"] == "deep"
+    assert routes["ats"] == "standard"
+    assert routes["evaluation"] == llm_router.DEFAULT_ROUTES["evaluation"]
+
+
+def test_parse_targets_skips_invalid_values():
+    targets = llm_router._parse_targets("evaluation=9,ats=soon")
+    assert targets["evaluation"] == 9.0
+    assert targets["ats"] == llm_router.DEFAULT_P95_TARGETS_SEC["ats"]
+
+
+def test_p95_target_stays_below_the_deadline(monkeypatch):
+    for task in llm_router.DEFAULT_P95_TARGETS_SEC:
+        assert llm_router.p95_target_for(task) < llm_resilience.budget_for(task)
+    monkeypatch.setitem(llm_router.P95_TARGETS_SEC, "evaluation", 1000.0)
+    assert llm_router.p95_target_for("evaluation") == pytest.approx(
+        llm_resilience.budget_for("evaluation") * llm_router.MAX_TARGET_BUDGET_FRACTION
+    )
+
+
+def test_model_health_needs_enough_samples():
+    health = llm_router.ModelHealth(window_sec=60)
+    for _ in range(llm_router.MIN_SAMPLES - 1):
+        health.observe("evaluation", 1.0, True)
+    assert health.p95("evaluation") is None
+    assert health.error_rate() is None
+    health.observe("evaluation", 9.0, False)
+    assert health.p95("evaluation") == 9.0
+    assert health.error_rate() == pytest.approx(1 / llm_router.MIN_SAMPLES)
+
+
+def test_slow_primary_fails_over_to_the_faster_tier():
+    router = llm_router.LLMRouter(window_sec=60)
+    primary, fallback = llm_router.failover_chain("evaluation")
+    assert router.route("evaluation") == primary
+
+    slow = llm_router.p95_target_for("evaluation") + 1
+    for _ in range(llm_router.MIN_SAMPLES):
+        router.observe(primary, "evaluation", slow, True)
+    assert "target" in router.unhealthy_reason(primary, "evaluation")
+    assert router.route("evaluation") == fallback
+    # Other tasks on the same model are judged on their own latency
+    assert router.unhealthy_reason(primary, "batch_evaluation") is None
+    assert router.stats()["failovers"] == 1
+
+
+def test_error_rate_fails_over():
+    router = llm_router.LLMRouter(window_sec=60, max_error_rate=0.5)
+    primary, fallback = llm_router.failover_chain("evaluation")
+    for i in range(llm_router.MIN_SAMPLES):
+        router.observe(primary, "evaluation", None, i % 2 == 0)
+    assert router.route("evaluation") == fallback
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+import llm_scheduler
+
+
+def test_priorities():
+    assert llm_scheduler.priority_for("evaluation") < llm_scheduler.priority_for("ats")
+    assert llm_scheduler.priority_for("ats") < llm_scheduler.priority_for("ats_speculative")
+    assert llm_scheduler.priority_for("unknown") == llm_scheduler.TASK_PRIORITIES["default"]
+
+
+def test_estimate_tokens():
+    assert llm_scheduler.estimate_tokens("x" * 400, 100) == 200
+    assert llm_scheduler.estimate_tokens(None, None) == 0
+
+
+def test_token_bucket_reserve():
+    bucket = llm_scheduler.TokenBucket(60)
+    now = bucket.updated
+    assert bucket.seconds_until(1, 0.0, now) == 0.0
+    bucket.take(55)
+    # 5 left: a reserved class must leave 12 (20% of 60) behind
+    assert bucket.seconds_until(1, 0.0, now) == 0.0
+    assert bucket.seconds_until(1, 0.2, now) == pytest.approx(8.0)
+
+
+def test_unlimited_bucket():
+    bucket = llm_scheduler.TokenBucket(0)
+    bucket.take(10 ** 9)
+    assert bucket.seconds_until(10 ** 9, 0.5, time.monotonic()) == 0.0
+
+
+def test_acquire_times_out_without_quota():
+    scheduler = llm_scheduler.LLMScheduler(rpm=1, tpm=0, reserve=0.0)
+    assert scheduler.acquire("evaluation", 10, timeout=1) == pytest.approx(0.0, abs=0.1)
+    with pytest.raises(llm_scheduler.SchedulerTimeout):
+        scheduler.acquire("evaluation", 10, timeout=0.05)
+    assert scheduler.stats()["timed_out"] == 1
+
+
+def test_reserve_holds_back_low_priority_calls():
+    scheduler = llm_scheduler.LLMScheduler(rpm=10, tpm=0, reserve=0.2)
+    for _ in range(8):
+        scheduler.acquire("ats_speculative", 1, timeout=1)
+    # Two requests are left, which is exactly the reserve
+    with pytest.raises(llm_scheduler.SchedulerTimeout):
+        scheduler.acquire("ats_speculative", 1, timeout=0.05)
+    scheduler.acquire("evaluation", 1, timeout=0.05)
+
+
+def test_higher_priority_is_admitted_first():
+    scheduler = llm_scheduler.LLMScheduler(rpm=600, tpm=0, reserve=0.0)
+    scheduler.requests.tokens = 0  # refills one request every 0.1s
+    order = []
+
+    def call(task):
+        scheduler.acquire(task, 1, timeout=5)
+        order.append(task)
+
+    low = threading.Thread(target=call, args=("final_assessment",))
+    low.start()
+    time.sleep(0.02)
+    high = threading.Thread(target=call, args=("evaluation",))
+    high.start()
+    low.join()
+    high.join()
+    assert order == ["evaluation", "final_assessment"]
+
+
+def test_try_acquire_never_queues():
+    scheduler = llm_scheduler.LLMScheduler(rpm=1, tpm=0, reserve=0.0)
+    assert scheduler.try_acquire("evaluation", 1) is True
+    assert scheduler.try_acquire("evaluation", 1) is False
+    stats = scheduler.stats()
+    assert (stats["hedges_admitted"], stats["hedges_refused"]) == (1, 1)
@@ -0,0 +1,86 @@
+import json
+
+import llm_schemas
+
+
+def _evaluation(**overrides):
+    value = {
+        "overall_score": 72,
+        "category_scores": {"technical_accuracy": 20, "completeness": 15, "communication": 15,
+                            "problem_solving": 12, "relevance": 10},
+        "strengths": ["clear"],
+        "weaknesses": ["short"],
+        "detailed_feedback": "Good.",
+        "detailed_explanation": "Longer text.",
+    }
+    value.update(overrides)
+    return value
+
+
+def test_parse_valid_evaluation():
+    value, errors = llm_schemas.parse(json.dumps(_evaluation()), llm_schemas.EVALUATION)
+    assert errors == []
+    assert value["overall_score"] == 72
+    # Missing optional fields get empty defaults
+    assert value["improvement_suggestions"] == []
+    assert value["follow_up_questions"] == []
+
+
+def test_integers_are_coerced_and_clamped():
+    value, errors = llm_schemas.parse(json.dumps(_evaluation(overall_score="140")), llm_schemas.EVALUATION)
+    assert errors == []
+    assert value["overall_score"] == 100
+    value, _ = llm_schemas.validate(-3.6, {"type": "integer", "minimum": 0, "maximum": 10})
+    assert value == 0
+
+
+def test_missing_required_field_is_an_error():
+    evaluation = _evaluation()
+    del evaluation["strengths"]
+    _value, errors = llm_schemas.parse(json.dumps(evaluation), llm_schemas.EVALUATION)
+    assert errors == ["$.strengths: missing"]
+
+
+def test_wrong_types_are_errors():
+    _value, errors = llm_schemas.validate({"overall_score": True, "strengths": "x"}, llm_schemas.EVALUATION)
+    assert "$.overall_score: expected integer" in errors
+    assert "$.strengths: expected array" in errors
+
+
+def test_enum_matches_case_insensitively():
+    schema = {"type": "string", "enum": ["Strong Hire", "Hire", "Maybe", "No Hire"]}
+    assert llm_schemas.validate(" strong hire ", schema) == ("Strong Hire", [])
+    _value, errors = llm_schemas.validate("Definitely", schema)
+    assert len(errors) == 1
+
+
+def test_invalid_json():
+    value, errors = llm_schemas.parse("{not json", llm_schemas.EVALUATION)
+    assert value is None
+    assert errors[0].startswith("invalid JSON")
+    assert llm_schemas.parse(None, llm_schemas.ATS)[0] is None
+
+
+def test_response_schema_keeps_only_gemini_keys():
+    schema = llm_schemas.to_response_schema(llm_schemas.EVALUATION)
+    assert "minimum" not in schema["properties"]["overall_score"]
+    assert schema["properties"]["category_scores"]["properties"]["completeness"] == {"type": "integer"}
+
+    def keys(node):
+        found = set(node)
+        for sub in node.get("properties", {}).values():
+            found |= keys(sub)
+        if "items" in node:
+            found |= keys(node["items"])
+        return found
+
+    assert keys(schema) <= llm_schemas.GEMINI_SCHEMA_KEYS
+
+
+def test_outline_keeps_declaration_order():
+    text = llm_schemas.outline(llm_schemas.EVALUATION)
+    assert text.startswith('{"overall_score": <integer 0-100>, "category_scores": {')
+    positions = [text.index(f'"{name}"') for name in llm_schemas.EVALUATION["properties"]]
+    assert positions == sorted(positions)
+    assert "<Junior | Mid | Senior>" in llm_schemas.outline(llm_schemas.FINAL_ASSESSMENT)
+    assert llm_schemas.outline({"type": "array", "items": {"type": "string"}}) == "[<string>, ...]"
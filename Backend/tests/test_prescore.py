@@ -0,0 +1,52 @@
+import pytest
+
+import exp2
+
+
+@pytest.mark.parametrize(
+    "answer, reason",
+    [
+        ("", "empty"),
+        ("Thank you.", "empty"),
+        ("I don't know", "trivial"),
+        ("Pass", "trivial"),
+        ("#### ---- ****", "non_language"),
+        ("um um um um", "non_language"),
+        ("Yes indeed", "near_empty"),
+        ("What is a database index?", "repeats_question"),
+    ],
+)
+def test_prescore_reason(answer, reason):
+    assert exp2.prescore_reason("What is a database index?", answer) == reason
+
+
+@pytest.mark.parametrize(
+    "answer",
+    [
+        "An index is a B-tree over a column so lookups do not scan the whole table.",
+        "O(n log n) via f(x) = x^2 + 3; e.g. a[i] <= a[i+1]",
+        "¿Qué es un índice? Una estructura que acelera las búsquedas.",
+    ],
+)
+def test_prescore_keeps_real_answers(answer):
+    assert exp2.prescore_reason("What is a database index?", answer) is None
+
+
+def test_prescore_code():
+    assert exp2.prescore_reason("Reverse a list", "def solve(a):\n    pass", "code") == "empty_code"
+    assert exp2.prescore_reason("Reverse a list", "def solve(a):\n    return a[::-1]", "code") is None
+
+
+def test_prescored_evaluation_shape():
+    evaluation = exp2.prescored_evaluation("trivial")
+    assert evaluation["overall_score"] == exp2.PRESCORE_SCORES["trivial"]
+    assert set(evaluation["category_scores"]) == {
+        "technical_accuracy", "completeness", "communication", "problem_solving", "relevance"
+    }
+
+
+def test_prescore_words_in_other_scripts():
+    # Devanagari vowel signs are combining marks, not symbols
+    answer = "उपयोगकर्ता डेटा को तेज़ी से खोजने के लिए इंडेक्स बनाया जाता है"
+    assert exp2._answer_words(answer)[0] == "उपयोगकर्ता"
+    assert exp2.prescore_reason("What is a database index?", answer) is None
@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+import question_bank
+
+RESUME = "Jane Doe, backend developer. " + "Built payment APIs in Python and Django with PostgreSQL. " * 6
+SKILLS = ["Python", "Django", "PostgreSQL"]
+
+
+def _question_set(tag):
+    return [f"{tag} conceptual {i}" for i in range(3)] + [f"{tag} coding {i}" for i in range(2)]
+
+
+@pytest.fixture
+def bank(tmp_path):
+    return question_bank.QuestionBank(str(tmp_path / "bank.sqlite3"), min_sets=3, rng=random.Random(7))
+
+
+def _upload(bank, resume=RESUME, skills=SKILLS, tag="set"):
+    """What process_resume does: serve from the bank, or generate and store a new set."""
+    questions, source = bank.get(resume, skills)
+    if questions is None:
+        questions = _question_set(tag)
+        bank.add(resume, skills, questions)
+    return questions, source
+
+
+def test_sets_are_generated_until_the_minimum(bank):
+    sources = [_upload(bank, tag=f"set{i}")[1] for i in range(4)]
+    assert sources == [None, None, None, "resume"]
+    assert bank.stats()["sets"] == 3
+
+
+def test_repeated_gets_are_varied(bank):
+    for i in range(3):
+        _upload(bank, tag=f"set{i}")
+    served = [tuple(bank.get(RESUME, SKILLS)[0]) for _ in range(20)]
+    assert len(set(served)) > 1
+    for questions in served:
+        assert len(questions) == question_bank.QUESTIONS_PER_SET
+        assert len(set(questions)) == len(questions)
+        # Slot order is kept: conceptual questions first, coding last
+        assert all("conceptual" in q for q in questions[:3])
+        assert all("coding" in q for q in questions[3:])
+
+
+def test_hit_and_miss(tmp_path):
+    bank = question_bank.QuestionBank(str(tmp_path / "bank.sqlite3"), min_sets=1)
+    assert bank.get(RESUME, SKILLS) == (None, None)
+    bank.add(RESUME, SKILLS, _question_set("a"))
+    # Case and whitespace changes hash to the same resume
+    assert bank.get("  " + RESUME.upper(), SKILLS) == (_question_set("a"), "resume")
+    assert bank.get(RESUME + " Also wrote Go services.", SKILLS) == (None, None)
+
+
+def test_short_resumes_and_incomplete_sets_are_ignored(tmp_path):
+    bank = question_bank.QuestionBank(str(tmp_path / "bank.sqlite3"), min_sets=1)
+    bank.add("too short", SKILLS, _question_set("a"))
+    bank.add(RESUME, SKILLS, _question_set("a")[:3])
+    assert bank.stats()["sets"] == 0
+    assert bank.get("too short", SKILLS) == (None, None)
+
+
+def test_skill_key_ignores_order_case_and_generic_skills():
+    distinctive = ["Python", "Django", "PostgreSQL", "Redis", "Docker", "AWS"]
+    key = question_bank.skill_key(distinctive)
+    assert key == question_bank.skill_key([s.lower() for s in reversed(distinctive)] + ["Git", "SQL"])
+    assert question_bank.skill_key(distinctive[:5] + ["Git", "SQL", "HTML", "Linux"]) is None
+    assert question_bank.skill_key([]) is None
+
+
+def test_skill_matching_is_opt_in(tmp_path):
+    skills = ["Python", "Django", "PostgreSQL", "Redis", "Docker", "AWS"]
+    other_resume = RESUME.replace("Jane Doe", "John Roe")
+    default = question_bank.QuestionBank(str(tmp_path / "default.sqlite3"), min_sets=1)
+    default.add(RESUME, skills, _question_set("a"))
+    assert default.get(other_resume, skills) == (None, None)
+
+    matching = question_bank.QuestionBank(str(tmp_path / "skills.sqlite3"), min_sets=1, match_skills=True)
+    matching.add(RESUME, skills, _question_set("a"))
+    assert matching.get(other_resume, skills) == (_question_set("a"), "skills")
+    assert matching.get(other_resume, skills[:3]) == (None, None)
+
+
+def test_eviction_at_the_cap(tmp_path):
+    bank = question_bank.QuestionBank(str(tmp_path / "bank.sqlite3"), max_sets=2, min_sets=1)
+    resumes = [RESUME.replace("Jane Doe", name) for name in ("Ann", "Bob", "Cyd")]
+    bank.add(resumes[0], SKILLS, _question_set("a"))
+    bank.add(resumes[1], SKILLS, _question_set("b"))
+    bank.get(resumes[0], SKILLS)  # Ann's set is now the most recently used
+    bank.add(resumes[2], SKILLS, _question_set("c"))
+    stats = bank.stats()
+    assert (stats["sets"], stats["evictions"]) == (2, 1)
+    assert bank.get(resumes[1], SKILLS) == (None, None)
+    assert bank.get(resumes[0], SKILLS)[1] == "resume"
+
+
+def test_hit_rate_stats(tmp_path):
+    bank = question_bank.QuestionBank(str(tmp_path / "bank.sqlite3"), min_sets=1)
+    bank.get(RESUME, SKILLS)
+    bank.add(RESUME, SKILLS, _question_set("a"))
+    bank.get(RESUME, SKILLS)
+    bank.get(RESUME, SKILLS)
+    stats = bank.stats()
+    assert (stats["resume_hits"], stats["skills_hits"], stats["misses"], stats["stores"]) == (2, 0, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3, abs=1e-4)
@@ -0,0 +1,38 @@
+import os
+import tempfile
+import threading
+
+import exp2
+
+EVALUATION = {
+    "overall_score": 72,
+    "category_scores": {"technical_accuracy": 20, "completeness": 15, "communication": 15},
+    "strengths": ["Clear"],
+    "weaknesses": ["Brief"],
+    "detailed_feedback": "Good answer.",
+}
+ASSESSMENT = {"overall_assessment": "Solid candidate.", "key_strengths": ["APIs"], "development_areas": ["Tests"]}
+
+
+def test_concurrent_reports_use_their_own_chart_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    reports = []
+
+    def build():
+        reports.append(exp2.create_comprehensive_report(["Q one", "Q two"], ["A one", "A two"],
+                                                        [EVALUATION, EVALUATION], ASSESSMENT, ""))
+
+    threads = [threading.Thread(target=build) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        assert len(reports) == 2 and all(reports)
+        assert all(os.path.getsize(path) > 0 for path in reports)
+        # The charts were temp files and are gone once embedded
+        assert list(tmp_path.iterdir()) == []
+    finally:
+        for path in set(filter(None, reports)):
+            os.remove(path)
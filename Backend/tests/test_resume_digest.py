@@ -0,0 +1,33 @@
+import exp2
+
+
+def test_resume_digest_skills_and_seniority():
+    digest = exp2.build_resume_digest(
+        "Jane Doe\nSenior Software Engineer, Acme\n"
+        "Built services in Python and TypeScript with Django, React, AWS and Docker\n"
+        "6+ years of experience"
+    )
+    assert digest["seniority"] == "Senior"
+    assert digest["years_experience"] == 6
+    assert {"Python", "TypeScript", "Django", "React", "AWS", "Docker"} <= set(digest["skills"])
+
+
+def test_resume_digest_ignores_senior_words_in_bullets():
+    digest = exp2.build_resume_digest(
+        "Computer Science student\n"
+        "- Worked closely with a senior developer to ship the campus app and fixed many bugs along the way\n"
+        "- Team lead of the robotics club"
+    )
+    assert digest["seniority"] == "Entry"
+
+
+def test_resume_digest_years_need_a_boundary():
+    digest = exp2.build_resume_digest("Python developer, 2.5 years; volunteered 2019 years ago; aged 25 years old")
+    assert digest["years_experience"] is None
+
+
+def test_resume_digest_short_skill_tokens():
+    digest = exp2.build_resume_digest("Our team builds ML pipelines in TS.\nSpring Boot services.")
+    assert {"TypeScript", "Spring", "Machine Learning"} <= set(digest["skills"])
+    lowercase = exp2.build_resume_digest("its ok, ts; in spring we hiked\n500 ml of water, js")
+    assert lowercase["skills"] == []
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+import session_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return session_store.MemorySessionStore(ttl_sec=60, max_entries=3)
+    return session_store.SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"), ttl_sec=60, max_entries=3)
+
+
+def test_save_and_get(store):
+    store.save({"session_id": "a", "questions": ["q1"]})
+    assert store.get("a")["questions"] == ["q1"]
+    assert store.get("missing") is None
+    assert "a" in store
+
+
+def test_edit_persists_changes(store):
+    store.save({"session_id": "a", "answers": []})
+    with store.edit("a") as session:
+        session["answers"].append({"score": 70})
+    assert store.get("a")["answers"] == [{"score": 70}]
+
+
+def test_edit_missing_session_raises(store):
+    with pytest.raises(KeyError):
+        with store.edit("missing"):
+            pass
+
+
+def test_update_reports_missing_session(store):
+    store.save({"session_id": "a"})
+    assert store.update("a", status="ready") is True
+    assert store.get("a")["status"] == "ready"
+    assert store.update("missing", status="ready") is False
+
+
+def test_delete(store):
+    store.save({"session_id": "a"})
+    store.delete("a")
+    assert store.get("a") is None
+
+
+def test_expired_session_is_gone(store, monkeypatch):
+    store.save({"session_id": "a"})
+    now = time.time()
+    monkeypatch.setattr(session_store.time, "time", lambda: now + 120)
+    assert store.get("a") is None
+    assert store.stats()["expired"] == 1
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = session_store.MemorySessionStore(ttl_sec=60, max_entries=2)
+    store.save({"session_id": "a"})
+    store.save({"session_id": "b"})
+    store.get("a")
+    store.save({"session_id": "c"})
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert store.stats()["evicted"] == 1
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    first = session_store.SQLiteSessionStore(path)
+    second = session_store.SQLiteSessionStore(path)
+    first.save({"session_id": "x", "status": "queued"})
+    with second.edit("x") as session:
+        session["status"] = "ready"
+    assert first.get("x")["status"] == "ready"
+
+
+def test_sqlite_get_returns_a_copy(tmp_path):
+    store = session_store.SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+    store.save({"session_id": "a", "answers": []})
+    store.get("a")["answers"].append(1)
+    assert store.get("a")["answers"] == []
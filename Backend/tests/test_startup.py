@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+import measure_startup
+
+# Generous for a cold CI box; the point is to catch a heavy library creeping back into import time
+STARTUP_MAX_SECONDS = float(os.getenv("STARTUP_MAX_SECONDS", "5"))
+HEAVY_MODULES = ["whisper", "torch", "matplotlib", "sounddevice", "pyttsx3"]
+
+
+def _env():
+    env = dict(os.environ, LLM_BACKEND="fake", SESSION_STORE="memory")
+    env.setdefault("GEMINI_API_KEY", "startup-test")
+    return env
+
+
+def test_backend_api_imports_within_budget():
+    seconds, imports = measure_startup.run_once("backend_api", _env())
+    assert seconds < STARTUP_MAX_SECONDS, f"import backend_api took {seconds:.2f}s: {imports}"
+
+
+def test_backend_api_does_not_load_heavy_libraries():
+    snippet = (
+        "import sys, backend_api; "
+        f"print('LOADED', *[name for name in {HEAVY_MODULES!r} if name in sys.modules])"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=os.path.dirname(os.path.abspath(measure_startup.__file__)),
+        env=_env(),
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    loaded = [line.split()[1:] for line in proc.stdout.splitlines() if line.startswith("LOADED")]
+    assert loaded == [[]], f"imported at startup: {loaded}"
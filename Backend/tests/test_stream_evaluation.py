@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+import exp2
+from conftest import parse_sse
+
+QUESTION = "How does a database index speed up queries?"
+ANSWER = ("An index keeps a sorted B-tree of the column values, so a lookup walks the tree "
+          "in logarithmic time instead of scanning every row of the table.")
+
+
+EVALUATION = {
+    "overall_score": 68,
+    "category_scores": {"technical_accuracy": 18},
+    "strengths": ["Covers \"indexes\" ]", "Clear"],
+    "weaknesses": ["No examples"],
+    "detailed_feedback": "Solid but brief.",
+    "detailed_explanation": "Unicode é, a backslash \\ and \"quotes\" survive chunking.",
+    "improvement_suggestions": [],
+}
+
+
+def _feed_in_chunks(text, size):
+    parser = exp2._PartialEvaluationParser()
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i:i + size]))
+    return events
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_partial_parser_emits_each_field_once(size):
+    events = _feed_in_chunks(json.dumps(EVALUATION, indent=2), size)
+    names = [name for name, _ in events if name != "explanation_delta"]
+    assert names == ["score", "strengths", "weaknesses", "feedback"]
+    payloads = dict(events)
+    assert payloads["score"] == {"overall_score": 68}
+    assert payloads["strengths"] == EVALUATION["strengths"]
+    assert payloads["feedback"] == {"detailed_feedback": "Solid but brief."}
+    explanation = "".join(p["text"] for name, p in events if name == "explanation_delta")
+    assert explanation == EVALUATION["detailed_explanation"]
+
+
+def test_partial_parser_waits_for_complete_values():
+    parser = exp2._PartialEvaluationParser()
+    assert parser.feed('{"overall_score": 6') == []
+    assert parser.feed('8, "strengths": ["a"') == [("score", {"overall_score": 68})]
+    assert parser.feed("]") == [("strengths", ["a"])]
+
+
+def test_partial_parser_handles_split_unicode_escapes():
+    parser = exp2._PartialEvaluationParser()
+    deltas = parser.feed('{"detailed_explanation": "caf\\u00')
+    deltas += parser.feed('e9 ok"}')
+    assert "".join(p["text"] for _, p in deltas) == "café ok"
+
+
+# ---------- /api/submit-answer/stream ----------
+def test_stream_endpoint_event_order_and_stored_evaluation(api):
+    session_id = api.new_session([QUESTION])
+    response = api.client.post("/api/submit-answer/stream",
+                               json={"session_id": session_id, "question_index": 0, "answer": ANSWER})
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    events = parse_sse(response.get_data(as_text=True))
+    names = [name for name, _ in events]
+
+    # Transcript and instant local score first, then the partial fields, then the final result
+    assert names[:2] == ["transcript", "provisional"]
+    assert names[-2:] == ["evaluation", "done"]
+    partial = names[2:-2]
+    assert partial[0] == "score"
+    assert {"strengths", "weaknesses", "feedback", "explanation_delta"} <= set(partial)
+    assert partial.index("score") < partial.index("feedback") < partial.index("explanation_delta")
+
+    payloads = dict(events)
+    final = payloads["evaluation"]
+    assert payloads["score"]["overall_score"] == final["evaluation"]["overall_score"]
+    explanation = "".join(p["text"] for name, p in events if name == "explanation_delta")
+    assert explanation == final["evaluation"]["detailed_explanation"]
+
+    slot = api.sessions.get(session_id)["slots"][0]
+    assert slot["status"] == "done"
+    assert slot["answer"] == ANSWER
+    assert slot["evaluation"] == final["evaluation"]
+
+
+def test_stream_endpoint_replays_a_repeated_submission(api):
+    session_id = api.new_session([QUESTION])
+    body = {"session_id": session_id, "question_index": 0, "answer": ANSWER}
+    first = parse_sse(api.client.post("/api/submit-answer/stream", json=body).get_data(as_text=True))
+    again = parse_sse(api.client.post("/api/submit-answer/stream", json=body).get_data(as_text=True))
+    assert [name for name, _ in again] == ["transcript", "provisional", "evaluation", "done"]
+    assert dict(again)["evaluation"]["replayed"] is True
+    assert dict(again)["evaluation"]["evaluation"] == dict(first)["evaluation"]["evaluation"]
+
+
+def test_stream_endpoint_rejects_bad_requests(api):
+    assert api.client.post("/api/submit-answer/stream", json={"answer": ANSWER}).status_code == 400
+    session_id = api.new_session([QUESTION])
+    response = api.client.post("/api/submit-answer/stream",
+                               json={"session_id": session_id, "question_index": 3, "answer": ANSWER})
+    assert response.status_code == 400
@@ -0,0 +1,94 @@
+import time
+
+QUESTIONS = ["How does a database index speed up queries?", "What is a race condition?"]
+ANSWER = ("An index keeps a sorted B-tree of the column values, so a lookup walks the tree "
+          "in logarithmic time instead of scanning every row of the table.")
+
+
+def _submit(api, session_id, answer=ANSWER, q_idx=0, key=None, **fields):
+    headers = {"Idempotency-Key": key} if key else {}
+    body = {"session_id": session_id, "question_index": q_idx, "answer": answer, **fields}
+    return api.client.post("/api/submit-answer", json=body, headers=headers)
+
+
+# ---------- idempotency ----------
+def test_duplicate_idempotency_key_returns_the_same_slot(api, fake_llm_backend):
+    session_id = api.new_session(QUESTIONS)
+    first = _submit(api, session_id, key="retry-1")
+    assert first.status_code == 200 and first.get_json()["replayed"] is False
+    calls = fake_llm_backend.stats()["calls"]
+    submission_id = api.sessions.get(session_id)["slots"][0]["submission_id"]
+
+    # A client retry with the same key, even with a re-sent (different) body, is the stored result
+    again = _submit(api, session_id, answer=ANSWER + " retried", key="retry-1")
+    assert again.status_code == 200
+    assert again.get_json()["replayed"] is True
+    assert again.get_json()["evaluation"] == first.get_json()["evaluation"]
+    assert again.get_json()["transcript"] == ANSWER
+    assert fake_llm_backend.stats()["calls"] == calls
+    slots = api.sessions.get(session_id)["slots"]
+    assert slots[0]["submission_id"] == submission_id
+    assert slots[1] is None
+
+
+def test_identical_answer_without_key_is_replayed(api, fake_llm_backend):
+    session_id = api.new_session(QUESTIONS)
+    first = _submit(api, session_id).get_json()
+    calls = fake_llm_backend.stats()["calls"]
+    again = _submit(api, session_id).get_json()
+    assert again["replayed"] is True and again["evaluation"] == first["evaluation"]
+    assert fake_llm_backend.stats()["calls"] == calls
+
+
+def test_different_answer_replaces_the_slot(api):
+    session_id = api.new_session(QUESTIONS)
+    _submit(api, session_id, key="a")
+    first_id = api.sessions.get(session_id)["slots"][0]["submission_id"]
+    replaced = _submit(api, session_id, answer="A race condition is when threads interleave badly.", key="b")
+    assert replaced.get_json()["replayed"] is False
+    slot = api.sessions.get(session_id)["slots"][0]
+    assert slot["submission_id"] != first_id
+    assert slot["idempotency_key"] == "b"
+
+
+# ---------- background grading ----------
+def _wait_until_graded(api, session_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = api.client.get(f"/api/answers-status/{session_id}").get_json()
+        if not status["pending"]:
+            return status
+        time.sleep(0.02)
+    raise AssertionError("answers were still pending")
+
+
+def test_answers_status_reports_pending_indices(api, fake_llm_backend):
+    fake_llm_backend.configure(latency="fixed:300")
+    session_id = api.new_session(QUESTIONS)
+    response = _submit(api, session_id, q_idx=1, key="bg-1", **{"async": True})
+    assert response.status_code == 202
+    assert response.get_json()["status"] == "pending"
+    assert response.get_json()["status_url"] == f"/api/answers-status/{session_id}"
+
+    status = api.client.get(f"/api/answers-status/{session_id}").get_json()
+    assert status["pending"] == [1]
+    assert status["answered"] == []
+    assert status["complete"] is False
+    assert [a["status"] for a in status["answers"]] == ["unanswered", "pending"]
+
+    status = _wait_until_graded(api, session_id)
+    assert status["answered"] == [1]
+    assert status["answers"][1]["evaluation"]["overall_score"] is not None
+
+
+def test_answers_status_after_every_question_is_graded(api):
+    session_id = api.new_session(QUESTIONS)
+    for q_idx in range(len(QUESTIONS)):
+        assert _submit(api, session_id, q_idx=q_idx, **{"async": True}).status_code == 202
+    status = _wait_until_graded(api, session_id)
+    assert status["answered"] == [0, 1]
+    assert status["complete"] is True
+
+
+def test_answers_status_rejects_unknown_session(api):
+    assert api.client.get("/api/answers-status/nope").status_code == 400
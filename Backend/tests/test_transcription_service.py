@@ -0,0 +1,90 @@
+import socket
+import threading
+
+import pytest
+
+import transcription_service as ts
+
+AUTHKEY = b"0123456789abcdef"
+
+
+def test_message_round_trip():
+    left, right = socket.socketpair()
+    with left, right:
+        ts.send_message(left, {"op": "transcribe", "path": "/tmp/a.wav", "text": "héllo"})
+        assert ts.recv_message(right) == {"op": "transcribe", "path": "/tmp/a.wav", "text": "héllo"}
+
+
+def test_oversized_and_non_object_messages_are_rejected():
+    left, right = socket.socketpair()
+    with left, right:
+        left.sendall(ts._HEADER.pack(ts.MAX_MESSAGE_BYTES + 1))
+        with pytest.raises(ValueError):
+            ts.recv_message(right)
+    left, right = socket.socketpair()
+    with left, right:
+        ts.send_message(left, [1, 2])
+        with pytest.raises(ValueError):
+            ts.recv_message(right)
+
+
+def test_closed_connection():
+    left, right = socket.socketpair()
+    with right:
+        left.close()
+        with pytest.raises(EOFError):
+            ts.recv_message(right)
+
+
+def _handshake(client_key):
+    server_sock, client_sock = socket.socketpair()
+    outcome = {}
+
+    def serve():
+        try:
+            ts._authenticate_client(server_sock, AUTHKEY)
+            outcome["server"] = "ok"
+        except ConnectionError as e:
+            outcome["server"] = e
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    try:
+        ts._answer_challenge(client_sock, client_key)
+        outcome["client"] = "ok"
+    except ConnectionError as e:
+        outcome["client"] = e
+    thread.join()
+    server_sock.close()
+    client_sock.close()
+    return outcome
+
+
+def test_handshake_with_the_right_key():
+    assert _handshake(AUTHKEY) == {"server": "ok", "client": "ok"}
+
+
+def test_handshake_with_the_wrong_key():
+    outcome = _handshake(b"fedcba9876543210")
+    assert isinstance(outcome["server"], ConnectionError)
+    assert isinstance(outcome["client"], ConnectionError)
+
+
+def test_authkey_is_required():
+    for key in (b"", b"short"):
+        with pytest.raises(ValueError):
+            ts.check_authkey(key)
+        with pytest.raises(ValueError):
+            ts.TranscriptionClient("127.0.0.1:7860", authkey=key)
+    ts.check_authkey(AUTHKEY)
+
+
+def test_loopback_addresses():
+    assert ts.is_loopback("127.0.0.1")
+    assert ts.is_loopback("::1")
+    assert ts.is_loopback("localhost")
+    assert not ts.is_loopback("0.0.0.0")
+    assert not ts.is_loopback("10.0.0.5")
+    assert not ts.is_loopback("example.com")
+    assert ts.parse_address("localhost:9000") == ("localhost", 9000)
+    assert ts.parse_address(":9000") == ("127.0.0.1", 9000)
@@ -0,0 +1,473 @@
+# transcription_service.py
+"""Out-of-process Whisper transcription shared by every API worker.
+
+Without it, each gunicorn worker loads its own Whisper model (1 GB+ for
+"small") and transcribes inside the request thread, so concurrent answers
+fight over the CPU. Run the service once per host:
+
+    python transcription_service.py
+
+It listens on TRANSCRIBE_SERVICE_ADDRESS and keeps a small pool of worker
+processes, each holding one copy of the model. Jobs wait in a bounded
+queue, and each free worker takes the next clip. For an engine with real
+batched inference (STTEngine.batched_inference), a worker instead takes
+every queued clip, up to TRANSCRIBE_BATCH_SIZE, as one batch. When the
+queue is full, new jobs are rejected straight away, so callers fall back
+instead of waiting.
+Transcription capacity (TRANSCRIBE_WORKERS) now scales independently of
+the HTTP workers.
+
+Messages are JSON objects framed by a 4-byte big-endian length, so nothing
+received over the socket is ever unpickled. Each connection starts with an
+HMAC-SHA256 challenge keyed by TRANSCRIBE_SERVICE_AUTHKEY. The key has no
+default: the service refuses to start without one, and API workers fall
+back to in-process transcription. The service only binds a loopback address
+unless TRANSCRIBE_SERVICE_ALLOW_REMOTE=1.
+
+API workers send the path of the saved upload, so the service has to run
+on the same host (or share the uploads volume). With
+TRANSCRIBE_SERVICE_ADDRESS set, exp2.transcribe_with_whisper sends its
+jobs here through `client` and never loads Whisper itself. Unset, it
+transcribes in-process as before.
+
+Environment:
+    TRANSCRIBE_SERVICE_ADDRESS   "host:port" of the service; unset = transcribe in-process
+    TRANSCRIBE_SERVICE_AUTHKEY   shared secret, at least 16 characters (required, no default)
+    TRANSCRIBE_SERVICE_ALLOW_REMOTE  "1" lets the service bind a non-loopback address
+    TRANSCRIBE_WORKERS           worker processes, one model each (default 1)
+    TRANSCRIBE_BATCH_SIZE        most clips a worker takes at once, for batching engines only (default 1)
+    TRANSCRIBE_BATCH_WAIT_MS     how long a free worker waits to fill a batch (default 50)
+    TRANSCRIBE_QUEUE_LIMIT       queued clips before new ones are rejected (default 32)
+    TRANSCRIBE_TIMEOUT_SEC       client-side wait for one clip (default 300)
+
+The engine each worker runs (STT_ENGINE, WHISPER_MODEL, STT_COMPUTE_TYPE,
+STT_THREADS, ...) is configured as described in stt_engines.
+"""
+import os
+import sys
+import hmac
+import json
+import time
+import uuid
+import queue
+import socket
+import struct
+import hashlib
+import ipaddress
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+import stt_engines
+
+TRANSCRIBE_SERVICE_ADDRESS = os.getenv("TRANSCRIBE_SERVICE_ADDRESS", "")
+TRANSCRIBE_SERVICE_AUTHKEY = os.getenv("TRANSCRIBE_SERVICE_AUTHKEY", "").encode("utf-8")
+TRANSCRIBE_SERVICE_ALLOW_REMOTE = os.getenv("TRANSCRIBE_SERVICE_ALLOW_REMOTE", "0") == "1"
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", "1"))
+TRANSCRIBE_BATCH_SIZE = int(os.getenv("TRANSCRIBE_BATCH_SIZE", "1"))
+TRANSCRIBE_BATCH_WAIT_MS = float(os.getenv("TRANSCRIBE_BATCH_WAIT_MS", "50"))
+TRANSCRIBE_QUEUE_LIMIT = int(os.getenv("TRANSCRIBE_QUEUE_LIMIT", "32"))
+TRANSCRIBE_TIMEOUT_SEC = float(os.getenv("TRANSCRIBE_TIMEOUT_SEC", "300"))
+
+DEFAULT_ADDRESS = "127.0.0.1:7860"
+MIN_AUTHKEY_BYTES = 16
+MAX_MESSAGE_BYTES = 1 << 20  # a request is a path, a reply a transcript or the stats
+HANDSHAKE_TIMEOUT_SEC = 5.0
+_HEADER = struct.Struct("!I")
+
+
+class TranscriptionError(RuntimeError):
+    """The service rejected or failed a clip, or could not be reached."""
+
+
+def parse_address(address):
+    host, _, port = (address or DEFAULT_ADDRESS).rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def check_authkey(authkey):
+    """Raise ValueError unless the shared secret is set and long enough."""
+    if len(authkey or b"") < MIN_AUTHKEY_BYTES:
+        raise ValueError(f"TRANSCRIBE_SERVICE_AUTHKEY must be set to a secret of at least {MIN_AUTHKEY_BYTES} characters")
+
+
+# ---------- wire format ----------
+def send_message(sock, message):
+    payload = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise EOFError("connection closed")
+        data += chunk
+    return bytes(data)
+
+
+def recv_message(sock):
+    """Next JSON object from the socket (ValueError for anything else, EOFError when closed)."""
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if size > MAX_MESSAGE_BYTES:
+        raise ValueError(f"message of {size} bytes is over the {MAX_MESSAGE_BYTES} byte limit")
+    message = json.loads(_recv_exact(sock, size).decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("message is not a JSON object")
+    return message
+
+
+def _digest(authkey, nonce):
+    return hmac.new(authkey, nonce, hashlib.sha256).hexdigest()
+
+
+def _authenticate_client(sock, authkey):
+    """Server side of the handshake: the client must answer a fresh nonce with its HMAC."""
+    nonce = os.urandom(32)
+    send_message(sock, {"challenge": nonce.hex()})
+    answer = recv_message(sock).get("digest")
+    if not isinstance(answer, str) or not hmac.compare_digest(answer, _digest(authkey, nonce)):
+        send_message(sock, {"error": "authentication failed"})
+        raise ConnectionError("client failed authentication")
+    send_message(sock, {"ok": True})
+
+
+def _answer_challenge(sock, authkey):
+    """Client side of the handshake."""
+    try:
+        nonce = bytes.fromhex(recv_message(sock)["challenge"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ConnectionError(f"unexpected handshake from the transcription service: {e}") from e
+    send_message(sock, {"digest": _digest(authkey, nonce)})
+    if not recv_message(sock).get("ok"):
+        raise ConnectionError("transcription service rejected the authkey")
+
+
+# ---------- worker processes ----------
+_worker_engine = None
+
+
+def _init_worker():
+    global _worker_engine
+    _worker_engine = stt_engines.get_engine()
+    if _worker_engine is None:
+        raise RuntimeError(f"STT engine {stt_engines.STT_ENGINE!r} is not installed")
+    print(f"🔄 Transcription worker {os.getpid()} starting")
+    _worker_engine.load()
+
+
+def _transcribe_batch(paths):
+    """Runs in a worker process. One {"text"} or {"error"} per path, in order."""
+    return _worker_engine.transcribe_batch(paths)
+
+
+# ---------- service ----------
+class _Job:
+    __slots__ = ("job_id", "path", "reply", "queued_at")
+
+    def __init__(self, job_id, path, reply):
+        self.job_id = job_id
+        self.path = path
+        self.reply = reply
+        self.queued_at = time.monotonic()
+
+
+class TranscriptionServer:
+    """Accepts authenticated jobs over a TCP socket and runs them in batches on a process pool."""
+
+    def __init__(self, address=None, authkey=TRANSCRIBE_SERVICE_AUTHKEY, workers=1, batch_size=1,
+                 batch_wait_ms=50.0, queue_limit=32, allow_remote=TRANSCRIBE_SERVICE_ALLOW_REMOTE):
+        check_authkey(authkey)
+        self.address = parse_address(address)
+        if not allow_remote and not is_loopback(self.address[0]):
+            raise ValueError(f"refusing to listen on {self.address[0]}, which is not a loopback address "
+                             "(set TRANSCRIBE_SERVICE_ALLOW_REMOTE=1 to allow it)")
+        self.authkey = authkey
+        self.workers = max(1, int(workers))
+        engine = stt_engines.create_engine()  # loaded in the workers, not here
+        self.engine = engine.describe()
+        # Batching an engine that decodes clips one after another only makes the first clip wait for the rest
+        self.batch_size = max(1, int(batch_size)) if engine.batched_inference else 1
+        if self.batch_size < int(batch_size):
+            print(f"⚠️ {self.engine} has no batched inference; ignoring TRANSCRIBE_BATCH_SIZE={batch_size}")
+        self.batch_wait_sec = max(0.0, float(batch_wait_ms)) / 1000
+        self._queue = queue.Queue(maxsize=max(1, int(queue_limit)))
+        self._free_workers = threading.Semaphore(self.workers)
+        self._pool = None
+        self._lock = threading.Lock()
+        self._counters = {"accepted": 0, "rejected": 0, "completed": 0, "failed": 0, "batches": 0,
+                          "batched_clips": 0, "queue_wait_sec": 0.0, "busy_sec": 0.0}
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self._counters[name] += delta
+
+    # ---------- public API ----------
+    def serve_forever(self):
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),  # never fork a process that holds a model
+            initializer=_init_worker,
+        )
+        # Start every worker (and load its model) before accepting jobs
+        for warmup in [self._pool.submit(_transcribe_batch, []) for _ in range(self.workers)]:
+            warmup.result()
+        threading.Thread(target=self._dispatch, name="transcribe-dispatch", daemon=True).start()
+        with socket.create_server(self.address) as listener:
+            print(f"🎧 Transcription service listening on {self.address[0]}:{self.address[1]} "
+                  f"({self.workers} x {self.engine}, batches of up to {self.batch_size})")
+            while True:
+                try:
+                    conn, _peer = listener.accept()
+                except OSError as e:
+                    print("⚠️ Transcription service could not accept a connection:", e)
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        batches, clips = counters["batches"], counters["batched_clips"]
+        counters["avg_batch_size"] = round(clips / batches, 2) if batches else 0.0
+        queue_wait_sec = counters.pop("queue_wait_sec")
+        counters["avg_queue_wait_sec"] = round(queue_wait_sec / clips, 3) if clips else 0.0
+        counters["busy_sec"] = round(counters["busy_sec"], 3)
+        counters["queued"] = self._queue.qsize()
+        counters["queue_limit"] = self._queue.maxsize
+        counters["workers"] = self.workers
+        counters["batch_size"] = self.batch_size
+        counters["engine"] = self.engine
+        return counters
+
+    # ---------- internals ----------
+    def _serve_connection(self, conn):
+        send_lock = threading.Lock()
+
+        def reply(message):
+            try:
+                with send_lock:
+                    send_message(conn, message)
+            except OSError:
+                pass  # the API worker went away; its result is dropped
+
+        try:
+            conn.settimeout(HANDSHAKE_TIMEOUT_SEC)
+            _authenticate_client(conn, self.authkey)
+            conn.settimeout(None)
+        except (OSError, EOFError, ValueError) as e:
+            print("⚠️ Transcription service rejected a connection:", e)
+            conn.close()
+            return
+
+        try:
+            while True:
+                request = recv_message(conn)
+                op = request.get("op")
+                if op == "transcribe" and not isinstance(request.get("path"), str):
+                    reply({"job_id": request.get("job_id"), "error": "transcribe needs a path"})
+                elif op == "transcribe":
+                    try:
+                        self._queue.put_nowait(_Job(request.get("job_id"), request["path"], reply))
+                        self._count(accepted=1)
+                    except queue.Full:
+                        self._count(rejected=1)
+                        reply({"job_id": request.get("job_id"), "error": "transcription queue is full"})
+                elif op == "stats":
+                    reply({"job_id": request.get("job_id"), "stats": self.stats()})
+                else:
+                    reply({"job_id": request.get("job_id"), "error": f"unknown op {op!r}"})
+        except (EOFError, OSError):
+            pass
+        except ValueError as e:
+            print("⚠️ Transcription service dropped a connection after a malformed message:", e)
+        finally:
+            conn.close()
+
+    def _dispatch(self):
+        """Hand batches to the pool, at most one per worker.
+
+        A batch is collected once a worker is free, so clips that queued up
+        while every worker was busy go out together.
+        """
+        while True:
+            self._free_workers.acquire()
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_wait_sec
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            started = time.monotonic()
+            self._count(batches=1, batched_clips=len(batch),
+                        queue_wait_sec=sum(started - job.queued_at for job in batch))
+            try:
+                future = self._pool.submit(_transcribe_batch, [job.path for job in batch])
+            except Exception as e:
+                self._free_workers.release()
+                self._finish(batch, None, e, started)
+                continue
+            future.add_done_callback(lambda f, batch=batch, started=started: self._on_batch_done(batch, f, started))
+
+    def _on_batch_done(self, batch, future, started):
+        self._free_workers.release()
+        try:
+            self._finish(batch, future.result(), None, started)
+        except Exception as e:  # a worker process died
+            self._finish(batch, None, e, started)
+
+    def _finish(self, batch, results, error, started):
+        self._count(busy_sec=time.monotonic() - started)
+        for i, job in enumerate(batch):
+            result = results[i] if results is not None else {"error": f"transcription worker failed: {error}"}
+            self._count(**({"failed": 1} if "error" in result else {"completed": 1}))
+            job.reply(dict(result, job_id=job.job_id))
+
+
+# ---------- client ----------
+class TranscriptionClient:
+    """One connection per API process; results come back as Futures keyed by job id."""
+
+    def __init__(self, address, authkey=TRANSCRIBE_SERVICE_AUTHKEY, timeout_sec=300.0):
+        check_authkey(authkey)
+        self.address = parse_address(address)
+        self.authkey = authkey
+        self.timeout_sec = float(timeout_sec)
+        self._conn = None
+        self._conn_pid = None
+        self._lock = threading.Lock()
+        self._pending = {}  # job_id -> Future
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "unavailable": 0}
+
+    def _connection(self):
+        # caller holds self._lock; reconnects after a fork or a dropped connection
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._pending = {}
+            conn = socket.create_connection(self.address, timeout=HANDSHAKE_TIMEOUT_SEC)
+            try:
+                _answer_challenge(conn, self.authkey)
+                conn.settimeout(None)
+            except BaseException:
+                conn.close()
+                raise
+            self._conn = conn
+            self._conn_pid = os.getpid()
+            threading.Thread(target=self._read, args=(self._conn,), name="transcribe-client", daemon=True).start()
+        return self._conn
+
+    def _read(self, conn):
+        try:
+            while True:
+                message = recv_message(conn)
+                with self._lock:
+                    future = self._pending.pop(message.get("job_id"), None)
+                if future is None:
+                    continue
+                if "error" in message:
+                    future.set_exception(TranscriptionError(message["error"]))
+                else:
+                    future.set_result(message.get("stats", message.get("text", "")))
+        except (EOFError, OSError, ValueError):
+            pass
+        with self._lock:
+            if self._conn is conn:
+                self._conn = None
+                orphaned, self._pending = list(self._pending.values()), {}
+            else:
+                orphaned = []
+        for future in orphaned:
+            future.set_exception(TranscriptionError("transcription service connection lost"))
+
+    def _request(self, message):
+        future = Future()
+        message["job_id"] = str(uuid.uuid4())
+        with self._lock:
+            try:
+                conn = self._connection()
+                self._pending[message["job_id"]] = future
+                send_message(conn, message)
+            except (OSError, EOFError, ValueError) as e:
+                self._pending.pop(message["job_id"], None)
+                self._conn = None
+                self._counters["unavailable"] += 1
+                raise TranscriptionError(f"transcription service unavailable: {e}") from e
+        return future
+
+    # ---------- public API ----------
+    def submit(self, audio_path):
+        """Queue one clip. Returns a Future for its transcript (TranscriptionError on failure)."""
+        future = self._request({"op": "transcribe", "path": os.path.abspath(audio_path)})
+        with self._lock:
+            self._counters["submitted"] += 1
+
+        def count(f):
+            with self._lock:
+                self._counters["failed" if f.exception() else "completed"] += 1
+
+        future.add_done_callback(count)
+        return future
+
+    def transcribe(self, audio_path, timeout=None):
+        """Blocking form of submit()."""
+        try:
+            return self.submit(audio_path).result(timeout or self.timeout_sec)
+        except FutureTimeoutError as e:
+            raise TranscriptionError("transcription timed out") from e
+
+    def server_stats(self, timeout=5.0):
+        return self._request({"op": "stats"}).result(timeout)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters["in_flight"] = len(self._pending)
+        counters["address"] = f"{self.address[0]}:{self.address[1]}"
+        return counters
+
+
+def _create_client():
+    if not TRANSCRIBE_SERVICE_ADDRESS:
+        return None
+    try:
+        return TranscriptionClient(TRANSCRIBE_SERVICE_ADDRESS, timeout_sec=TRANSCRIBE_TIMEOUT_SEC)
+    except ValueError as e:
+        print(f"⚠️ Transcription service disabled, transcribing in-process: {e}")
+        return None
+
+
+# Process-wide client used by exp2.transcribe_with_whisper (None = transcribe in-process)
+client = _create_client()
+
+
+def main():
+    try:
+        server = TranscriptionServer(
+            TRANSCRIBE_SERVICE_ADDRESS or DEFAULT_ADDRESS,
+            workers=TRANSCRIBE_WORKERS,
+            batch_size=TRANSCRIBE_BATCH_SIZE,
+            batch_wait_ms=TRANSCRIBE_BATCH_WAIT_MS,
+            queue_limit=TRANSCRIBE_QUEUE_LIMIT,
+        )
+    except ValueError as e:
+        print(f"❌ Transcription service not started: {e}")
+        sys.exit(1)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Transcription service stopped")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,8 @@ import { Home } from "lucide-react";
 
 const API_BASE = import.meta.env.VITE_API_URL || "http://localhost:8000";
 const JUDGE0_URL = "https://judge0-ce.p.rapidapi.com/submissions";
+// Audio is uploaded in slices of this length while the candidate speaks, so it is transcribed as it arrives
+const AUDIO_CHUNK_MS = 3000;
 
 
 async function safeFetch(url: string, options: RequestInit = {}) {
@@ -47,6 +49,20 @@ function isProgrammingQuestion(q: string) {
   return false;
 }
 
+// Answers are graded in the background; show the instant provisional score until the evaluation lands
+function gradingDescription(data: any) {
+  if (data.evaluation) return `Score: ${data.evaluation.overall_score ?? "N/A"}/100`;
+  if (data.provisional) return `Provisional score: ${data.provisional.score}/100, full grading in progress`;
+  return "Grading in progress";
+}
+
+// Answers and evaluations are kept per question index (a resubmission replaces, never appends)
+function setSlot<T>(prev: T[], index: number, value: T): T[] {
+  const next = [...prev];
+  next[index] = value;
+  return next;
+}
+
 const Interview: React.FC = () => {
   const navigate = useNavigate();
 
@@ -145,11 +161,12 @@ const Interview: React.FC = () => {
       "InterviewResults",
       JSON.stringify({
         session_id: sessionData.session_id,
-        questions: sessionData.questions,
-        answers,
-        evaluations,
+        questions: data.questions ?? sessionData.questions,
+        answers: data.answers ?? answers,
+        evaluations: data.evaluations ?? evaluations,
         report_url: data.report_url,      // <-- THIS LINE IS SUPER IMPORTANT
         report_path: data.report_path,    // optional
+        final_assessment: data.final_assessment,
       })
     );
 
@@ -237,18 +254,27 @@ const Interview: React.FC = () => {
 
       const recorder = new MediaRecorder(stream, options);
       const localChunks: BlobPart[] = [];
+      const streamId = `${Date.now().toString(36)}${Math.random().toString(36).slice(2, 10)}`;
+      const questionIndex = currentQuestion;
+      let chunkSeq = 0;
+      let chunkUploads: Promise<boolean> = Promise.resolve(true);
 
       recorder.ondataavailable = (ev: BlobEvent) => {
         if (ev.data && ev.data.size > 0) {
           localChunks.push(ev.data);
           setAudioChunks((prev) => [...prev, ev.data]);
+          // Uploads stay in order; after one failure the full recording is sent on stop instead
+          const seq = chunkSeq++;
+          const piece = ev.data;
+          chunkUploads = chunkUploads.then((ok) => ok && uploadAudioChunk(streamId, questionIndex, seq, piece));
         }
       };
 
       recorder.onstop = async () => {
         if (localChunks.length > 0) {
           const blob = new Blob(localChunks, { type: localChunks[0] instanceof Blob ? (localChunks[0] as Blob).type : "audio/webm" });
-          await submitAudio(blob);
+          const streamed = await chunkUploads;
+          await submitAudio(blob, streamed ? { streamId, seq: chunkSeq } : undefined);
         }
         try {
           stream.getTracks().forEach((t) => t.stop());
@@ -257,7 +283,7 @@ const Interview: React.FC = () => {
         setMediaRecorder(null);
       };
 
-      recorder.start();
+      recorder.start(AUDIO_CHUNK_MS);
       setMediaRecorder(recorder);
       setIsRecording(true);
       setAudioChunks([]);
@@ -276,7 +302,25 @@ const Interview: React.FC = () => {
     }
   };
 
-  const submitAudio = async (audioBlob: Blob) => {
+  const uploadAudioChunk = async (streamId: string, questionIndex: number, seq: number, piece: Blob) => {
+    if (!sessionData) return false;
+    try {
+      const form = new FormData();
+      form.append("session_id", sessionData.session_id);
+      form.append("question_index", String(questionIndex));
+      form.append("stream_id", streamId);
+      form.append("seq", String(seq));
+      form.append("audio", piece, `chunk-${seq}.webm`);
+      const res = await fetch(`${API_BASE}/api/submit-answer/chunk`, { method: "POST", body: form });
+      return res.ok;
+    } catch (err) {
+      console.warn("Audio chunk upload failed, sending the whole recording instead:", err);
+      return false;
+    }
+  };
+
+  // With `chunked`, the audio is already on the server and only the final marker is posted
+  const submitAudio = async (audioBlob: Blob, chunked?: { streamId: string; seq: number }) => {
     if (!sessionData) return;
     setIsSubmitting(true);
     setIsProcessingAudio(true);
@@ -285,16 +329,32 @@ const Interview: React.FC = () => {
       const form = new FormData();
       form.append("session_id", sessionData.session_id);
       form.append("question_index", String(currentQuestion));
-      const ext = audioBlob.type.includes("ogg") ? "ogg" : audioBlob.type.includes("wav") ? "wav" : "webm";
-      form.append("audio", audioBlob, `answer.${ext}`);
-
-      const res = await fetch(`${API_BASE}/api/submit-answer`, { method: "POST", body: form });
+      form.append("async", "1");
+      let res: Response | null = null;
+      if (chunked) {
+        form.append("stream_id", chunked.streamId);
+        form.append("seq", String(chunked.seq));
+        form.append("final", "1");
+        res = await fetch(`${API_BASE}/api/submit-answer/chunk`, { method: "POST", body: form });
+        if (!res.ok) {
+          console.warn("Chunked answer could not be completed, sending the whole recording:", res.status);
+          form.delete("stream_id");
+          form.delete("seq");
+          form.delete("final");
+          res = null;
+        }
+      }
+      if (!res) {
+        const ext = audioBlob.type.includes("ogg") ? "ogg" : audioBlob.type.includes("wav") ? "wav" : "webm";
+        form.append("audio", audioBlob, `answer.${ext}`);
+        res = await fetch(`${API_BASE}/api/submit-answer`, { method: "POST", body: form });
+      }
       const data = await res.json();
 
-      if (res.ok && data && data.evaluation) {
-        toast({ title: "Answer evaluated", description: `Score: ${data.evaluation.overall_score ?? "N/A"}/100` });
-        setAnswers((prev) => [...prev, data.transcript || ""]);
-        setEvaluations((prev) => [...prev, data.evaluation]);
+      if (res.ok && data && (data.evaluation || data.status === "pending")) {
+        toast({ title: "Answer submitted", description: gradingDescription(data) });
+        setAnswers((prev) => setSlot(prev, currentQuestion, data.transcript || ""));
+        setEvaluations((prev) => setSlot(prev, currentQuestion, data.evaluation));
 
         if (currentQuestion < (sessionData.questions?.length || 0) - 1) {
           setCurrentQuestion((q) => q + 1);
@@ -360,6 +420,7 @@ const Interview: React.FC = () => {
         question_index: currentQuestion,
         answer: codeAnswer,
         type: "code",
+        async: true,
       };
       const res = await fetch(`${API_BASE}/api/submit-answer`, {
         method: "POST",
@@ -367,10 +428,10 @@ const Interview: React.FC = () => {
         body: JSON.stringify(payload),
       });
       const data = await res.json();
-      if (res.ok && data && data.evaluation) {
-        toast({ title: "Code evaluated", description: `Score: ${data.evaluation.overall_score ?? "N/A"}/100` });
-        setAnswers((prev) => [...prev, codeAnswer]);
-        setEvaluations((prev) => [...prev, data.evaluation]);
+      if (res.ok && data && (data.evaluation || data.status === "pending")) {
+        toast({ title: "Code submitted", description: gradingDescription(data) });
+        setAnswers((prev) => setSlot(prev, currentQuestion, codeAnswer));
+        setEvaluations((prev) => setSlot(prev, currentQuestion, data.evaluation));
         if (currentQuestion < (sessionData.questions?.length || 0) - 1) {
           setCurrentQuestion((q) => q + 1);
         } else {
@@ -392,17 +453,17 @@ const Interview: React.FC = () => {
     if (!sessionData) return;
     setIsSubmitting(true);
     try {
-      const payload = { session_id: sessionData.session_id, question_index: currentQuestion, answer: text, type: "text" };
+      const payload = { session_id: sessionData.session_id, question_index: currentQuestion, answer: text, type: "text", async: true };
       const res = await fetch(`${API_BASE}/api/submit-answer`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify(payload),
       });
       const data = await res.json();
-      if (res.ok && data && data.evaluation) {
-        toast({ title: "Answer evaluated", description: `Score: ${data.evaluation.overall_score ?? "N/A"}/100` });
-        setAnswers((prev) => [...prev, text]);
-        setEvaluations((prev) => [...prev, data.evaluation]);
+      if (res.ok && data && (data.evaluation || data.status === "pending")) {
+        toast({ title: "Answer submitted", description: gradingDescription(data) });
+        setAnswers((prev) => setSlot(prev, currentQuestion, text));
+        setEvaluations((prev) => setSlot(prev, currentQuestion, data.evaluation));
         if (currentQuestion < (sessionData.questions?.length || 0) - 1) {
           setCurrentQuestion((q) => q + 1);
         } else {
@@ -433,12 +494,12 @@ const Interview: React.FC = () => {
       const data = await res.json();
       if (res.ok && data && data.evaluation) {
         // treat as answered with fallback evaluation
-        setAnswers((prev) => [...prev, "SKIPPED"]);
-        setEvaluations((prev) => [...prev, data.evaluation]);
+        setAnswers((prev) => setSlot(prev, currentQuestion, "SKIPPED"));
+        setEvaluations((prev) => setSlot(prev, currentQuestion, data.evaluation));
       } else {
         // fallback local skip (if backend failed)
-        setAnswers((prev) => [...prev, "SKIPPED"]);
-        setEvaluations((prev) => [...prev, { overall_score: 0, detailed_feedback: "Skipped" }]);
+        setAnswers((prev) => setSlot(prev, currentQuestion, "SKIPPED"));
+        setEvaluations((prev) => setSlot(prev, currentQuestion, { overall_score: 0, detailed_feedback: "Skipped" }));
       }
 
       if (currentQuestion < (sessionData.questions?.length || 0) - 1) {
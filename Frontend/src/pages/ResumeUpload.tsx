@@ -38,7 +38,20 @@ const ResumeUpload: React.FC = () => {
         throw new Error(`HTTP ${res.status} : ${await res.text()}`);
       }
 
-      const data = await res.json();
+      let data = await res.json();
+
+      // Questions are generated in the background; poll until the session is ready
+      for (let attempt = 0; data && data.session_id && data.status && data.status !== 'ready'; attempt++) {
+        if (attempt >= 120) {
+          throw new Error('Timed out waiting for interview questions');
+        }
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        const statusRes = await fetch(`${API_BASE}/api/session-status/${data.session_id}`);
+        if (!statusRes.ok) {
+          throw new Error(`HTTP ${statusRes.status} : ${await statusRes.text()}`);
+        }
+        data = await statusRes.json();
+      }
 
       if (data && data.session_id) {
         console.log('✅ Resume uploaded successfully');